@@ -0,0 +1,35 @@
+"""3D LUT throughput (MPix/s) for trilinear and tetrahedral interpolation.
+
+Run from the repository root:
+
+    python benchmarks/bench_lut.py [megapixels] [lattice sizes ...]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from src.filters.lut_filters import LUT3D
+
+
+def main(argv):
+    megapixels = float(argv[0]) if argv else 12
+    sizes = [int(value) for value in argv[1:]] or [17, 33, 65]
+    height = int(np.sqrt(megapixels * 1e6 * 2 / 3))
+    width = int(height * 3 / 2)
+    image = np.random.default_rng(0).integers(0, 256, (height, width, 3), dtype=np.uint8)
+    print(f"{width}x{height} ({width * height / 1e6:.1f} MP)")
+    for size in sizes:
+        # Leicht verbogenes Gitter, damit nichts wegoptimiert wird
+        lut = LUT3D(LUT3D.identity(size).lattice ** 0.9)
+        for method in LUT3D.METHODS:
+            start = time.perf_counter()
+            lut.apply(image, method)
+            seconds = time.perf_counter() - start
+            print(f"  {size:>3}^3 {method:<12} {seconds * 1000:8.1f} ms  {width * height / 1e6 / seconds:7.1f} MPix/s")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,88 @@
+"""Bytes copied and time per QImage -> NumPy -> QImage round trip.
+
+Compares the legacy split/merge conversion with the zero-copy bridge in
+src/utils/image_utils.py. Run from the repository root:
+
+    python benchmarks/bench_qimage_bridge.py [megapixels ...]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from PIL import Image
+from PySide6.QtGui import QImage
+from src.utils.image_utils import qimage_to_numpy, numpy_to_qimage
+
+
+def _pil_nbytes(image):
+    return image.width * image.height * len(image.getbands())
+
+
+def _qimage_buffer(qimage):
+    return np.frombuffer(qimage.constBits(), np.uint8)
+
+
+def legacy_round_trip(qimage):
+    """The conversion chain used before the bridge; returns (QImage, bytes copied)."""
+    copied = 0
+    width, height = qimage.width(), qimage.height()
+    bits = qimage.bits()
+    arr = np.frombuffer(bits, np.uint8, count=height * width * 4).reshape((height, width, 4))
+    arr = arr[:, :, [2, 1, 0, 3]]
+    copied += arr.nbytes
+    pil_image = Image.fromarray(arr, "RGBA")
+    copied += _pil_nbytes(pil_image)
+
+    r, g, b, a = pil_image.split()
+    copied += sum(_pil_nbytes(band) for band in (r, g, b, a))
+    pil_image = Image.merge("RGBA", (b, g, r, a))
+    copied += _pil_nbytes(pil_image)
+    im2 = pil_image.convert("RGBA")
+    copied += _pil_nbytes(im2)
+    data = im2.tobytes("raw", "RGBA")
+    copied += len(data)
+    result = QImage(data, im2.size[0], im2.size[1], QImage.Format_RGBA8888)
+    return result, copied
+
+
+def bridge_round_trip(qimage):
+    """Round trip through the bridge; returns (QImage, bytes copied)."""
+    copied = 0
+    arr = qimage_to_numpy(qimage)
+    if not np.shares_memory(arr, _qimage_buffer(qimage)):
+        copied += arr.nbytes
+    result = numpy_to_qimage(arr)
+    if not np.shares_memory(qimage_to_numpy(result), arr):
+        copied += arr.nbytes
+    return result, copied
+
+
+def measure(name, round_trip, qimage, repeats=5):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        _, copied = round_trip(qimage)
+        timings.append(time.perf_counter() - start)
+    frame_bytes = qimage.width() * qimage.height() * 4
+    print(f"  {name:<8} {min(timings) * 1000:9.2f} ms  {copied / 1e6:9.1f} MB copied "
+          f"({copied / frame_bytes:.1f} frames)")
+
+
+def main(argv):
+    megapixels = [float(value) for value in argv] or [2, 12, 24]
+    rng = np.random.default_rng(0)
+    for mp in megapixels:
+        height = int(np.sqrt(mp * 1e6 * 2 / 3))
+        width = int(height * 3 / 2)
+        pixels = rng.integers(0, 256, (height, width, 4), dtype=np.uint8)
+        qimage = numpy_to_qimage(pixels).copy()
+        print(f"{mp:g} MP ({width}x{height})")
+        measure("legacy", legacy_round_trip, qimage.convertToFormat(QImage.Format_ARGB32))
+        measure("bridge", bridge_round_trip, qimage)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,233 @@
+"""Image pipeline benchmarks on synthetic images, with JSON results and baseline comparison.
+
+Times the load/save paths, the ImageProcessingService conversions and
+adjustments, LUTFilter.apply_lut and BatchProcessor.process_images on
+deterministic synthetic images of 2, 12, 24 and 50 MP. Run from the
+repository root:
+
+    python benchmarks/run_benchmarks.py                      # all cases and sizes
+    python benchmarks/run_benchmarks.py --sizes 2 12 -k lut   # subset
+    python benchmarks/run_benchmarks.py -o results.json --save-baseline benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --compare benchmarks/baseline.json --tolerance 0.15
+
+Each case runs --repeat times after one warm-up run; the best time counts,
+the median is stored alongside. With --compare, a case is a regression
+if its best time exceeds the baseline's by more than the tolerance; the
+script then exits with status 1. Baselines are only comparable on the
+same machine, so the results record the environment they came from.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import PIL
+from PIL import Image
+
+SIZES = (2, 12, 24, 50)
+
+
+def synthetic_array(megapixels, seed=0):
+    """3:2 RGB image with gradients, edges and noise, so encoders and LUTs see realistic content."""
+    height = int(np.sqrt(megapixels * 1e6 * 2 / 3))
+    width = int(height * 3 / 2)
+    rng = np.random.default_rng(seed)
+    y = np.linspace(0, 1, height, dtype=np.float32)[:, None]
+    x = np.linspace(0, 1, width, dtype=np.float32)[None, :]
+    image = np.empty((height, width, 3), np.uint8)
+    # Headroom of 12 for the noise added below
+    image[..., 0] = 243 * x
+    image[..., 1] = 243 * y
+    image[..., 2] = 122 + 121 * np.sin(12 * x + 7 * y)
+    # Blocks with hard edges plus light noise
+    image[::64] //= 2
+    image[:, ::64] //= 2
+    image += rng.integers(0, 12, image.shape, dtype=np.uint8)
+    return image
+
+
+def fixture(workdir, megapixels, extension=".jpg"):
+    """Synthetic image file for a size, written once and reused between runs."""
+    path = os.path.join(workdir, f"synthetic_{megapixels:g}mp{extension}")
+    if not os.path.exists(path):
+        Image.fromarray(synthetic_array(megapixels)).save(path, quality=90)
+    return path
+
+
+def write_cube(path, size=33):
+    """Slightly curved 3D LUT in .cube format."""
+    if os.path.exists(path):
+        return path
+    values = (np.arange(size, dtype=np.float32) / (size - 1)) ** 0.9
+    with open(path, "w") as handle:
+        handle.write(f"LUT_3D_SIZE {size}\n")
+        for b in values:
+            for g in values:
+                for r in values:
+                    handle.write(f"{r:.6f} {g:.6f} {b * 0.95:.6f}\n")
+    return path
+
+
+def build_cases(workdir, megapixels):
+    """(name, setup, run) per case; setup runs before each timed call and is not timed."""
+    from src.core.batch_processor import BatchProcessor
+    from src.core.file_manager import FileManager
+    from src.core.image_cache import default_cache
+    from src.core.image_processor import ImageProcessor
+    from src.filters.lut_filters import LUTFilter
+    from src.services.image_processing_service import ImageProcessingService
+
+    service = ImageProcessingService()
+    file_manager = FileManager()
+    path = fixture(workdir, megapixels)
+    pil_image = Image.open(path).convert("RGB")
+    qimage = service.load_image(path)
+    array = service.qimage_to_array(qimage)
+    rgb = np.asarray(pil_image)
+    lut_filter = LUTFilter(write_cube(os.path.join(workdir, "curve.cube")))
+    output_directory = os.path.join(workdir, "output")
+    os.makedirs(output_directory, exist_ok=True)
+
+    def decode():
+        with file_manager.load_image(path) as image:
+            image.load()
+
+    def process_images():
+        BatchProcessor([path]).process_images(output_directory, ImageProcessor.flip_horizontal)
+
+    return [
+        ("load", None, decode),
+        ("load_qimage", None, lambda: service.load_image(path)),
+        ("save_jpeg", None, lambda: file_manager.save_image(pil_image, os.path.join(output_directory, "save.jpg"))),
+        ("save_png", None, lambda: file_manager.save_image(pil_image, os.path.join(output_directory, "save.png"))),
+        ("qimage_to_array", None, lambda: service.qimage_to_array(qimage)),
+        ("array_to_qimage", None, lambda: service.array_to_qimage(array)),
+        ("qimage_to_pil", None, lambda: service.qimage_to_pil(qimage)),
+        ("pil_to_qimage", None, lambda: service.pil_to_qimage(pil_image)),
+        ("adjustments", None, lambda: service.apply_adjustments(qimage, 20, 15, 0, 30)),
+        ("lut", None, lambda: lut_filter.apply_lut(rgb)),
+        # The shared image cache would turn every repeat into a cache hit
+        ("process_images", default_cache().clear, process_images),
+    ], pil_image.width * pil_image.height
+
+
+def measure(setup, run, repeat):
+    """Best and median wall time over repeat runs, after one warm-up run."""
+    times = []
+    for index in range(repeat + 1):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        if index:
+            times.append(elapsed)
+    return min(times), statistics.median(times)
+
+
+def environment():
+    return {
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pillow": PIL.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def run_benchmarks(sizes, workdir, repeat=3, keyword=None, stream=sys.stdout):
+    results = {}
+    for megapixels in sizes:
+        cases, pixels = build_cases(workdir, megapixels)
+        for name, setup, run in cases:
+            if keyword and keyword not in name:
+                continue
+            best, median = measure(setup, run, repeat)
+            key = f"{name}/{megapixels:g}MP"
+            results[key] = {"case": name, "megapixels": pixels / 1e6, "seconds": best, "median_seconds": median,
+                            "megapixels_per_second": pixels / 1e6 / best if best else 0.0}
+            print(f"{key:<28} {best * 1000:10.1f} ms  {results[key]['megapixels_per_second']:9.1f} MPix/s",
+                  file=stream)
+    return {"environment": environment(), "repeat": repeat, "results": results}
+
+
+def compare(results, baseline, tolerance, min_delta=0.001):
+    """Rows (key, seconds, baseline seconds, relative change, status) per case.
+
+    Differences below min_delta seconds never count; zero-copy cases take
+    microseconds and would otherwise flag timer noise.
+    """
+    rows = []
+    for key, result in results["results"].items():
+        reference = baseline["results"].get(key)
+        if reference is None:
+            rows.append((key, result["seconds"], None, None, "new"))
+            continue
+        change = result["seconds"] / reference["seconds"] - 1 if reference["seconds"] else 0.0
+        status = "ok"
+        if abs(result["seconds"] - reference["seconds"]) >= min_delta:
+            status = "slower" if change > tolerance else "faster" if change < -tolerance else "ok"
+        rows.append((key, result["seconds"], reference["seconds"], change, status))
+    return rows
+
+
+def print_comparison(rows, stream=sys.stdout):
+    print(f"\n{'case':<28} {'ms':>10} {'baseline':>10} {'change':>8}", file=stream)
+    for key, seconds, reference, change, status in rows:
+        if reference is None:
+            print(f"{key:<28} {seconds * 1000:10.1f} {'-':>10} {'-':>8}  {status}", file=stream)
+        else:
+            print(f"{key:<28} {seconds * 1000:10.1f} {reference * 1000:10.1f} {change:+8.1%}  {status}", file=stream)
+
+
+def write_json(path, data):
+    with open(path, "w") as handle:
+        json.dump(data, handle, indent=2)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=float, nargs="+", default=SIZES, help="image sizes in megapixels")
+    parser.add_argument("-k", "--keyword", help="only cases whose name contains this")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case (default: 3)")
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "cineaexpress-bench"),
+                        help="where synthetic images and outputs are kept")
+    parser.add_argument("-o", "--output", help="write the results as JSON")
+    parser.add_argument("--save-baseline", metavar="FILE", help="store the results as the new baseline")
+    parser.add_argument("--compare", metavar="FILE", help="compare against a stored baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="allowed slowdown before a case counts as a regression (default: 0.15)")
+    parser.add_argument("--min-delta", type=float, default=1.0,
+                        help="ignore differences below this many milliseconds (default: 1)")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.workdir, exist_ok=True)
+    results = run_benchmarks(args.sizes, args.workdir, args.repeat, args.keyword)
+    if args.output:
+        write_json(args.output, results)
+    if args.save_baseline:
+        write_json(args.save_baseline, results)
+    if args.compare:
+        with open(args.compare) as handle:
+            baseline = json.load(handle)
+        rows = compare(results, baseline, args.tolerance, args.min_delta / 1000)
+        print_comparison(rows)
+        regressions = [row[0] for row in rows if row[4] == "slower"]
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
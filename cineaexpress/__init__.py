@@ -0,0 +1 @@
+"""Startpunkt für ``python -m cineaexpress``; der Code liegt im Paket src."""
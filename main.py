@@ -6,10 +6,19 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 parent_dir = os.path.dirname(current_dir)
 sys.path.insert(0, parent_dir)
 
-from PySide6.QtWidgets import QApplication
-from src.ui.main_window import MainWindow
-
 def main():
+    # Mit Unterbefehl (render, storyboard, thumbnails) ohne GUI starten
+    if len(sys.argv) > 1 and not sys.argv[1].startswith("-"):
+        from src.cli import main as cli_main
+        sys.exit(cli_main(sys.argv[1:]))
+
+    import logging
+    from PySide6.QtWidgets import QApplication
+    from src.config import settings
+    from src.ui.main_window import MainWindow
+
+    logging.basicConfig(level=settings.LOG_LEVEL, format="%(levelname)s %(name)s: %(message)s")
+
     app = QApplication(sys.argv)
     main_window = MainWindow()
     main_window.show()
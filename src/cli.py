@@ -0,0 +1,262 @@
+"""Kommandozeile für den Betrieb ohne GUI (z. B. auf Render-Knoten ohne Display).
+
+    python -m cineaexpress render recipe.json "shots/*.jpg" -o export/
+    python -m cineaexpress render recipe.json "shots/*.jpg" -o export/ --reframe 2.35:1 --letterbox
+    python -m cineaexpress storyboard shots.csv -o board.pdf
+    python -m cineaexpress thumbnails "card/*.JPG"
+    python -m cineaexpress match "shots/*.jpg" -o graded/ --reference shots/A001.jpg --recipe recipe.json
+    python -m cineaexpress project day3.cxproj -o export/
+    python -m cineaexpress encoders sample.jpg
+    python -m cineaexpress --profile trace.json encoders sample.jpg
+
+Es wird weder eine QApplication noch ein QGraphicsScene erzeugt: Rahmen,
+Text, Farbregler und LUTs laufen über die Rezepte (NumPy/PIL). Module
+werden erst im jeweiligen Unterbefehl importiert, damit der Start schnell
+bleibt.
+"""
+import argparse
+import json
+import logging
+import sys
+
+
+def load_recipe(path):
+    """Liest ein Rezept aus JSON oder YAML; erlaubt eine Liste oder {"ops": [...]}."""
+    with open(path, encoding="utf-8") as handle:
+        if path.lower().endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError("Für YAML-Rezepte wird PyYAML benötigt (pip install pyyaml)")
+            data = yaml.safe_load(handle)
+        else:
+            data = json.load(handle)
+    if isinstance(data, dict):
+        data = data.get("ops", [])
+    if not isinstance(data, list):
+        raise ValueError(f"Rezept muss eine Liste von Operationen sein: {path}")
+    return data
+
+
+def reporter(args):
+    """on_result-Funktion für BatchProcessor.run, die jede Datei meldet (außer mit --quiet)."""
+    def report(result):
+        if not args.quiet:
+            status = "skipped" if result.skipped else ("ok" if result.ok else f"FAILED: {result.error}")
+            print(f"{result.image_path} -> {result.output_path} [{status}]")
+    return report
+
+
+def run_render(args):
+    from src.core.batch_processor import BatchProcessor
+    from src.core.recipe import validate_recipe
+
+    ops = load_recipe(args.recipe)
+    if args.reframe:
+        ops.append({"op": "reframe", "format": args.reframe, "width": args.frame_width,
+                    "mode": "letterbox" if args.letterbox else "crop"})
+    ops = validate_recipe(ops)
+    processor = BatchProcessor(args.inputs, max_workers=args.workers)
+    if not processor.image_paths:
+        print("No input images found", file=sys.stderr)
+        return 2
+
+    summary = processor.run(args.output, ops, on_result=reporter(args),
+                            incremental=not args.force, bake_luts=not args.no_bake, preset=args.preset)
+    print(summary)
+    return 1 if summary.failed else 0
+
+
+def run_storyboard(args):
+    from src.core.storyboard import StoryboardLayout, StoryboardRenderer, load_shot_list
+
+    layout = StoryboardLayout(columns=args.columns, rows=args.rows, cell_width=args.cell_width)
+    written = StoryboardRenderer(layout, max_workers=args.workers).render(load_shot_list(args.shots), args.output)
+    for path in written:
+        print(path)
+    return 0
+
+
+def run_thumbnails(args):
+    from src.core.batch_processor import expand_inputs
+    from src.core.thumbnails import ThumbnailStore
+
+    store = ThumbnailStore(args.store, max_size=args.size)
+    results = store.generate(expand_inputs(args.inputs), max_workers=args.workers)
+    failed = 0
+    for path, result in results.items():
+        if isinstance(result, Exception):
+            failed += 1
+            print(f"{path} FAILED: {result}", file=sys.stderr)
+        elif not args.quiet:
+            print(f"{path} -> {result}")
+    return 1 if failed else 0
+
+
+def run_match(args):
+    from src.core.batch_processor import BatchProcessor, expand_inputs
+    from src.core.matching import StatsCache, correction_ops, match_sequence
+    from src.core.recipe import validate_recipe
+
+    if not args.output and not args.dry_run:
+        raise ValueError("Ausgabeverzeichnis fehlt (-o/--output oder --dry-run)")
+    ops = validate_recipe(load_recipe(args.recipe)) if args.recipe else []
+    paths = expand_inputs(args.inputs)
+    if not paths:
+        print("No input images found", file=sys.stderr)
+        return 2
+    cache = StatsCache(args.stats_cache)
+    stats = cache.collect(list(dict.fromkeys(paths + ([args.reference] if args.reference else []))),
+                          max_workers=args.workers)
+    failed = [path for path, entry in stats.items() if isinstance(entry, Exception)]
+    for path in failed:
+        print(f"{path} FAILED: {stats[path]}", file=sys.stderr)
+    corrections = match_sequence(stats, args.reference, contrast=not args.no_contrast)
+    corrections = {path: corrections[path] for path in paths if path in corrections}
+    print(f"Statistics: {cache.computed} computed, {len(stats) - cache.computed - len(failed)} cached")
+    if not args.quiet:
+        for path, correction in corrections.items():
+            red, green, blue = correction.white_balance
+            print(f"{path}: {correction.exposure:+.2f} EV, white balance {red:.3f}/{green:.3f}/{blue:.3f}, "
+                  f"contrast x{correction.contrast:.2f}")
+    if args.dry_run:
+        return 1 if failed else 0
+
+    processor = BatchProcessor(list(corrections), max_workers=args.workers)
+    summary = processor.run(args.output, ops, on_result=reporter(args), incremental=not args.force, preset=args.preset,
+                            item_ops=correction_ops(corrections))
+    print(summary)
+    return 1 if failed or summary.failed else 0
+
+
+def run_project(args):
+    from src.core.batch_processor import BatchProcessor
+    from src.core.project import Project
+
+    project = Project.load(args.project)
+    if not project.shots:
+        print("Project has no shots", file=sys.stderr)
+        return 2
+    processor = BatchProcessor([shot.image_path for shot in project.shots], max_workers=args.workers)
+    summary = processor.run(args.output, [], on_result=reporter(args), incremental=not args.force,
+                            preset=args.preset, item_ops=project.recipes())
+    print(summary)
+    return 1 if summary.failed else 0
+
+
+def run_encoders(args):
+    from PIL import Image
+    from src.core.encoders import PRESETS, benchmark
+
+    with Image.open(args.image) as image:
+        image.load()
+        results = benchmark(image, args.preset or None, repeat=args.repeat)
+    print(f"{'preset':<15} {'ms':>9} {'MB':>8} {'bpp':>6}  description")
+    for result in results:
+        print(f"{result.preset:<15} {result.seconds * 1000:9.1f} {result.bytes / 1e6:8.2f} "
+              f"{result.bits_per_pixel:6.2f}  {PRESETS[result.preset].description}")
+    return 0
+
+
+def write_profile(args):
+    from src.core import profiler
+
+    recorded = profiler.get_profiler()
+    if args.profile:
+        recorded.dump_chrome_trace(args.profile)
+    if args.profile_stats:
+        recorded.dump_json(args.profile_stats)
+    for name, stats in recorded.stats().items():
+        print(f"{name:<10} {stats['count']:6d}x {stats['wall_seconds'] * 1000:10.1f} ms wall "
+              f"{stats['cpu_seconds'] * 1000:10.1f} ms cpu {stats['megapixels_per_second']:8.0f} MPix/s",
+              file=sys.stderr)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cineaexpress", description="CineaExpress headless tools")
+    parser.add_argument("-v", "--verbose", action="store_true", help="debug logging")
+    parser.add_argument("--profile", metavar="FILE", help="record per-op timings and write a Chrome trace")
+    parser.add_argument("--profile-stats", metavar="FILE", help="record per-op timings and write them as JSON")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    render = commands.add_parser("render", help="apply a recipe to many images")
+    render.add_argument("recipe", help="JSON or YAML recipe (list of operations)")
+    render.add_argument("inputs", nargs="+", help="image paths or glob patterns")
+    render.add_argument("-o", "--output", required=True, help="output directory")
+    render.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    render.add_argument("--reframe", metavar="FORMAT", help="crop to this aspect after the recipe, e.g. 2.35:1")
+    render.add_argument("--letterbox", action="store_true", help="with --reframe: matte outside instead of cropping")
+    render.add_argument("--frame-width", type=float, default=100, help="frame width in %% of the image (default: 100)")
+    render.add_argument("--preset", help="encoder preset, e.g. jpeg-dailies (see the encoders command)")
+    render.add_argument("--force", action="store_true", help="re-render items that are up to date")
+    render.add_argument("--no-bake", action="store_true", help="do not bake colour runs into a 3D LUT")
+    render.add_argument("-q", "--quiet", action="store_true", help="only print the summary")
+    render.set_defaults(handler=run_render)
+
+    storyboard = commands.add_parser("storyboard", help="render a shot list to N-up pages")
+    storyboard.add_argument("shots", help="shot list (JSON or CSV)")
+    storyboard.add_argument("-o", "--output", required=True, help="board.pdf or board.png")
+    storyboard.add_argument("--columns", type=int, default=3)
+    storyboard.add_argument("--rows", type=int, default=4)
+    storyboard.add_argument("--cell-width", type=int, default=600)
+    storyboard.add_argument("-j", "--workers", type=int, default=None)
+    storyboard.set_defaults(handler=run_storyboard)
+
+    thumbnails = commands.add_parser("thumbnails", help="fill the thumbnail store")
+    thumbnails.add_argument("inputs", nargs="+", help="image paths or glob patterns")
+    thumbnails.add_argument("--size", type=int, default=None, help="longest edge in pixels")
+    thumbnails.add_argument("--store", default=None, help="thumbnail directory")
+    thumbnails.add_argument("-j", "--workers", type=int, default=None)
+    thumbnails.add_argument("-q", "--quiet", action="store_true")
+    thumbnails.set_defaults(handler=run_thumbnails)
+
+    match = commands.add_parser("match", help="match exposure and white balance across a shot sequence")
+    match.add_argument("inputs", nargs="+", help="image paths or glob patterns")
+    match.add_argument("-o", "--output", help="output directory (required unless --dry-run)")
+    match.add_argument("--recipe", help="recipe applied after the correction")
+    match.add_argument("--reference", metavar="IMAGE", help="match to this image instead of the sequence median")
+    match.add_argument("--no-contrast", action="store_true", help="only match exposure and white balance")
+    match.add_argument("--stats-cache", metavar="FILE", default=None, help="statistics cache (JSON)")
+    match.add_argument("--preset", help="encoder preset, e.g. jpeg-dailies (see the encoders command)")
+    match.add_argument("--force", action="store_true", help="re-render items that are up to date")
+    match.add_argument("--dry-run", action="store_true", help="only print the corrections")
+    match.add_argument("-j", "--workers", type=int, default=None)
+    match.add_argument("-q", "--quiet", action="store_true", help="only print the summary")
+    match.set_defaults(handler=run_match)
+
+    project = commands.add_parser("project", help="render every shot of a project with its saved edits")
+    project.add_argument("project", help="project file (.cxproj)")
+    project.add_argument("-o", "--output", required=True, help="output directory")
+    project.add_argument("--preset", help="encoder preset, e.g. jpeg-dailies (see the encoders command)")
+    project.add_argument("--force", action="store_true", help="re-render items that are up to date")
+    project.add_argument("-j", "--workers", type=int, default=None)
+    project.add_argument("-q", "--quiet", action="store_true", help="only print the summary")
+    project.set_defaults(handler=run_project)
+
+    encoders = commands.add_parser("encoders", help="compare encode time and size of the presets")
+    encoders.add_argument("image", help="sample image")
+    encoders.add_argument("-p", "--preset", action="append", help="preset to measure (repeatable, default: all)")
+    encoders.add_argument("--repeat", type=int, default=3, help="runs per preset, the best one counts")
+    encoders.set_defaults(handler=run_encoders)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING,
+                        format="%(levelname)s %(name)s: %(message)s")
+    if args.profile or args.profile_stats:
+        from src.core import profiler
+        profiler.enable()
+    try:
+        return args.handler(args)
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    finally:
+        if args.profile or args.profile_stats:
+            write_profile(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,5 @@
+import os
+
 # Anwendungseinstellungen
 APP_NAME = "CineaExpress"
 VERSION = "1.0.0"
@@ -5,20 +7,77 @@ VERSION = "1.0.0"
 # Bildverarbeitungseinstellungen
 DEFAULT_FRAME_FORMAT = (16, 9)
 DEFAULT_FRAME_WIDTH_PERCENTAGE = 80
-MAX_IMAGE_DIMENSION = 4096  # Maximale Bildgröße in Pixeln
+MAX_IMAGE_DIMENSION = 4096  # Größere Bilder werden kachelweise verarbeitet (siehe core/tiling.py)
+TILE_MEMORY_BUDGET = 64 * 1024 * 1024  # Arbeitsspeicher je Kachel in Bytes
+IMAGE_MEMORY_BUDGET = 512 * 1024 * 1024  # Größere Bildpuffer liegen als memmap in TEMP_DIR
+IMAGE_CACHE_BUDGET = 1024 * 1024 * 1024  # Bytes für zuletzt geöffnete Bilder und ihre Verkleinerungen
+LUT_BAKE_SIZE = 33  # Gittergröße beim Zusammenbacken von Farboperationen (33 oder 65)
+
+# Stapelverarbeitung (None = automatisch aus der CPU-Anzahl)
+BATCH_MAX_WORKERS = None
+BATCH_MAX_IN_FLIGHT = None  # Maximale Anzahl gleichzeitig geladener Bilder
+BATCH_PIPELINED = True  # Lesen, Verarbeiten/Kodieren und Schreiben überlappen (siehe core/io_pipeline.py)
+BATCH_READ_WORKERS = 4  # Lese-Threads; auf Netzlaufwerken lohnen sich mehr
+BATCH_WRITE_WORKERS = 2  # Threads zum Schreiben der im Prozesspool kodierten Dateien
+BATCH_QUEUE_SIZE = None  # Plätze je Queue zwischen den Stufen (None = 2 x Worker)
+
+# Bearbeitungsverlauf (siehe core/edit_history.py)
+HISTORY_MAX_STEPS = 1000  # Ältere Schritte werden in den Ausgangszustand gefaltet
+HISTORY_CHECKPOINT_INTERVAL = 25  # Alle n Schritte einen Zustand bzw. Pixel-Checkpoint merken
+HISTORY_PIXEL_BUDGET = 256 * 1024 * 1024  # Bytes für Pixel-Checkpoints (0 = keine)
+HISTORY_MERGE_SECONDS = 1.0  # Reglerbewegungen innerhalb dieser Zeit ergeben einen Schritt
+
+# Scopes (siehe core/scopes.py)
+SCOPE_MAX_SAMPLES = 1 << 17  # Gezählte Pixel je Aktualisierung (Stichprobe)
+SCOPE_SIZE = 256  # Spalten der Waveform, Kantenlänge des Vektorskops
+SCOPE_UPDATE_MS = 150  # Höchstens eine Aktualisierung je Intervall, auch beim Ziehen der Regler
+
+# Belichtungs- und Weißabgleich über eine Bildfolge (siehe core/matching.py)
+MATCH_STATS_SIZE = 512  # Längere Seite der verkleinerten Dekodierung für die Statistik
+MATCH_STATS_CACHE = os.path.join(os.path.expanduser("~"), ".cache", "cineaexpress", "match_stats.json")
+MATCH_MAX_EXPOSURE = 2.0  # Größte Belichtungskorrektur in Blenden (nach oben und unten)
+MATCH_MAX_WHITE_BALANCE = 1.5  # Größte Verstärkung bzw. Abschwächung eines Kanals beim Weißabgleich
+MATCH_MAX_CONTRAST = 1.5  # Größte Streckung bzw. Stauchung des Tonwertumfangs
+
+# Projektdateien (siehe core/project.py)
+PROJECT_EXTENSION = ".cxproj"
+PROJECT_PROXY_LEVEL = 2  # Proxy-Stufe (1/2^n), die im Projektordner für geöffnete Shots abgelegt wird
+
+# Profiling (siehe core/profiler.py); einschalten auch über CINEAEXPRESS_PROFILE=1
+PROFILING_ENABLED = bool(os.environ.get("CINEAEXPRESS_PROFILE"))
+PROFILE_MAX_EVENTS = 100000  # Einzelereignisse, ältere werden verworfen (Summen bleiben)
+
+# Logging der GUI (die Kommandozeile setzt es über --verbose)
+LOG_LEVEL = "WARNING"
 
 # UI-Einstellungen
 WINDOW_WIDTH = 1200
 WINDOW_HEIGHT = 800
 DEFAULT_FONT_SIZE = 14
+FONT_DPI = 96  # Schriftgrößen der Oberfläche sind Punkte; beim Einbrennen 96 Pixel je Zoll
 DEFAULT_FRAME_COLOR = "#FF0000"  # Rot
 
 # Dateipfade
 RESOURCES_PATH = "src/resources"
 ICONS_PATH = f"{RESOURCES_PATH}/icons"
 TEMP_DIR = "temp"
+THUMBNAIL_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "cineaexpress", "thumbnails")
+THUMBNAIL_SIZE = 256  # Längere Seite der Vorschaubilder in Pixeln
 
 # Unterstützte Bildformate
-SUPPORTED_IMAGE_FORMATS = [".jpg", ".jpeg", ".png", ".bmp", ".gif"]
+SUPPORTED_IMAGE_FORMATS = [".jpg", ".jpeg", ".png", ".bmp", ".gif", ".webp", ".tif", ".tiff", ".avif"]
+
+# Exportvoreinstellung je Dateiendung (siehe core/encoders.py); die PIL-Vorgaben, wie Image.save()
+DEFAULT_ENCODER_PRESETS = {
+    ".jpg": "jpeg",
+    ".jpeg": "jpeg",
+    ".png": "png",
+    ".bmp": "bmp",
+    ".gif": "gif",
+    ".webp": "webp",
+    ".tif": "tiff",
+    ".tiff": "tiff",
+    ".avif": "avif",
+}
 
 # Weitere Konfigurationsoptionen...
\ No newline at end of file
@@ -0,0 +1,246 @@
+import threading
+import numpy as np
+from src.core import profiler
+from src.core.color_transform import ColorTransform, RenderCancelled, estimate_mean_luma
+from src.core.geometry import Geometry
+
+# Reihenfolge, in der die Regler-Anpassungen auf das Original angewendet werden
+ADJUSTMENT_ORDER = ("brightness", "contrast", "grayscale", "sepia")
+
+# Kleinste Kantenlänge, bis zu der Vorschau-Proxys verkleinert werden
+MIN_PROXY_SIZE = 256
+
+
+def downsample_half(array):
+    """Halbiert ein RGBA-uint8-Array per 2x2-Mittelwert (ungerade Ränder entfallen)."""
+    height, width = array.shape[0] // 2 * 2, array.shape[1] // 2 * 2
+    acc = array[0:height:2, 0:width:2].astype(np.uint16)
+    acc += array[1:height:2, 0:width:2]
+    acc += array[0:height:2, 1:width:2]
+    acc += array[1:height:2, 1:width:2]
+    acc += 2
+    acc >>= 2
+    return acc.astype(np.uint8)
+
+
+def proxy_level_for_scale(view_scale, max_level):
+    """Gröbste Proxy-Stufe, deren Auflösung bei view_scale noch mindestens einem Bildschirmpixel entspricht."""
+    if view_scale <= 0:
+        return max_level
+    level = int(np.floor(np.log2(1 / view_scale))) if view_scale < 1 else 0
+    return max(0, min(level, max_level))
+
+
+def _check_source(array):
+    if array.ndim != 3 or array.shape[2] != 4 or array.dtype != np.uint8:
+        raise ValueError(f"Erwartet RGBA-uint8-Array, erhalten {array.shape} {array.dtype}")
+
+
+class AdjustmentPipeline:
+    """Nicht-destruktiver Anpassungsstapel über einem gecachten Originalpuffer.
+
+    Das dekodierte Original wird einmal als RGBA-uint8-Array gehalten, die
+    Reglerwerte als Operationen. Jede Änderung rendert vom Original aus neu;
+    Ergebnisse unveränderter vorderer Stufen werden wiederverwendet. Die
+    Farbregler werden dabei zu einer einzigen ColorTransform-Stufe gefaltet.
+
+    Für die Vorschau kann auf verkleinerten Proxys (Stufe n = 1/2^n der
+    Auflösung) gerendert werden; die Proxys werden pro Original einmal erzeugt.
+
+    Drehen und Spiegeln ändern nur geometry; gerendert wird immer in der
+    Ausrichtung des Originals, umkopiert erst in render_export().
+    """
+
+    def __init__(self, source=None):
+        self._source = None
+        self._size = None
+        self._load_lock = threading.Lock()
+        self.params = {name: 0 for name in ADJUSTMENT_ORDER}
+        self._stage_cache = {}
+        self._proxies = {}
+        self._proxy_loader = None
+        self._mean_luma = None
+        self.revision = 0
+        self.geometry = Geometry()
+        if source is not None:
+            self.set_source(source)
+
+    def set_source(self, array, proxy_loader=None, size=None):
+        """Setzt ein neues Original und verwirft alle gecachten Stufen.
+
+        proxy_loader(level) kann bereits vorhandene Proxys liefern (z. B.
+        aus dem ImageCache); liefert er None, wird selbst verkleinert.
+        Ist array None, lädt proxy_loader(0) das Original erst beim ersten
+        Zugriff, z. B. im Render-Thread, während schon ein Proxy angezeigt
+        wird; size (Breite, Höhe) ist dann anzugeben.
+        """
+        if array is None:
+            if proxy_loader is None or size is None:
+                raise ValueError("Ohne Original sind proxy_loader und size erforderlich")
+        else:
+            _check_source(array)
+            size = (array.shape[1], array.shape[0])
+        self._source = array
+        self._size = tuple(size)
+        self._proxy_loader = proxy_loader
+        self._stage_cache = {}
+        self._proxies = {} if array is None else {0: array}
+        self._mean_luma = None
+        self.revision += 1
+        self.geometry = Geometry()
+
+    @property
+    def source(self):
+        """Original in voller Auflösung; ein verzögert gesetztes Original wird hier geladen."""
+        if self._source is None and self._size is not None:
+            with self._load_lock:
+                if self._source is None:
+                    array = self._proxy_loader(0)
+                    _check_source(array)
+                    self._proxies[0] = array
+                    self._source = array
+        return self._source
+
+    def has_source(self):
+        return self._size is not None
+
+    def source_loaded(self):
+        """False, solange ein verzögert gesetztes Original noch nicht geladen ist."""
+        return self._source is not None
+
+    def set_param(self, name, value):
+        """Setzt einen Reglerwert. Gibt True zurück, wenn sich etwas geändert hat."""
+        if name not in self.params:
+            raise KeyError(f"Unbekannte Anpassung: {name}")
+        if self.params[name] == value:
+            return False
+        self.params[name] = value
+        return True
+
+    def reset(self):
+        """Setzt alle Reglerwerte auf neutral zurück."""
+        for name in self.params:
+            self.params[name] = 0
+
+    def max_proxy_level(self):
+        """Höchste Proxy-Stufe, bei der die kürzere Kante nicht unter MIN_PROXY_SIZE fällt."""
+        if self._size is None:
+            return 0
+        level = 0
+        short_edge = min(self._size)
+        while short_edge // 2 >= MIN_PROXY_SIZE:
+            short_edge //= 2
+            level += 1
+        return level
+
+    def proxy(self, level):
+        """Original auf Stufe level (1/2^level der Auflösung), bei Bedarf erzeugt."""
+        proxies = self._proxies
+        level = max(0, min(level, self.max_proxy_level()))
+        if level == 0:
+            return self.source
+        if level not in proxies:
+            proxy = self._proxy_loader(level) if self._proxy_loader is not None else None
+            proxies[level] = proxy if proxy is not None else downsample_half(self.proxy(level - 1))
+        return proxies[level]
+
+    def color_transform(self, params=None):
+        """Kompiliert die Farbregler zu einer ColorTransform."""
+        params = self.params if params is None else params
+        source = self._source
+        if source is None:
+            # Bis das Original geladen ist, genügt für den Mittelwert der gröbste vorhandene Proxy
+            source = self._proxies[max(self._proxies)] if self._proxies else self.source
+        mean_luma = 128.0
+        if params["contrast"]:
+            # Der Mittelwert wird pro Quellpuffer gemerkt (auch bei Aufruf aus einem Worker)
+            cached = self._mean_luma
+            if cached is not None and cached[0] is source:
+                mean_luma = cached[1]
+            else:
+                mean_luma = estimate_mean_luma(source)
+                self._mean_luma = (source, mean_luma)
+        return ColorTransform.from_adjustments(mean_luma=mean_luma, **params)
+
+    def stages(self, params=None):
+        """Liste der aktiven Stufen als (Schlüssel, Funktion(array, cancelled))."""
+        params = self.params if params is None else params
+        stages = []
+        if any(params.values()):
+            key = ("color",) + tuple(params[name] for name in ADJUSTMENT_ORDER)
+            stages.append((key, self.color_transform(params).apply))
+        return stages
+
+    def snapshot(self):
+        """Kopie der aktuellen Reglerwerte, z. B. für das Rendern in einem Worker."""
+        return dict(self.params)
+
+    def render(self, params=None, cancelled=None, level=0):
+        """Rendert das Original mit den aktuellen (oder übergebenen) Reglerwerten.
+
+        level wählt die Proxy-Stufe (0 = volle Auflösung). Darf aus einem
+        Worker-Thread aufgerufen werden, solange nur ein Rendervorgang
+        gleichzeitig läuft. Liefert cancelled() True, wird zwischen den
+        Stufen bzw. Blöcken RenderCancelled ausgelöst.
+        """
+        if not self.has_source():
+            raise ValueError("Kein Quellbild gesetzt")
+
+        level = max(0, min(level, self.max_proxy_level()))
+        result = self.proxy(level)
+        prefix = (self.revision, level)
+        stage_cache = self._stage_cache.get(level, {})
+        live_cache = {}
+        with profiler.span("render", profiler.array_pixels(result)):
+            for key, apply in self.stages(params):
+                if cancelled is not None and cancelled():
+                    raise RenderCancelled()
+                prefix += (key,)
+                cached = stage_cache.get(prefix)
+                if cached is None:
+                    cached = apply(result, cancelled=cancelled)
+                live_cache[prefix] = cached
+                result = cached
+
+        # Pro Stufe nur die aktuelle Kette behalten, damit der Speicher begrenzt bleibt
+        self._stage_cache[level] = live_cache
+        return result
+
+    def render_export(self, params=None, geometry=None):
+        """Rendert in voller Auflösung und wendet die Geometrie mit einem einzigen Umkopieren an.
+
+        Mit Zuschnitt wird nur der betroffene Bereich des Originals gerendert.
+        geometry ersetzt die Geometrie der Pipeline für diesen Export.
+        """
+        geometry = self.geometry if geometry is None else geometry
+        if not self.has_source():
+            raise ValueError("Kein Quellbild gesetzt")
+        with profiler.span("export") as span:
+            if geometry.box is None:
+                result = geometry.apply(self.render(params))
+            else:
+                result = geometry.region(self.source)
+                for _, apply in self.stages(params):
+                    result = apply(result)
+                result = Geometry(geometry.turns, geometry.mirrored).apply(result)
+            span.pixels = profiler.array_pixels(result)
+            span.bytes = result.nbytes
+        return result
+
+    def source_size(self):
+        """Größe (Breite, Höhe) des Originals."""
+        return self._size
+
+    # Geometrische Operationen ändern nur die Beschreibung, nicht die Pixel
+
+    def rotate90(self):
+        """Dreht das Bild um 90 Grad gegen den Uhrzeigersinn."""
+        self.geometry = self.geometry.rotated(90)
+
+    def flip_horizontal(self):
+        """Spiegelt das Bild horizontal."""
+        self.geometry = self.geometry.flipped("horizontal")
+
+    def flip_vertical(self):
+        """Spiegelt das Bild vertikal."""
+        self.geometry = self.geometry.flipped("vertical")
@@ -0,0 +1,130 @@
+import functools
+import hashlib
+import json
+import os
+import tempfile
+
+MANIFEST_NAME = ".cineaexpress_manifest.jsonl"
+
+
+def recipe_hash(ops):
+    """Stabiler Hash eines Rezepts (unabhängig von der Schlüsselreihenfolge).
+
+    Schritte mit Dateiverweis (z. B. {"op": "lut", "path": ...}) gehen mit
+    Größe, mtime und Inhaltshash der Datei ein; eine geänderte LUT unter
+    gleichem Namen macht die Ausgaben also ungültig.
+    """
+    files = {step["path"]: _file_fingerprint(step["path"])
+             for step in ops if isinstance(step, dict) and isinstance(step.get("path"), str)}
+    payload = json.dumps({"ops": ops, "files": files} if files else ops, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _file_fingerprint(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        # Fehlt die Datei, scheitert ohnehin das Rendern
+        return None
+    return [stat.st_size, stat.st_mtime_ns, _cached_file_hash(os.path.abspath(path), stat.st_size, stat.st_mtime_ns)]
+
+
+@functools.lru_cache(maxsize=64)
+def _cached_file_hash(path, size, mtime_ns):
+    # Größe und mtime im Schlüssel: pro Bild eines Stapels wird die LUT nicht erneut gelesen
+    return file_hash(path)
+
+
+def content_hash(data):
+    """Inhaltshash von Dateibytes."""
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """Inhaltshash einer Datei, blockweise gelesen."""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BatchManifest:
+    """Auftragsmanifest für inkrementelle und fortsetzbare Stapelläufe.
+
+    Pro Bild werden Eingabepfad, Größe, mtime, Inhaltshash, Rezept-Hash und
+    Ausgabepfad festgehalten. Einträge werden nach jedem fertigen Bild als
+    JSON-Zeile angehängt, sodass ein abgebrochener Lauf beim nächsten Start
+    dort weitermacht, wo er aufgehört hat.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self._handle = None
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Unvollständige letzte Zeile nach einem Absturz
+                    continue
+                self.entries[entry["input"]] = entry
+
+    def is_current(self, image_path, output_path, ops_hash):
+        """True, wenn Eingabe, Rezept und Ausgabe seit dem letzten Lauf unverändert sind."""
+        entry = self.entries.get(image_path)
+        if entry is None or entry["recipe"] != ops_hash or entry["output"] != output_path:
+            return False
+        if not os.path.exists(output_path):
+            return False
+        try:
+            stat = os.stat(image_path)
+        except OSError:
+            return False
+        if stat.st_size == entry["size"] and stat.st_mtime_ns == entry["mtime_ns"]:
+            return True
+        if stat.st_size != entry["size"]:
+            return False
+        # Nur berührt (z. B. kopiert)? Dann entscheidet der Inhaltshash
+        if file_hash(image_path) != entry["hash"]:
+            return False
+        self.record(image_path, output_path, ops_hash, stat.st_size, stat.st_mtime_ns, entry["hash"])
+        return True
+
+    def record(self, image_path, output_path, ops_hash, size, mtime_ns, digest):
+        """Hängt einen Eintrag für ein fertig verarbeitetes Bild an."""
+        entry = {
+            "input": image_path,
+            "size": size,
+            "mtime_ns": mtime_ns,
+            "hash": digest,
+            "recipe": ops_hash,
+            "output": output_path,
+        }
+        self.entries[image_path] = entry
+        if self._handle is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._handle = open(self.path, "a", encoding="utf-8")
+        self._handle.write(json.dumps(entry) + "\n")
+        self._handle.flush()
+
+    def compact(self):
+        """Schreibt das Manifest ohne überholte Einträge atomar neu."""
+        self.close()
+        directory = os.path.dirname(self.path) or "."
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".manifest-")
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            for entry in self.entries.values():
+                handle.write(json.dumps(entry) + "\n")
+        os.replace(tmp_path, self.path)
+
+    def close(self):
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
@@ -1,21 +1,334 @@
+import glob
+import io
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from PIL import Image
+from src.config import settings
+from src.core import encoders
 from src.core.image_processor import ImageProcessor
 from src.core.file_manager import FileManager
+from src.core.image_cache import default_cache
+from src.core.recipe import apply_recipe, compile_recipe, validate_recipe
+from src.core.tiling import TiledImage, apply_recipe_tiled, needs_tiling
+from src.core.batch_manifest import MANIFEST_NAME, BatchManifest, content_hash, file_hash, recipe_hash
+
+logger = logging.getLogger(__name__)
+
+# Kompiliertes Rezept des aktuellen Worker-Prozesses (siehe _init_worker)
+_worker_ops = None
+# Gemeinsames Rezept vor dem Kompilieren und bake_luts, für Bilder mit eigenen Operationen
+_worker_source = ([], True)
+
+
+@dataclass
+class BatchItemResult:
+    """Ergebnis eines einzelnen Bildes im Stapel."""
+    image_path: str
+    output_path: str
+    seconds: float = 0.0
+    pixels: int = 0
+    error: str = None
+    skipped: bool = False
+    size: int = 0
+    mtime_ns: int = 0
+    content_hash: str = None
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+@dataclass
+class BatchSummary:
+    """Zusammenfassung eines Stapellaufs (Durchsatz und Fehler)."""
+    results: list = field(default_factory=list)
+    wall_seconds: float = 0.0
+    workers: int = 1
+    stages: object = None  # PipelineStats bei gestaffelter Ein-/Ausgabe
+
+    @property
+    def processed(self):
+        return sum(1 for result in self.results if result.ok and not result.skipped)
+
+    @property
+    def skipped(self):
+        return sum(1 for result in self.results if result.skipped)
+
+    @property
+    def failed(self):
+        return [result for result in self.results if not result.ok]
+
+    @property
+    def images_per_second(self):
+        return self.processed / self.wall_seconds if self.wall_seconds else 0.0
+
+    @property
+    def megapixels_per_second(self):
+        pixels = sum(result.pixels for result in self.results if result.ok and not result.skipped)
+        return pixels / 1e6 / self.wall_seconds if self.wall_seconds else 0.0
+
+    def __str__(self):
+        return (f"{self.processed}/{len(self.results)} Bilder in {self.wall_seconds:.2f} s "
+                f"({self.skipped} unverändert übersprungen, {self.images_per_second:.2f} Bilder/s, {self.megapixels_per_second:.1f} MPix/s, "
+                f"{self.workers} Worker, {len(self.failed)} Fehler)"
+                + (f"; Auslastung {self.stages}" if self.stages is not None else ""))
+
+
+def expand_inputs(inputs):
+    """Erweitert Pfade und Glob-Muster zu einer sortierten, eindeutigen Dateiliste."""
+    if isinstance(inputs, str):
+        inputs = [inputs]
+    paths = []
+    for entry in inputs:
+        matches = sorted(glob.glob(entry)) if glob.has_magic(entry) else [entry]
+        paths.extend(matches)
+    return list(dict.fromkeys(paths))
+
+
+def _init_worker(ops, source_ops=None, bake_luts=True):
+    """Übergibt das kompilierte Rezept einmal pro Worker statt pro Bild.
+
+    source_ops ist das gemeinsame Rezept vor dem Kompilieren; damit setzt
+    der Worker die Rezepte von Bildern mit eigenen Operationen selbst
+    zusammen, statt eine gebackene LUT pro Bild zugeschickt zu bekommen.
+    """
+    global _worker_ops, _worker_source
+    _worker_ops = ops
+    _worker_source = (source_ops or [], bake_luts)
+
+
+def compose_recipe(item_ops, ops, bake_luts=True):
+    """Rezept eines Bildes: eigene Operationen vor dem gemeinsamen Rezept, mit bake_luts gemeinsam gebacken."""
+    return compile_recipe(item_ops + ops) if bake_luts else item_ops + ops
+
+
+def worker_recipe(item_ops=None):
+    """Rezept eines Bildes im Worker-Prozess (siehe _init_worker)."""
+    if not item_ops:
+        return _worker_ops
+    return compose_recipe(item_ops, *_worker_source)
+
+
+def render_image(image, ops):
+    """Wendet ein Rezept auf ein geöffnetes Bild an.
+
+    Bilder über settings.MAX_IMAGE_DIMENSION laufen kachelweise (siehe
+    core/tiling.py); das dekodierte PIL-Bild wird dann nach dem Umkopieren
+    sofort freigegeben.
+    """
+    if needs_tiling(image.size):
+        tiled = TiledImage.from_image(image)
+        image.close()
+        return apply_recipe_tiled(tiled, ops).to_pil()
+    image.load()
+    return apply_recipe(image, ops)
+
+
+def _open_input(image_path):
+    """Öffnet ein Eingabebild; liefert (Bild, Inhaltshash).
+
+    Normale Bilder werden einmal gelesen; aus denselben Bytes werden
+    Inhaltshash und Bild gewonnen. Bei Bildern über MAX_IMAGE_DIMENSION
+    (laut Dateikopf) bleiben die Dateibytes nicht zusätzlich im Speicher:
+    der Hash wird blockweise berechnet und PIL liest beim Dekodieren direkt
+    aus der Datei.
+    """
+    image = Image.open(image_path)
+    if needs_tiling(image.size):
+        return image, file_hash(image_path)
+    image.close()
+    with open(image_path, "rb") as handle:
+        data = handle.read()
+    return Image.open(io.BytesIO(data)), content_hash(data)
+
+
+def process_item(image_path, output_path, ops=None, preset=None, item_ops=None):
+    """Lädt, verarbeitet und speichert ein Bild (läuft im Worker-Prozess).
+
+    Ohne ops wird das beim Start des Workers übergebene Rezept verwendet,
+    mit item_ops davor; preset ist die Exportvoreinstellung (siehe
+    core/encoders.py).
+    """
+    ops = worker_recipe(item_ops) if ops is None else ops
+    start = time.perf_counter()
+    try:
+        stat = os.stat(image_path)
+        image, digest = _open_input(image_path)
+        with image:
+            result = render_image(image, ops)
+            encoders.save(result, output_path, preset)
+            pixels = result.width * result.height
+    except Exception as e:
+        return BatchItemResult(image_path, output_path, time.perf_counter() - start, error=str(e))
+    return BatchItemResult(image_path, output_path, time.perf_counter() - start, pixels,
+                           size=stat.st_size, mtime_ns=stat.st_mtime_ns, content_hash=digest)
+
 
 class BatchProcessor:
-    def __init__(self, image_paths):
-        self.image_paths = image_paths
+    def __init__(self, image_paths, max_workers=None, max_in_flight=None):
+        self.image_paths = expand_inputs(image_paths)
         self.file_manager = FileManager()
+        self.max_workers = max_workers or settings.BATCH_MAX_WORKERS or os.cpu_count() or 1
+        self.max_in_flight = max_in_flight or settings.BATCH_MAX_IN_FLIGHT or 2 * self.max_workers
 
     def process_images(self, output_directory, operation, *args):
         """Führt eine angegebene Operation auf alle Bilder aus."""
+        output_paths = self._output_paths(output_directory)
         for image_path in self.image_paths:
-            image = self.file_manager.load_image(image_path)
-            processor = ImageProcessor(image_path)
+            if not os.path.exists(image_path):
+                raise FileNotFoundError(f"Datei {image_path} nicht gefunden.")
+            image = default_cache().get_pil(image_path)
+            processor = ImageProcessor(image)
             processed_image = operation(processor, *args)
-            output_path = self._generate_output_path(image_path, output_directory)
+            output_path = output_paths[image_path]
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
             self.file_manager.save_image(processed_image, output_path)
 
-    def _generate_output_path(self, image_path, output_directory):
-        """Generiert den Ausgabepfad für ein Bild."""
+    def run(self, output_directory, ops, on_result=None, incremental=True, bake_luts=True, pipelined=None,
+            preset=None, item_ops=None):
+        """Verarbeitet alle Bilder mit einem Rezept parallel in Worker-Prozessen.
+
+        Höchstens max_in_flight Bilder sind gleichzeitig in Arbeit; jedes
+        Ergebnis wird sofort im Worker gespeichert und an on_result gemeldet.
+        Mit incremental werden Bilder, deren Eingabe und Rezept sich laut
+        Manifest nicht geändert haben, übersprungen; ein abgebrochener Lauf
+        wird so beim nächsten Aufruf fortgesetzt. Mit bake_luts werden
+        Folgen punktweiser Farboperationen einmal zu einer LUT gebacken.
+        Mit pipelined (Standard: settings.BATCH_PIPELINED) laufen Lesen,
+        Verarbeiten und Schreiben als überlappende Stufen (siehe
+        core/io_pipeline.py); summary.stages zeigt dann deren Auslastung.
+        preset wählt die Exportvoreinstellung (siehe core/encoders.py) und
+        damit auch die Dateiendung; ohne Angabe bleibt das Format der Eingabe.
+        Unterordner unterhalb des gemeinsamen Eingabeordners bleiben in der
+        Ausgabe erhalten; würden trotzdem zwei Bilder dieselbe Ausgabedatei
+        ergeben (z. B. A001.png und A001.jpg mit einer Voreinstellung), bricht
+        der Lauf vor dem ersten Auftrag mit ValueError ab.
+        item_ops ordnet einzelnen Bildpfaden zusätzliche Operationen zu, die
+        vor dem gemeinsamen Rezept laufen (z. B. Korrekturen aus
+        core/matching.py); sie gehen in den Manifest-Hash des Bildes ein.
+        """
+        ops = validate_recipe(ops)
+        item_ops = {path: validate_recipe(extra) for path, extra in (item_ops or {}).items() if extra}
+        os.makedirs(output_directory, exist_ok=True)
+        if preset is not None:
+            preset = encoders.get_preset(preset)
+        # Eine andere Voreinstellung ergibt andere Ausgabedateien
+        encoder_ops = [] if preset is None else [{"encoder": preset.to_dict()}]
+        ops_hash = recipe_hash(ops + encoder_ops)
+        output_paths = self._output_paths(output_directory, preset)
+        manifest = BatchManifest(os.path.join(output_directory, MANIFEST_NAME)) if incremental else None
+        summary = BatchSummary(workers=self.max_workers)
+        start = time.perf_counter()
+
+        jobs = []
+        hashes = {}
+        for image_path in self.image_paths:
+            output_path = output_paths[image_path]
+            extra = item_ops.get(image_path)
+            hashes[image_path] = ops_hash if extra is None else recipe_hash(extra + ops + encoder_ops)
+            if manifest is not None and manifest.is_current(image_path, output_path, hashes[image_path]):
+                result = BatchItemResult(image_path, output_path, skipped=True)
+                summary.results.append(result)
+                self._report(result, on_result)
+            else:
+                os.makedirs(os.path.dirname(output_path), exist_ok=True)
+                jobs.append((image_path, output_path))
+
+        try:
+            if jobs:
+                # Das gemeinsame Rezept wird einmal gebacken; eigene Operationen gehen ungebacken mit dem
+                # Auftrag und werden erst im Worker davorgesetzt (eine gebackene LUT wären ~1 MB pro Bild)
+                recipe = (compile_recipe(ops) if bake_luts else ops, ops, bake_luts)
+                jobs = [(image_path, output_path, item_ops.get(image_path)) for image_path, output_path in jobs]
+                if settings.BATCH_PIPELINED if pipelined is None else pipelined:
+                    self._run_pipelined(jobs, recipe, hashes, manifest, summary, on_result, preset)
+                else:
+                    self._run_jobs(jobs, recipe, hashes, manifest, summary, on_result, preset)
+        finally:
+            if manifest is not None:
+                manifest.compact()
+
+        summary.wall_seconds = time.perf_counter() - start
+        logger.info("Stapel abgeschlossen: %s", summary)
+        return summary
+
+    def _run_jobs(self, jobs, recipe, hashes, manifest, summary, on_result, preset=None):
+        pending = iter(jobs)
+        # spawn statt fork: in der GUI laufen bereits Qt-Threads, deren Sperren ein Fork erben würde
+        with ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_init_worker, initargs=recipe) as executor:
+            in_flight = set()
+            while True:
+                for image_path, output_path, item_ops in pending:
+                    in_flight.add(executor.submit(process_item, image_path, output_path, None, preset, item_ops))
+                    if len(in_flight) >= self.max_in_flight:
+                        break
+                if not in_flight:
+                    break
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    if manifest is not None and result.ok:
+                        manifest.record(result.image_path, result.output_path, hashes[result.image_path],
+                                        result.size, result.mtime_ns, result.content_hash)
+                    summary.results.append(result)
+                    self._report(result, on_result)
+
+    def _run_pipelined(self, jobs, recipe, hashes, manifest, summary, on_result, preset=None):
+        from src.core.io_pipeline import IOPipeline
+
+        def finished(result):
+            if manifest is not None and result.ok:
+                manifest.record(result.image_path, result.output_path, hashes[result.image_path],
+                                result.size, result.mtime_ns, result.content_hash)
+            summary.results.append(result)
+            self._report(result, on_result)
+
+        compiled, ops, bake_luts = recipe
+        pipeline = IOPipeline(compiled, process_workers=self.max_workers, max_in_flight=self.max_in_flight,
+                              preset=preset, source_ops=ops, bake_luts=bake_luts)
+        summary.stages = pipeline.run(jobs, finished)
+
+    def _report(self, result, on_result):
+        if result.skipped:
+            logger.debug("%s unverändert, übersprungen", result.image_path)
+        elif result.ok:
+            logger.debug("%s -> %s in %.3f s", result.image_path, result.output_path, result.seconds)
+        else:
+            logger.error("Fehler bei %s: %s", result.image_path, result.error)
+        if on_result is not None:
+            on_result(result)
+
+    def _output_paths(self, output_directory, preset=None):
+        """{Bildpfad: Ausgabepfad} für alle Bilder; ValueError, wenn zwei Bilder auf dieselbe Datei fallen."""
+        directories = [os.path.dirname(os.path.abspath(path)) for path in self.image_paths]
+        input_root = os.path.commonpath(directories) if directories else None
+        output_paths = {}
+        sources = {}
+        for image_path in self.image_paths:
+            output_path = self._generate_output_path(image_path, output_directory, preset, input_root)
+            key = os.path.normcase(output_path)
+            if key in sources:
+                raise ValueError(f"{sources[key]} und {image_path} ergeben dieselbe Ausgabedatei {output_path}")
+            sources[key] = image_path
+            output_paths[image_path] = output_path
+        return output_paths
+
+    def _generate_output_path(self, image_path, output_directory, preset=None, input_root=None):
+        """Generiert den Ausgabepfad für ein Bild (mit der Endung der Voreinstellung, falls angegeben).
+
+        Mit input_root bleibt der Unterordner des Bildes relativ dazu erhalten.
+        """
         base_name = os.path.basename(image_path)
+        root, extension = os.path.splitext(base_name)
+        if preset is not None and Image.registered_extensions().get(extension.lower()) != preset.format:
+            base_name = root + preset.extension
+        if input_root is not None:
+            subdirectory = os.path.relpath(os.path.dirname(os.path.abspath(image_path)), input_root)
+            if subdirectory != os.curdir:
+                return os.path.join(output_directory, subdirectory, base_name)
         return os.path.join(output_directory, base_name)
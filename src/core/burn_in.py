@@ -0,0 +1,224 @@
+"""Einbrennen von Rahmen, Letterbox-Maske und Szenentext in voller Auflösung.
+
+render_burn_in() zeichnet in einem Durchlauf direkt in ein RGB/RGBA-uint8-
+Array: erst die optionale Maske außerhalb des Rahmens, dann den Rahmen
+(Farbe, Strichstärke und Linienstil wie im FrameEditor), zuletzt Name und
+Beschreibung an den Positionen des TextOverlay. Glyphen werden pro
+Schriftgröße einmal gerastert und aus einem Cache geblittet; viele Bilder
+mit ähnlichem Text kosten danach kaum mehr als das Kopieren der Masken.
+
+Über offset/size lässt sich auch ein Ausschnitt (z. B. ein Streifen der
+kachelweisen Verarbeitung) eines größeren Bildes bearbeiten.
+"""
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+import numpy as np
+from PIL import Image, ImageColor, ImageDraw
+from src.config import settings
+from src.core.framing import frame_rect
+
+# Strichmuster in Vielfachen der Strichstärke (wie Qt.PenStyle)
+DASH_PATTERNS = {
+    "solid": None,
+    "dash": (4, 2),
+    "dot": (1, 2),
+    "dashdot": (4, 2, 1, 2),
+    "dashdotdot": (4, 2, 1, 2, 1, 2),
+}
+
+# Maximale Anzahl gecachter Glyphen
+GLYPH_CACHE_SIZE = 4096
+
+
+@dataclass
+class Glyph:
+    """Gerasterte Glyphe: Alphamaske, Versatz zum Schreibpunkt und Vorschub."""
+    mask: np.ndarray
+    left: int
+    top: int
+    advance: float
+
+
+class GlyphCache:
+    """LRU-Cache gerasterter Glyphen, Schlüssel (Schriftgröße, fett, Zeichen)."""
+
+    def __init__(self, max_entries=GLYPH_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._glyphs = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def glyph(self, char, size, bold=False):
+        key = (size, bold, char)
+        with self._lock:
+            glyph = self._glyphs.get(key)
+            if glyph is not None:
+                self._glyphs.move_to_end(key)
+                self.hits += 1
+                return glyph
+            self.misses += 1
+        glyph = self._rasterize(char, size, bold)
+        with self._lock:
+            self._glyphs[key] = glyph
+            while len(self._glyphs) > self.max_entries:
+                self._glyphs.popitem(last=False)
+        return glyph
+
+    def _rasterize(self, char, size, bold):
+        from src.core.recipe import load_font
+
+        font = load_font(size, bold)
+        left, top, right, bottom = font.getbbox(char)
+        mask = Image.new("L", (max(1, right - left), max(1, bottom - top)))
+        ImageDraw.Draw(mask).text((-left, -top), char, fill=255, font=font)
+        return Glyph(np.asarray(mask), left, top, font.getlength(char))
+
+
+_glyph_cache = GlyphCache()
+
+
+def points_to_pixels(points):
+    """Pixelgröße einer Schrift in Punkt, wie das TextOverlay sie zeichnet (settings.FONT_DPI)."""
+    return max(1, round(points * settings.FONT_DPI / 72))
+
+
+@dataclass
+class BurnInSpec:
+    """Was eingebrannt wird; Koordinaten in Pixeln des vollen Ausgabebildes.
+
+    frame_rect ist (left, top, right, bottom) oder None; dann wird das
+    Rechteck wie im Editor aus frame_format und frame_width (in %) berechnet.
+    font_size ist in Pixeln (Punktgrößen aus der Oberfläche: points_to_pixels).
+    """
+    frame_rect: tuple = None
+    frame_format: tuple = settings.DEFAULT_FRAME_FORMAT
+    frame_width: float = settings.DEFAULT_FRAME_WIDTH_PERCENTAGE
+    draw_frame: bool = True
+    frame_color: str = settings.DEFAULT_FRAME_COLOR
+    pen_width: int = 2
+    pen_style: str = "solid"
+    matte_color: str = None
+    matte_opacity: float = 1.0
+    name: str = ""
+    description: str = ""
+    font_size: int = settings.DEFAULT_FONT_SIZE
+    text_color: str = "#FFFFFF"
+
+    def resolve_frame_rect(self, size):
+        if self.frame_rect is not None:
+            return tuple(self.frame_rect)
+        return frame_rect(size, self.frame_format, self.frame_width)
+
+
+def _blend(region, color, alpha):
+    """Mischt color mit Deckkraft alpha (Skalar oder (h, w)-Array, 0..1) in region."""
+    if np.isscalar(alpha):
+        if alpha >= 1:
+            region[...] = color
+            return
+        mixed = region.astype(np.float32)
+    else:
+        mixed = region.astype(np.float32)
+        alpha = alpha[..., None]
+    mixed += (np.asarray(color, np.float32) - mixed) * alpha
+    region[...] = mixed + 0.5
+
+
+def _region(array, offset, left, top, right, bottom):
+    """Sicht auf den Teil von [left, right) x [top, bottom) (Bildkoordinaten), der im Ausschnitt liegt."""
+    dx, dy = offset
+    height, width = array.shape[:2]
+    x0, x1 = max(0, int(left) - dx), min(width, int(right) - dx)
+    y0, y1 = max(0, int(top) - dy), min(height, int(bottom) - dy)
+    if x0 >= x1 or y0 >= y1:
+        return None, (x0 + dx, y0 + dy)
+    return array[y0:y1, x0:x1, :3], (x0 + dx, y0 + dy)
+
+
+def _dash_mask(start, length, origin, pattern, pen_width):
+    """Bool-Maske entlang einer Kante für das Strichmuster (Phase ab origin)."""
+    scaled = np.repeat(np.array([index % 2 == 0 for index in range(len(pattern))]),
+                       [max(1, round(value * pen_width)) for value in pattern])
+    positions = (np.arange(start, start + length) - origin) % len(scaled)
+    return scaled[positions]
+
+
+def _draw_frame(array, offset, rect, color, pen_width, pen_style):
+    left, top, right, bottom = (round(value) for value in rect)
+    half = pen_width / 2
+    inner, outer = int(np.floor(half)), int(np.ceil(half))
+    pattern = DASH_PATTERNS.get(pen_style)
+    if pen_style not in DASH_PATTERNS:
+        raise ValueError(f"Unbekannter Linienstil: {pen_style}")
+    # Vier Bänder: oben/unten über die volle Breite, links/rechts dazwischen
+    bands = [
+        (left - outer, top - outer, right + inner, top + inner, "x", left),
+        (left - outer, bottom - outer, right + inner, bottom + inner, "x", left),
+        (left - outer, top + inner, left + inner, bottom - outer, "y", top),
+        (right - outer, top + inner, right + inner, bottom - outer, "y", top),
+    ]
+    for x0, y0, x1, y1, axis, origin in bands:
+        region, (rx, ry) = _region(array, offset, x0, y0, x1, y1)
+        if region is None:
+            continue
+        if pattern is None:
+            region[...] = color
+        elif axis == "x":
+            region[:, _dash_mask(rx, region.shape[1], origin, pattern, pen_width)] = color
+        else:
+            region[_dash_mask(ry, region.shape[0], origin, pattern, pen_width)] = color
+
+
+def _draw_matte(array, offset, size, rect, color, opacity):
+    left, top, right, bottom = (round(value) for value in rect)
+    width, height = size
+    for box in ((0, 0, width, top), (0, bottom, width, height), (0, top, left, bottom), (right, top, width, bottom)):
+        region, _ = _region(array, offset, *box)
+        if region is not None:
+            _blend(region, color, opacity)
+
+
+def draw_text_line(array, offset, position, text, size, color, bold=False, glyph_cache=None):
+    """Blittet eine Textzeile aus gecachten Glyphen; position ist der Schreibpunkt (links, Oberlänge)."""
+    glyph_cache = glyph_cache or _glyph_cache
+    x, y = position
+    for char in text:
+        glyph = glyph_cache.glyph(char, size, bold)
+        if not char.isspace():
+            gx, gy = round(x + glyph.left), round(y + glyph.top)
+            mask_height, mask_width = glyph.mask.shape
+            region, (rx, ry) = _region(array, offset, gx, gy, gx + mask_width, gy + mask_height)
+            if region is not None:
+                mask = glyph.mask[ry - gy:ry - gy + region.shape[0], rx - gx:rx - gx + region.shape[1]]
+                _blend(region, color, mask.astype(np.float32) / 255)
+        x += glyph.advance
+
+
+def render_burn_in(array, spec, offset=(0, 0), size=None, glyph_cache=None):
+    """Brennt spec in array ein (in place) und gibt array zurück.
+
+    array ist ein RGB/RGBA-uint8-Array, das den Ausschnitt ab offset eines
+    Bildes der Größe size zeigt (Standard: das ganze Bild).
+    """
+    size = size or (array.shape[1], array.shape[0])
+    rect = spec.resolve_frame_rect(size)
+    if spec.matte_color is not None:
+        _draw_matte(array, offset, size, rect, ImageColor.getrgb(spec.matte_color), spec.matte_opacity)
+    if spec.draw_frame and spec.pen_width > 0:
+        _draw_frame(array, offset, rect, ImageColor.getrgb(spec.frame_color), spec.pen_width, spec.pen_style)
+    if spec.name or spec.description:
+        from PySide6.QtCore import QRectF
+        from src.services.text_service import TextService
+
+        text_service = TextService()
+        name, description = text_service.format_scene_text(spec.name, spec.description)
+        frame = QRectF(rect[0], rect[1], rect[2] - rect[0], rect[3] - rect[1])
+        name_pos, desc_pos = text_service.calculate_text_positions(frame, spec.font_size)
+        color = ImageColor.getrgb(spec.text_color)
+        # Wie im TextOverlay: Name fett, Beschreibung normal
+        draw_text_line(array, offset, (name_pos.x(), name_pos.y()), name, spec.font_size, color, True, glyph_cache)
+        draw_text_line(array, offset, (desc_pos.x(), desc_pos.y()), description, spec.font_size, color, False,
+                       glyph_cache)
+    return array
@@ -0,0 +1,149 @@
+import numpy as np
+from src.core import profiler
+
+LUMA_WEIGHTS = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+SEPIA_MATRIX = np.array([
+    [0.393, 0.769, 0.189],
+    [0.349, 0.686, 0.168],
+    [0.272, 0.534, 0.131]
+], dtype=np.float32)
+
+
+class RenderCancelled(Exception):
+    """Wird ausgelöst, wenn ein Rendervorgang durch einen neueren ersetzt wurde."""
+
+
+# Pixel pro Block im Matrixpfad; begrenzt die float32-Zwischenpuffer auf ~12 MB
+CHUNK_PIXELS = 1 << 20
+
+
+def _affine(linear, offset=0.0):
+    """Baut eine homogene 4x4-Matrix aus einem 3x3-Anteil und einem Offset."""
+    matrix = np.eye(4, dtype=np.float32)
+    matrix[:3, :3] = linear
+    matrix[:3, 3] = offset
+    return matrix
+
+
+def estimate_mean_luma(array, max_samples=65536):
+    """Schätzt den mittleren Grauwert auf einem gleichmäßig ausgedünnten Raster."""
+    height, width = array.shape[:2]
+    step = max(1, int(np.sqrt(height * width / max_samples)))
+    sample = array[::step, ::step, :3].astype(np.float32)
+    return float((sample @ LUMA_WEIGHTS).mean())
+
+
+class ColorTransform:
+    """Kompilierte Farbtransformation: eine 3x4-Affinmatrix plus Clamping.
+
+    Helligkeit, Kontrast, Graustufen- und Sepia-Mischung werden in eine
+    Matrix gefaltet und in einem einzigen Durchlauf angewendet. Sind die
+    Operationen kanalweise trennbar, läuft die Anwendung über eine LUT mit
+    256 Einträgen pro Kanal.
+    """
+
+    def __init__(self, matrix=None):
+        self.matrix = np.eye(4, dtype=np.float32) if matrix is None else np.asarray(matrix, dtype=np.float32)
+        self._luts = None
+
+    @classmethod
+    def from_adjustments(cls, brightness=0, contrast=0, grayscale=0, sepia=0, mean_luma=128.0):
+        """Faltet die vier Reglerwerte (wie in der Oberfläche) zu einer Transformation.
+
+        mean_luma ist der mittlere Grauwert des Quellbildes; der Kontrast
+        skaliert wie ImageEnhance.Contrast um den Mittelwert nach der Helligkeit.
+        """
+        transform = cls()
+        brightness_factor = 1 + brightness / 100
+        if brightness:
+            transform = transform.then(_affine(np.eye(3) * brightness_factor))
+        if contrast:
+            factor = 1 + contrast / 100
+            pivot = int(min(255.0, mean_luma * brightness_factor) + 0.5)
+            transform = transform.then(_affine(np.eye(3) * factor, (1 - factor) * pivot))
+        if grayscale:
+            t = grayscale / 100
+            gray = np.outer(np.ones(3), LUMA_WEIGHTS)
+            transform = transform.then(_affine((1 - t) * np.eye(3) + t * gray))
+        if sepia:
+            t = sepia / 100
+            transform = transform.then(_affine((1 - t) * np.eye(3) + t * SEPIA_MATRIX))
+        return transform
+
+    @classmethod
+    def from_gains(cls, gains, offset=0.0):
+        """Kanalweise Verstärkung plus gemeinsamer Offset (Belichtung, Weißabgleich, Kontrast um einen Drehpunkt)."""
+        return cls(_affine(np.diag(np.asarray(gains, dtype=np.float32)), offset))
+
+    def then(self, other):
+        """Gibt eine Transformation zurück, die erst self und dann other anwendet."""
+        other = other.matrix if isinstance(other, ColorTransform) else np.asarray(other, dtype=np.float32)
+        return ColorTransform(other @ self.matrix)
+
+    @property
+    def affine(self):
+        """Die 3x4-Affinmatrix (linearer Anteil und Offset)."""
+        return self.matrix[:3]
+
+    def is_identity(self):
+        return np.allclose(self.matrix, np.eye(4), atol=1e-6)
+
+    def is_separable(self):
+        """True, wenn jeder Ausgabekanal nur vom gleichen Eingabekanal abhängt."""
+        linear = self.matrix[:3, :3]
+        return np.allclose(linear, np.diag(np.diag(linear)), atol=1e-6)
+
+    def luts(self):
+        """Kanalweise 256-Einträge-LUTs (3, 256) für trennbare Transformationen."""
+        if self._luts is None:
+            levels = np.arange(256, dtype=np.float32)
+            scale = np.diag(self.matrix[:3, :3])[:, np.newaxis]
+            offset = self.matrix[:3, 3][:, np.newaxis]
+            values = levels * scale + offset + 0.5
+            self._luts = np.clip(values, 0, 255).astype(np.uint8)
+        return self._luts
+
+    def apply_float(self, rgb):
+        """Wendet die Transformation auf float32-Farben (n, 3) im Bereich 0..255 an."""
+        result = rgb @ self.matrix[:3, :3].T + self.matrix[:3, 3]
+        return np.clip(result, 0, 255, out=result)
+
+    def apply(self, array, out=None, cancelled=None):
+        """Wendet die Transformation auf ein RGB- oder RGBA-uint8-Array an.
+
+        Es wird genau ein Ausgabepuffer angelegt (oder out verwendet); ein
+        Alphakanal wird unverändert übernommen. Liefert cancelled() zwischen
+        zwei Blöcken True, wird RenderCancelled ausgelöst.
+        """
+        if array.dtype != np.uint8 or array.ndim != 3 or array.shape[2] not in (3, 4):
+            raise ValueError(f"Erwartet RGB/RGBA-uint8-Array, erhalten {array.shape} {array.dtype}")
+        with profiler.span("adjust", array.shape[0] * array.shape[1], 0 if out is not None else array.nbytes):
+            return self._apply(array, out, cancelled)
+
+    def _apply(self, array, out, cancelled):
+        if out is None:
+            out = np.empty_like(array)
+        if array.shape[2] == 4 and out is not array:
+            out[..., 3] = array[..., 3]
+
+        if self.is_separable():
+            for channel, lut in enumerate(self.luts()):
+                if cancelled is not None and cancelled():
+                    raise RenderCancelled()
+                out[..., channel] = lut[array[..., channel]]
+            return out
+
+        linear = self.matrix[:3, :3].T.copy()
+        offset = self.matrix[:3, 3] + 0.5
+        height, width = array.shape[:2]
+        rows = max(1, CHUNK_PIXELS // max(1, width))
+        for top in range(0, height, rows):
+            if cancelled is not None and cancelled():
+                raise RenderCancelled()
+            block = array[top:top + rows, :, :3].astype(np.float32)
+            mixed = block @ linear
+            mixed += offset
+            np.clip(mixed, 0, 255, out=mixed)
+            out[top:top + rows, :, :3] = mixed
+        return out
@@ -0,0 +1,211 @@
+"""Rückgängig/Wiederholen über Operationslisten statt Pixelkopien.
+
+Ein Bearbeitungsschritt ist eine kurze Liste von Operationen (Dictionaries),
+z. B. [{"op": "rotate", "angle": 90}, {"op": "frame", "rect": [...]}].
+Der Zustand (Reglerwerte, Geometrie, Rahmen, Szenentext, Exportzuschnitt)
+ergibt sich durch Abspielen der Schritte ab einem Ausgangszustand; alle
+checkpoint_interval Schritte wird ein Zustand gemerkt, damit nie mehr als
+so viele Schritte abgespielt werden müssen. Ein Schritt kostet so einige
+hundert Bytes, unabhängig von der Bildgröße.
+
+Gerendert wird nach Undo/Redo wie immer aus dem gecachten Original. Optional
+werden gerenderte Arrays als Pixel-Checkpoints gehalten (Schlüssel:
+Reglerwerte und Proxy-Stufe), begrenzt durch ein Byte-Budget; ein Sprung
+zu einem solchen Zustand braucht dann gar kein Rendern.
+"""
+import copy
+import json
+import time
+from collections import OrderedDict
+from src.config import settings
+from src.core.adjustment_pipeline import ADJUSTMENT_ORDER
+from src.core.geometry import Geometry
+
+
+def initial_state(params=None):
+    """Zustand eines frisch geladenen Bildes."""
+    return {
+        "params": dict(params) if params is not None else {name: 0 for name in ADJUSTMENT_ORDER},
+        "geometry": [0, False, None],
+        "frame": None,
+        "text": None,
+        "export_crop": False,
+    }
+
+
+def state_geometry(state):
+    """Geometry eines Zustands."""
+    turns, mirrored, box = state["geometry"]
+    return Geometry(turns, mirrored, box)
+
+
+def apply_op(state, op):
+    """Wendet eine Operation auf einen Zustand an (der übergebene Zustand bleibt unverändert)."""
+    state = copy.deepcopy(state)
+    kind = op["op"]
+    if kind == "adjust":
+        if op["name"] not in state["params"]:
+            raise ValueError(f"Unbekannte Anpassung: {op['name']}")
+        state["params"][op["name"]] = op["value"]
+    elif kind in ("rotate", "flip"):
+        geometry = state_geometry(state)
+        geometry = geometry.rotated(op.get("angle", 90)) if kind == "rotate" \
+            else geometry.flipped(op.get("direction", "horizontal"))
+        state["geometry"] = [geometry.turns, geometry.mirrored, geometry.box]
+    elif kind == "frame":
+        state["frame"] = list(op["rect"]) if op.get("rect") is not None else None
+    elif kind == "text":
+        state["text"] = {key: op[key] for key in ("name", "description", "font_size")}
+    elif kind == "export_crop":
+        state["export_crop"] = bool(op["enabled"])
+    else:
+        raise ValueError(f"Unbekannte Operation im Verlauf: {kind}")
+    return state
+
+
+def pixel_key(params, level=0):
+    """Schlüssel eines Pixel-Checkpoints: Reglerwerte und Proxy-Stufe."""
+    return tuple(params[name] for name in ADJUSTMENT_ORDER) + (level,)
+
+
+class EditHistory:
+    """Verlauf aus Schritten (Operationslisten) mit Undo/Redo und begrenzten Pixel-Checkpoints."""
+
+    def __init__(self, state=None, max_steps=None, checkpoint_interval=None, pixel_budget=None,
+                 merge_seconds=None):
+        self.max_steps = max_steps or settings.HISTORY_MAX_STEPS
+        self.checkpoint_interval = checkpoint_interval or settings.HISTORY_CHECKPOINT_INTERVAL
+        self.pixel_budget = settings.HISTORY_PIXEL_BUDGET if pixel_budget is None else pixel_budget
+        self.merge_seconds = settings.HISTORY_MERGE_SECONDS if merge_seconds is None else merge_seconds
+        self.reset(state)
+
+    def reset(self, state=None):
+        """Beginnt einen neuen Verlauf (z. B. nach dem Laden eines Bildes)."""
+        self.base = copy.deepcopy(state) if state is not None else initial_state()
+        self.steps = []
+        self.index = 0  # Anzahl der angewendeten Schritte
+        self._snapshots = {0: self.base}
+        self._state = self.base
+        self._last_record = None
+        self._pixels = OrderedDict()
+        self.pixel_bytes = 0
+
+    @property
+    def state(self):
+        """Aktueller Zustand (nicht verändern)."""
+        return self._state
+
+    def can_undo(self):
+        return self.index > 0
+
+    def can_redo(self):
+        return self.index < len(self.steps)
+
+    def record(self, *ops, merge=False):
+        """Hängt einen Schritt an und verwirft Wiederholbares; liefert den neuen Zustand.
+
+        Mit merge wird der Schritt mit dem vorigen zusammengefasst, wenn
+        dieser dieselben Operationen (gleiche op und name) betraf und kurz
+        zuvor aufgezeichnet wurde; so wird ein Reglerzug zu einem Schritt.
+        """
+        ops = [dict(op) for op in ops]
+        state = self._state
+        for op in ops:
+            state = apply_op(state, op)
+        now = time.monotonic()
+        signature = [(op["op"], op.get("name")) for op in ops]
+        if merge and self._last_record is not None and self.index == len(self.steps) and self.index > 0 \
+                and self._last_record[0] == signature and now - self._last_record[1] <= self.merge_seconds:
+            self.steps[self.index - 1] = ops if all(op["op"] == "adjust" for op in ops) \
+                else self.steps[self.index - 1] + ops
+            self._snapshots.pop(self.index, None)
+        else:
+            del self.steps[self.index:]
+            self._snapshots = {index: snapshot for index, snapshot in self._snapshots.items() if index <= self.index}
+            self.steps.append(ops)
+            self.index += 1
+        self._last_record = (signature, now)
+        self._set_state(state)
+        self._trim()
+        return state
+
+    def undo(self):
+        """Geht einen Schritt zurück; liefert den Zustand oder None, wenn nichts rückgängig zu machen ist."""
+        if not self.can_undo():
+            return None
+        self.index -= 1
+        self._last_record = None
+        self._set_state(self.state_at(self.index))
+        return self._state
+
+    def redo(self):
+        """Wiederholt einen Schritt; liefert den Zustand oder None."""
+        if not self.can_redo():
+            return None
+        self._state = self._apply_step(self._state, self.steps[self.index])
+        self.index += 1
+        self._last_record = None
+        self._set_state(self._state)
+        return self._state
+
+    def state_at(self, index):
+        """Zustand nach index Schritten; abgespielt ab dem nächsten gemerkten Zustand."""
+        start = max(known for known in self._snapshots if known <= index)
+        state = self._snapshots[start]
+        for step in self.steps[start:index]:
+            state = self._apply_step(state, step)
+        return state
+
+    def _apply_step(self, state, step):
+        for op in step:
+            state = apply_op(state, op)
+        return state
+
+    def _set_state(self, state):
+        self._state = state
+        if self.index % self.checkpoint_interval == 0:
+            self._snapshots[self.index] = state
+
+    def _trim(self):
+        """Faltet die ältesten Schritte in den Ausgangszustand, wenn max_steps überschritten ist."""
+        excess = len(self.steps) - self.max_steps
+        if excess <= 0:
+            return
+        self.base = self.state_at(excess)
+        del self.steps[:excess]
+        self.index -= excess
+        self._snapshots = {index - excess: snapshot for index, snapshot in self._snapshots.items() if index > excess}
+        self._snapshots[0] = self.base
+
+    # Pixel-Checkpoints
+
+    def add_pixels(self, params, array, level=0):
+        """Merkt ein gerendertes Array zu den Reglerwerten params, solange das Budget reicht."""
+        if array.nbytes > self.pixel_budget:
+            return False
+        key = pixel_key(params, level)
+        if key in self._pixels:
+            self._pixels.move_to_end(key)
+            return True
+        self._pixels[key] = array
+        self.pixel_bytes += array.nbytes
+        while self.pixel_bytes > self.pixel_budget:
+            _, old = self._pixels.popitem(last=False)
+            self.pixel_bytes -= old.nbytes
+        return True
+
+    def pixels(self, params, level=0):
+        """Gemerktes Array zu params oder None."""
+        array = self._pixels.get(pixel_key(params, level))
+        if array is not None:
+            self._pixels.move_to_end(pixel_key(params, level))
+        return array
+
+    def wants_checkpoint(self):
+        """True, wenn zum aktuellen Schritt periodisch Pixel gemerkt werden sollen."""
+        return self.pixel_budget > 0 and self.index % self.checkpoint_interval == 0
+
+    def nbytes(self):
+        """Ungefährer Speicherbedarf: Schritte und gemerkte Zustände als JSON plus Pixel-Checkpoints."""
+        records = json.dumps([self.steps, list(self._snapshots.values())], separators=(",", ":"))
+        return len(records) + self.pixel_bytes
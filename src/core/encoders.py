@@ -0,0 +1,211 @@
+"""Kodierung von Exporten mit benannten Voreinstellungen pro Format.
+
+Eine Voreinstellung (EncoderPreset) legt Format und Kodierparameter fest,
+z. B. JPEG-Qualität, Farbunterabtastung und optimize, PNG-Kompressions-
+stufe, WebP-Methode oder 16 Bit je Kanal für TIFF. Ohne Angabe wird die
+Voreinstellung aus der Dateiendung gewählt (settings.DEFAULT_ENCODER_PRESETS).
+Diese Standardvoreinstellungen verwenden die Vorgaben von PIL und schreiben
+also dieselben Bytes wie Image.save(); alles andere muss gewählt werden.
+
+save() misst Zeit und Ausgabegröße jeder Kodierung; parallel geschrieben
+wird in den Schreib-Threads von core/io_pipeline.py. benchmark()
+vergleicht Voreinstellungen an einem Bild.
+"""
+import io
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+import numpy as np
+from PIL import Image, features
+from src.config import settings
+from src.core import profiler
+
+logger = logging.getLogger(__name__)
+
+# Formate, die keinen Alphakanal speichern können
+_NO_ALPHA = ("JPEG",)
+
+# Plugin, das ein Format zusätzlich zu PIL.Image.SAVE benötigt
+_FEATURES = {"WEBP": "webp", "AVIF": "avif"}
+
+
+@dataclass(frozen=True)
+class EncoderPreset:
+    """Format und Kodierparameter einer Exportvoreinstellung."""
+    name: str
+    format: str
+    extension: str
+    options: dict = field(default_factory=dict, hash=False)
+    bits: int = 8
+    description: str = ""
+
+    def available(self):
+        """True, wenn die installierte Pillow-Version das Format schreiben kann."""
+        if self.bits == 16:
+            try:
+                import cv2  # noqa: F401
+            except ImportError:
+                return False
+            return True
+        Image.init()
+        feature = _FEATURES.get(self.format)
+        return self.format in Image.SAVE and (feature is None or bool(features.check(feature)))
+
+    def to_dict(self):
+        return {"name": self.name, "format": self.format, "options": dict(self.options), "bits": self.bits}
+
+
+PRESETS = {preset.name: preset for preset in (
+    EncoderPreset("jpeg", "JPEG", ".jpg", description="PIL-Vorgabe: 4:2:0, Qualität 75"),
+    EncoderPreset("jpeg-444", "JPEG", ".jpg", {"quality": 90, "subsampling": 0},
+                  description="4:4:4, Qualität 90"),
+    EncoderPreset("jpeg-dailies", "JPEG", ".jpg", {"quality": 85, "subsampling": 2},
+                  description="4:2:0, ohne optimize: schnellste JPEG-Kodierung"),
+    EncoderPreset("jpeg-high", "JPEG", ".jpg", {"quality": 95, "subsampling": 0, "optimize": True},
+                  description="4:4:4, Qualität 95, optimierte Huffman-Tabellen"),
+    EncoderPreset("jpeg-web", "JPEG", ".jpg",
+                  {"quality": 80, "subsampling": 2, "optimize": True, "progressive": True},
+                  description="progressiv, klein"),
+    EncoderPreset("png", "PNG", ".png", {"compress_level": 6}),
+    EncoderPreset("png-fast", "PNG", ".png", {"compress_level": 1},
+                  description="etwas größer, mehrfach schneller"),
+    EncoderPreset("png-small", "PNG", ".png", {"compress_level": 9}),
+    EncoderPreset("webp", "WEBP", ".webp", description="PIL-Vorgabe: Qualität 80, Methode 4"),
+    EncoderPreset("webp-85", "WEBP", ".webp", {"quality": 85, "method": 4}),
+    EncoderPreset("webp-fast", "WEBP", ".webp", {"quality": 85, "method": 0}),
+    EncoderPreset("webp-lossless", "WEBP", ".webp", {"lossless": True, "quality": 50, "method": 3}),
+    EncoderPreset("avif", "AVIF", ".avif", description="PIL-Vorgabe"),
+    EncoderPreset("avif-fast", "AVIF", ".avif", {"quality": 75, "speed": 8}),
+    EncoderPreset("tiff", "TIFF", ".tif", description="PIL-Vorgabe: unkomprimiert"),
+    EncoderPreset("tiff-deflate", "TIFF", ".tif", {"compression": "tiff_adobe_deflate"},
+                  description="verlustfrei komprimiert"),
+    EncoderPreset("tiff-16", "TIFF", ".tif", {}, bits=16,
+                  description="16-Bit-Datei für 16-Bit-Workflows, über OpenCV; die 8-Bit-Werte werden nur "
+                              "x 257 gestreckt, das bringt keine zusätzliche Genauigkeit"),
+    EncoderPreset("bmp", "BMP", ".bmp"),
+    EncoderPreset("gif", "GIF", ".gif"),
+)}
+
+
+def get_preset(preset):
+    """EncoderPreset zu einem Namen (oder die übergebene Voreinstellung selbst)."""
+    if isinstance(preset, EncoderPreset):
+        return preset
+    try:
+        return PRESETS[preset]
+    except KeyError:
+        raise ValueError(f"Unbekannte Exportvoreinstellung: {preset}")
+
+
+def preset_for_path(path):
+    """Standardvoreinstellung für die Dateiendung von path."""
+    extension = os.path.splitext(path)[1].lower()
+    name = settings.DEFAULT_ENCODER_PRESETS.get(extension)
+    if name is None:
+        raise ValueError(f"Nicht unterstütztes Ausgabeformat: {extension or path}")
+    return PRESETS[name]
+
+
+def available_presets():
+    """Voreinstellungen, die in dieser Installation geschrieben werden können."""
+    return [preset for preset in PRESETS.values() if preset.available()]
+
+
+def supported_extensions():
+    """Dateiendungen aus settings.SUPPORTED_IMAGE_FORMATS, die sich hier schreiben lassen."""
+    return [extension for extension in settings.SUPPORTED_IMAGE_FORMATS
+            if extension in settings.DEFAULT_ENCODER_PRESETS
+            and PRESETS[settings.DEFAULT_ENCODER_PRESETS[extension]].available()]
+
+
+def _encode_16bit(image, preset):
+    import cv2
+
+    array = np.asarray(image.convert("RGBA" if "A" in image.getbands() else "RGB"))
+    # BGR(A)-Reihenfolge für OpenCV, 0..255 -> 0..65535
+    channels = array[..., [2, 1, 0, 3]] if array.shape[2] == 4 else array[..., ::-1]
+    ok, encoded = cv2.imencode(preset.extension, channels.astype(np.uint16) * 257)
+    if not ok:
+        raise ValueError(f"16-Bit-Kodierung für {preset.name} fehlgeschlagen")
+    return encoded.tobytes()
+
+
+def encode(image, preset):
+    """Kodiert ein PIL-Bild mit einer Voreinstellung; liefert die Dateibytes."""
+    preset = get_preset(preset)
+    if not preset.available():
+        raise ValueError(f"Format {preset.format} ({preset.name}) wird von dieser Installation nicht unterstützt")
+    with profiler.span("encode", image.width * image.height) as span:
+        if preset.bits == 16:
+            data = _encode_16bit(image, preset)
+        else:
+            if preset.format in _NO_ALPHA and image.mode not in ("RGB", "L", "CMYK"):
+                image = image.convert("RGB")
+            buffer = io.BytesIO()
+            image.save(buffer, preset.format, **preset.options)
+            data = buffer.getvalue()
+        span.bytes = len(data)
+    return data
+
+
+@dataclass
+class EncodeResult:
+    """Ergebnis einer Kodierung: Voreinstellung, Zeit und Größe."""
+    preset: str
+    seconds: float
+    bytes: int
+    pixels: int
+    path: str = None
+
+    @property
+    def bits_per_pixel(self):
+        return 8 * self.bytes / self.pixels if self.pixels else 0.0
+
+
+def save(image, path, preset=None):
+    """Kodiert image und schreibt es in einem Aufruf nach path; liefert ein EncodeResult.
+
+    Die Datei wird erst unter einem temporären Namen vollständig geschrieben
+    und dann umbenannt; ein abgebrochener Export hinterlässt keine halbe Datei.
+    """
+    preset = get_preset(preset) if preset is not None else preset_for_path(path)
+    start = time.perf_counter()
+    data = encode(image, preset)
+    seconds = time.perf_counter() - start
+    write(data, path)
+    return EncodeResult(preset.name, seconds, len(data), image.width * image.height, path)
+
+
+def write(data, path):
+    """Schreibt bereits kodierte Dateibytes nach path, erst unter temporärem Namen, dann umbenannt."""
+    # Kein mkstemp: das legt die Datei mit Rechten 0600 an, Exporte sollen der umask folgen
+    temporary = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    try:
+        with open(temporary, "wb") as output:
+            output.write(data)
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+
+
+def benchmark(image, presets=None, repeat=3):
+    """Misst Kodierzeit (Bestwert aus repeat Läufen) und Größe je Voreinstellung.
+
+    Liefert EncodeResults, sortiert nach Kodierzeit.
+    """
+    presets = [get_preset(preset) for preset in presets] if presets else available_presets()
+    results = []
+    for preset in presets:
+        best = None
+        for _ in range(max(1, repeat)):
+            start = time.perf_counter()
+            data = encode(image, preset)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        results.append(EncodeResult(preset.name, best, len(data), image.width * image.height))
+        logger.debug("%s: %.1f ms, %s Bytes", preset.name, best * 1000, len(data))
+    return sorted(results, key=lambda result: result.seconds)
@@ -1,5 +1,7 @@
 import os
 from PIL import Image
+from src.core import encoders
+from src.core.thumbnails import decode_thumbnail
 
 class FileManager:
     def __init__(self):
@@ -13,10 +15,21 @@ class FileManager:
         else:
             raise FileNotFoundError(f"Datei {image_path} nicht gefunden.")
 
-    def save_image(self, image, output_path):
-        """Speichert ein Bild auf der Festplatte."""
-        image.save(output_path)
+    def load_thumbnail(self, image_path, max_size=None):
+        """Lädt ein verkleinertes Vorschaubild, ohne das Bild in voller Größe zu dekodieren."""
+        if os.path.exists(image_path):
+            return decode_thumbnail(image_path, max_size)
+        else:
+            raise FileNotFoundError(f"Datei {image_path} nicht gefunden.")
+
+    def save_image(self, image, output_path, preset=None):
+        """Speichert ein Bild auf der Festplatte.
+
+        preset ist eine Exportvoreinstellung aus core/encoders.py; ohne
+        Angabe wird sie aus der Dateiendung gewählt. Liefert ein EncodeResult.
+        """
+        return encoders.save(image, output_path, preset)
 
     def get_supported_formats(self):
-        """Gibt eine Liste der unterstützten Bildformate zurück."""
-        return ["png", "jpg", "jpeg", "bmp", "gif"]
+        """Gibt eine Liste der unterstützten (in dieser Installation schreibbaren) Bildformate zurück."""
+        return [extension.lstrip(".") for extension in encoders.supported_extensions()]
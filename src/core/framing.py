@@ -0,0 +1,68 @@
+"""Rahmengeometrie für Export und Stapelverarbeitung.
+
+Das Rahmenrechteck ergibt sich wie im Editor (FrameService) aus
+Bildgröße, Seitenverhältnis und Breite in Prozent. In einem Stapel haben
+fast alle Bilder dieselbe Größe; die Rechtecke werden daher pro
+(Größe, Format, Breite) nur einmal berechnet und danach aus einem Cache
+gelesen.
+
+frame_box() liefert das ganzzahlige Rechteck, auf das beim Export
+zugeschnitten (mode "crop") bzw. außerhalb dessen maskiert wird
+(mode "letterbox"). Ragt der Rahmen über das Bild hinaus (z. B. 4:3 bei
+100 % Breite auf einem 16:9-Bild), wird er mit gleichem Seitenverhältnis
+in das Bild eingepasst.
+"""
+import functools
+from src.config import settings
+
+# Exportmodi der Operation reframe
+FRAME_MODES = ("crop", "letterbox")
+
+# Anzahl gemerkter Rahmenrechtecke (eins pro Bildgröße, Format und Breite)
+FRAME_CACHE_SIZE = 1024
+
+
+def parse_format(value):
+    """Seitenverhältnis als (Breite, Höhe) aus "16:9" oder einer Folge von Zahlen."""
+    if isinstance(value, str):
+        try:
+            width, height = map(float, value.split(':'))
+        except ValueError:
+            raise ValueError(f"Ungültiges Rahmenformat: {value}")
+        return width, height
+    return tuple(float(part) for part in value)
+
+
+@functools.lru_cache(maxsize=FRAME_CACHE_SIZE)
+def _frame_rect(size, frame_format, width):
+    from PySide6.QtCore import QRectF
+    from src.services.frame_service import FrameService
+
+    rect = FrameService().calculate_frame_rect(QRectF(0, 0, size[0], size[1]), frame_format, width)
+    return rect.left(), rect.top(), rect.right(), rect.bottom()
+
+
+def frame_rect(size, frame_format, width):
+    """Rahmenrechteck (left, top, right, bottom) wie im Editor, für ein Bild der Größe size."""
+    return _frame_rect(tuple(size), parse_format(frame_format), float(width))
+
+
+@functools.lru_cache(maxsize=FRAME_CACHE_SIZE)
+def _frame_box(size, frame_format, width):
+    image_width, image_height = size
+    left, top, right, bottom = _frame_rect(size, frame_format, width)
+    frame_width, frame_height = right - left, bottom - top
+    scale = min(1.0, image_width / frame_width, image_height / frame_height)
+    frame_width, frame_height = max(1, round(frame_width * scale)), max(1, round(frame_height * scale))
+    left, top = (image_width - frame_width) // 2, (image_height - frame_height) // 2
+    return left, top, left + frame_width, top + frame_height
+
+
+def frame_box(size, format=settings.DEFAULT_FRAME_FORMAT, width=100):
+    """Ganzzahliges, vollständig im Bild liegendes Rahmenrechteck für Zuschnitt bzw. Maske."""
+    return _frame_box(tuple(size), parse_format(format), float(width))
+
+
+def frame_cache_info():
+    """Trefferstatistik der Rahmenrechteck-Caches."""
+    return {"frame_rect": _frame_rect.cache_info(), "frame_box": _frame_box.cache_info()}
@@ -0,0 +1,195 @@
+"""Verzögerte Geometrie: Ausrichtung (Vielfache von 90°, Spiegelung) plus Zuschnitt.
+
+Drehen, Spiegeln und Zuschneiden verändern nur eine kleine Beschreibung
+(Geometry). Pixel werden erst beim Export in einem einzigen Schritt
+umkopiert; die Vorschau zeigt dieselbe Abbildung über matrix() als
+Item-Transformation an.
+"""
+import numpy as np
+from PIL import Image
+from src.core.framing import frame_box
+
+# PIL-Transpose je (Vierteldrehungen, gespiegelt); Spiegelung wird vor der Drehung angewendet
+_PIL_TRANSPOSE = {
+    (1, False): Image.ROTATE_90,
+    (2, False): Image.ROTATE_180,
+    (3, False): Image.ROTATE_270,
+    (0, True): Image.FLIP_LEFT_RIGHT,
+    (1, True): Image.TRANSPOSE,
+    (2, True): Image.FLIP_TOP_BOTTOM,
+    (3, True): Image.TRANSVERSE,
+}
+
+# Rezeptoperationen, die sich zu einer Geometry zusammenfassen lassen
+GEOMETRY_OPS = ("rotate", "flip", "crop", "reframe")
+
+
+def is_geometry_step(step):
+    """True für rotate (Vielfache von 90°), flip, crop und reframe mit Zuschnitt."""
+    if step["op"] == "rotate":
+        return step.get("angle", 90) % 90 == 0
+    if step["op"] == "reframe":
+        return step.get("mode", "crop") == "crop"
+    return step["op"] in GEOMETRY_OPS
+
+
+class Geometry:
+    """Zusammengesetzte Abbildung Quelle -> Ausgabe.
+
+    Reihenfolge: erst Zuschnitt box (in Quellkoordinaten), dann horizontale
+    Spiegelung (mirrored), dann turns Vierteldrehungen gegen den
+    Uhrzeigersinn. Jede Folge von Drehungen, Spiegelungen und Zuschnitten
+    lässt sich so darstellen; die Methoden liefern jeweils eine neue Geometry.
+    """
+
+    def __init__(self, turns=0, mirrored=False, box=None):
+        self.turns = turns % 4
+        self.mirrored = bool(mirrored)
+        self.box = tuple(int(value) for value in box) if box is not None else None
+
+    def __eq__(self, other):
+        return isinstance(other, Geometry) and (self.turns, self.mirrored, self.box) == \
+            (other.turns, other.mirrored, other.box)
+
+    def __repr__(self):
+        return f"Geometry(turns={self.turns}, mirrored={self.mirrored}, box={self.box})"
+
+    @classmethod
+    def from_steps(cls, steps, size):
+        """Fasst Rezeptschritte (rotate/flip/crop) für ein Quellbild der Größe size zu einer Geometry zusammen.
+
+        ValueError, wenn das nicht exakt geht (siehe chain()).
+        """
+        geometries = cls.chain(steps, size)
+        if len(geometries) > 1:
+            raise ValueError("Zuschnitt ragt über einen vorherigen Zuschnitt hinaus; Geometry.chain() verwenden")
+        return geometries[0]
+
+    @classmethod
+    def chain(cls, steps, size):
+        """Rezeptschritte als Folge von Geometrien, die nacheinander angewendet werden.
+
+        Meist ist es genau eine. Ragt ein Zuschnitt über einen vorherigen
+        hinaus, füllt PIL dort schwarz auf; in Quellkoordinaten ließe sich
+        das nicht ausdrücken (dort liegen die abgeschnittenen Pixel), also
+        beginnt mit diesem Schritt eine neue Geometrie.
+        """
+        geometries = [cls()]
+        for step in steps:
+            geometry = geometries[-1]
+            if step["op"] == "crop" and geometry.box is not None:
+                width, height = geometry.output_size(size)
+                left, upper, right, lower = step["box"]
+                if left < 0 or upper < 0 or right > width or lower > height:
+                    size = (width, height)
+                    geometries.append(cls())
+                    geometry = geometries[-1]
+            geometries[-1] = geometry._step(step, size)
+        return geometries
+
+    def _step(self, step, size):
+        if step["op"] == "rotate":
+            return self.rotated(step.get("angle", 90))
+        if step["op"] == "flip":
+            return self.flipped(step.get("direction", "horizontal"))
+        if step["op"] == "crop":
+            return self.cropped(step["box"], size)
+        if step["op"] == "reframe":
+            # Der Rahmen bezieht sich auf die bis hierher gedrehte/zugeschnittene Ausgabe
+            frame = {key: step[key] for key in ("format", "width") if key in step}
+            return self.cropped(frame_box(self.output_size(size), **frame), size)
+        raise ValueError(f"Keine geometrische Operation: {step['op']}")
+
+    def is_identity(self):
+        return self.turns == 0 and not self.mirrored and self.box is None
+
+    def rotated(self, angle=90):
+        """Zusätzliche Drehung gegen den Uhrzeigersinn (Vielfache von 90°)."""
+        if angle % 90:
+            raise ValueError(f"Nur Drehungen um Vielfache von 90° möglich, erhalten {angle}")
+        return Geometry(self.turns + angle // 90, self.mirrored, self.box)
+
+    def flipped(self, direction="horizontal"):
+        """Zusätzliche Spiegelung der aktuellen Ausgabe."""
+        # H·R^k = R^-k·H und V = R^2·H
+        if direction == "horizontal":
+            return Geometry(-self.turns, not self.mirrored, self.box)
+        if direction == "vertical":
+            return Geometry(2 - self.turns, not self.mirrored, self.box)
+        raise ValueError(f"Unbekannte Spiegelrichtung: {direction}")
+
+    def cropped(self, box, size):
+        """Zusätzlicher Zuschnitt; box ist in Koordinaten der aktuellen Ausgabe angegeben.
+
+        Die Box wird nicht begrenzt. Ragt sie über einen bisherigen Zuschnitt
+        hinaus, kämen dessen abgeschnittene Pixel wieder zum Vorschein statt
+        Schwarz wie bei PIL; chain() trennt solche Folgen daher auf.
+        """
+        inverse = np.linalg.inv(self.matrix(size))
+        left, upper, right, lower = box
+        corners = inverse @ np.array([[left, right], [upper, lower], [1, 1]], dtype=float)
+        xs, ys = np.rint(corners[:2]).astype(int)
+        left, upper, right, lower = xs.min(), ys.min(), xs.max(), ys.max()
+        return Geometry(self.turns, self.mirrored, (left, upper, right, lower))
+
+    def _cropped_size(self, size):
+        if self.box is None:
+            return size
+        left, upper, right, lower = self.box
+        return right - left, lower - upper
+
+    def output_size(self, size):
+        """Größe (Breite, Höhe) der Ausgabe für ein Quellbild der Größe size."""
+        width, height = self._cropped_size(size)
+        return (height, width) if self.turns % 2 else (width, height)
+
+    def matrix(self, size):
+        """Homogene 3x3-Matrix, die Quellkoordinaten auf Ausgabekoordinaten abbildet."""
+        matrix = np.eye(3)
+        if self.box is not None:
+            matrix[:2, 2] = -self.box[0], -self.box[1]
+        width, height = self._cropped_size(size)
+        if self.mirrored:
+            matrix = np.array([[-1, 0, width], [0, 1, 0], [0, 0, 1]]) @ matrix
+        for _ in range(self.turns):
+            # (x, y) -> (y, w - x): eine Vierteldrehung gegen den Uhrzeigersinn
+            matrix = np.array([[0, 1, 0], [-1, 0, width], [0, 0, 1]]) @ matrix
+            width, height = height, width
+        return matrix
+
+    def orient(self, array):
+        """Wendet nur Spiegelung und Drehung als Sicht (ohne Kopie) auf ein (H, W, C)-Array an."""
+        if self.mirrored:
+            array = array[:, ::-1]
+        return np.rot90(array, self.turns) if self.turns else array
+
+    def region(self, array):
+        """Nur der Zuschnitt, als Sicht (ohne Kopie) auf ein (H, W, C)-Array.
+
+        Ragt der Zuschnitt über das Bild hinaus, wird wie bei PIL.Image.crop
+        schwarz (und transparent) aufgefüllt; das Ergebnis ist dann eine Kopie.
+        """
+        if self.box is None:
+            return array
+        left, upper, right, lower = self.box
+        height, width = array.shape[:2]
+        if 0 <= left <= right <= width and 0 <= upper <= lower <= height:
+            return array[upper:lower, left:right]
+        result = np.zeros((max(0, lower - upper), max(0, right - left)) + array.shape[2:], array.dtype)
+        source_left, source_upper = max(left, 0), max(upper, 0)
+        source_right, source_lower = min(right, width), min(lower, height)
+        if source_left < source_right and source_upper < source_lower:
+            result[source_upper - upper:source_lower - upper, source_left - left:source_right - left] = \
+                array[source_upper:source_lower, source_left:source_right]
+        return result
+
+    def apply(self, array):
+        """Wendet die Geometrie auf ein Array an; es wird genau einmal umkopiert."""
+        return np.ascontiguousarray(self.orient(self.region(array)))
+
+    def apply_pil(self, image):
+        """Wendet die Geometrie auf ein PIL-Bild an (höchstens ein Zuschnitt und ein Transpose)."""
+        if self.box is not None:
+            image = image.crop(self.box)
+        transpose = _PIL_TRANSPOSE.get((self.turns, self.mirrored))
+        return image.transpose(transpose) if transpose is not None else image
@@ -0,0 +1,184 @@
+"""Gemeinsamer Cache für dekodierte Bilder und ihre Verkleinerungsstufen.
+
+Einträge sind schreibgeschützte RGBA-uint8-Arrays, Schlüssel sind Pfad,
+mtime und Dateigröße: ändert sich eine Datei, werden ihre alten Einträge
+verworfen. Neben dem Original (Stufe 0) werden auf Anfrage die Stufen
+1/2, 1/4 und 1/8 gehalten. Alle Einträge teilen sich ein Byte-Budget;
+überschritten wird es durch Verdrängen der am längsten nicht genutzten
+Einträge (LRU). Der Cache ist threadsicher.
+"""
+import logging
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+from PIL import Image
+from src.config import settings
+from src.core import profiler
+from src.core.adjustment_pipeline import downsample_half
+
+logger = logging.getLogger(__name__)
+
+# Höchste gecachte Verkleinerungsstufe (1/2^3 = 1/8)
+PYRAMID_LEVELS = 3
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def load_rgba(path):
+    """Dekodiert eine Bilddatei als RGBA-uint8-Array; liefert (array, hat_alpha)."""
+    with Image.open(path) as image:
+        has_alpha = "A" in image.getbands() or "transparency" in image.info
+        with profiler.span("load", image.width * image.height) as span:
+            image.load()
+            span.bytes = image.width * image.height * len(image.getbands())
+        with profiler.span("convert", image.width * image.height) as span:
+            array = np.asarray(image.convert("RGBA"))
+            span.bytes = array.nbytes
+        return array, has_alpha
+
+
+def file_key(path):
+    """Cache-Schlüssel einer Datei: (absoluter Pfad, mtime in ns, Größe)."""
+    stat = os.stat(path)
+    return os.path.abspath(path), stat.st_mtime_ns, stat.st_size
+
+
+class ImageCache:
+    """LRU-Cache für dekodierte Bilder mit Verkleinerungspyramide und Byte-Budget."""
+
+    def __init__(self, max_bytes=None, loader=load_rgba):
+        self.max_bytes = settings.IMAGE_CACHE_BUDGET if max_bytes is None else max_bytes
+        self.loader = loader
+        self._entries = OrderedDict()  # (Dateischlüssel, Stufe) -> Array
+        self._alpha = {}  # Dateischlüssel -> hat_alpha
+        self._current = {}  # absoluter Pfad -> aktueller Dateischlüssel
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, path, level=0):
+        """Bild als RGBA-Array auf Stufe level (1/2^level), bei Bedarf dekodiert bzw. verkleinert."""
+        if not 0 <= level <= PYRAMID_LEVELS:
+            raise ValueError(f"Stufe muss zwischen 0 und {PYRAMID_LEVELS} liegen, erhalten {level}")
+        key = file_key(path)
+        cached = self._lookup(key, level)
+        if cached is not None:
+            return cached
+        if level == 0:
+            array, has_alpha = self.loader(path)
+            with self._lock:
+                self._alpha[key] = has_alpha
+        else:
+            parent = self.get(path, level - 1)
+            with profiler.span("proxy", profiler.array_pixels(parent)) as span:
+                array = downsample_half(parent)
+                span.bytes = array.nbytes
+        array.setflags(write=False)
+        return self._store(key, level, array)
+
+    def put(self, path, level, array):
+        """Legt eine bereits vorhandene Stufe ab (z. B. einen Proxy aus dem Projektordner)."""
+        if not 0 <= level <= PYRAMID_LEVELS:
+            raise ValueError(f"Stufe muss zwischen 0 und {PYRAMID_LEVELS} liegen, erhalten {level}")
+        key = file_key(path)
+        with self._lock:
+            previous = self._current.get(key[0])
+            if previous is not None and previous != key:
+                self._drop_file(previous)
+            self._current[key[0]] = key
+        array.setflags(write=False)
+        return self._store(key, level, array)
+
+    def get_pil(self, path):
+        """Original als PIL-Bild (RGB, falls die Datei keinen Alphakanal hat)."""
+        array = self.get(path)
+        image = Image.fromarray(array)
+        with self._lock:
+            has_alpha = self._alpha.get(file_key(path), True)
+        return image if has_alpha else image.convert("RGB")
+
+    def proxy_loader(self, path):
+        """Funktion level -> Array für AdjustmentPipeline; None oberhalb der gecachten Stufen."""
+        return lambda level: self.get(path, level) if level <= PYRAMID_LEVELS else None
+
+    def contains(self, path, level=0):
+        try:
+            key = file_key(path)
+        except OSError:
+            return False
+        with self._lock:
+            return (key, level) in self._entries
+
+    def invalidate(self, path):
+        """Verwirft alle Stufen einer Datei."""
+        with self._lock:
+            key = self._current.pop(os.path.abspath(path), None)
+            if key is not None:
+                self._drop_file(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._alpha.clear()
+            self._current.clear()
+            self.bytes = 0
+
+    def stats(self):
+        """Zähler und Füllstand als Dictionary."""
+        with self._lock:
+            requests = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "entries": len(self._entries), "bytes": self.bytes, "max_bytes": self.max_bytes,
+                    "hit_rate": self.hits / requests if requests else 0.0}
+
+    def _lookup(self, key, level):
+        with self._lock:
+            previous = self._current.get(key[0])
+            if previous is not None and previous != key:
+                # Datei wurde geändert: alte Stufen sind ungültig
+                self._drop_file(previous)
+            self._current[key[0]] = key
+            array = self._entries.get((key, level))
+            if array is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((key, level))
+            self.hits += 1
+            return array
+
+    def _store(self, key, level, array):
+        with self._lock:
+            if array.nbytes > self.max_bytes or self._current.get(key[0]) != key:
+                # Zu groß für das Budget oder inzwischen veraltet: nur zurückgeben
+                return array
+            existing = self._entries.get((key, level))
+            if existing is not None:
+                return existing
+            self._entries[(key, level)] = array
+            self.bytes += array.nbytes
+            while self.bytes > self.max_bytes:
+                (old_key, old_level), old = self._entries.popitem(last=False)
+                self.bytes -= old.nbytes
+                self.evictions += 1
+                logger.debug("Bild-Cache: %s (Stufe %s) verdrängt", old_key[0], old_level)
+            return array
+
+    def _drop_file(self, key):
+        for level in range(PYRAMID_LEVELS + 1):
+            array = self._entries.pop((key, level), None)
+            if array is not None:
+                self.bytes -= array.nbytes
+        self._alpha.pop(key, None)
+
+
+def default_cache():
+    """Prozessweit geteilter Cache (Editor, Stapelverarbeitung, Vorschauen)."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ImageCache()
+        return _default_cache
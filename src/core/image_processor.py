@@ -1,8 +1,11 @@
 from PIL import Image
+from src.core import encoders
+from src.core.geometry import Geometry
 
 class ImageProcessor:
-    def __init__(self, image_path):
-        self.image = Image.open(image_path)
+    def __init__(self, image):
+        """Akzeptiert einen Bildpfad oder ein bereits geladenes PIL-Bild."""
+        self.image = image if isinstance(image, Image.Image) else Image.open(image)
 
     def crop(self, box):
         """Zuschneiden des Bildes auf die angegebene Box (left, upper, right, lower)."""
@@ -24,8 +27,15 @@ class ImageProcessor:
         flipped_image = self.image.transpose(Image.FLIP_TOP_BOTTOM)
         return flipped_image
 
-    def save_image(self, output_path, image=None):
-        """Speichern des Bildes im angegebenen Pfad."""
+    def transform(self, steps):
+        """Führt eine Folge von rotate/flip/crop-Schritten (Rezeptformat) mit einem Umkopieren aus."""
+        image = self.image
+        for geometry in Geometry.chain(steps, image.size):
+            image = geometry.apply_pil(image)
+        return image
+
+    def save_image(self, output_path, image=None, preset=None):
+        """Speichern des Bildes im angegebenen Pfad (Voreinstellung siehe core/encoders.py)."""
         if image is None:
             image = self.image
-        image.save(output_path)
+        return encoders.save(image, output_path, preset)
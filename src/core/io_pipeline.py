@@ -0,0 +1,294 @@
+"""Gestaffelte Ein-/Ausgabe für Stapelläufe.
+
+Lesen, Dekodieren/Verarbeiten/Kodieren und Schreiben laufen als eigene
+Stufen gleichzeitig statt pro Bild nacheinander:
+
+    Lese-Threads -> [read_queue] -> Prozesspool -> [write_queue] -> Schreib-Threads
+
+- Lese-Threads holen nur die Dateibytes (und den Inhaltshash); auf
+  Netzlaufwerken überlappen sich so viele Anfragen. Bilder über
+  MAX_IMAGE_DIMENSION (laut Dateikopf) werden nur blockweise gehasht; der
+  Worker liest sie selbst aus der Datei.
+- Im Prozesspool wird dekodiert, das Rezept angewendet und mit der
+  Exportvoreinstellung kodiert (siehe core/encoders.py). Zurück gehen nur
+  die kodierten Dateibytes, nicht die viel größeren Rohpixel.
+- Schreib-Threads schreiben die Dateibytes in einem Aufruf.
+
+Die Queues sind begrenzt; eine langsame Stufe bremst die vorherigen, statt
+Bilder im Speicher anzuhäufen. Jede Stufe zählt die Zeit, in der ihre
+Worker beschäftigt sind. Die Auslastung (Arbeitszeit / (Laufzeit x Worker))
+zeigt den Engpass.
+"""
+import io
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from PIL import Image
+from src.config import settings
+from src.core import encoders
+from src.core.batch_manifest import content_hash, file_hash
+from src.core.tiling import needs_tiling
+
+logger = logging.getLogger(__name__)
+
+# Stufennamen in Flussrichtung
+STAGES = ("read", "process", "write")
+
+# Kennzeichnet das Ende einer Queue
+_DONE = object()
+
+# Kompiliertes Rezept des aktuellen Worker-Prozesses (siehe _init_worker)
+_worker_ops = None
+# Gemeinsames Rezept vor dem Kompilieren und bake_luts, für Bilder mit eigenen Operationen
+_worker_source = ([], True)
+
+
+@dataclass
+class StageStats:
+    """Arbeitszeit und Durchsatz einer Stufe."""
+    name: str
+    workers: int
+    busy_seconds: float = 0.0
+    items: int = 0
+    bytes: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def add(self, seconds, nbytes=0):
+        with self._lock:
+            self.busy_seconds += seconds
+            self.items += 1
+            self.bytes += nbytes
+
+    def utilization(self, wall_seconds):
+        """Anteil der Laufzeit, in der die Worker der Stufe beschäftigt waren (0..1)."""
+        if not wall_seconds or not self.workers:
+            return 0.0
+        return min(1.0, self.busy_seconds / (wall_seconds * self.workers))
+
+
+@dataclass
+class PipelineStats:
+    """Auslastung aller Stufen eines Laufs."""
+    stages: dict
+    wall_seconds: float = 0.0
+
+    def utilization(self):
+        return {name: stage.utilization(self.wall_seconds) for name, stage in self.stages.items()}
+
+    def bottleneck(self):
+        """Name der am stärksten ausgelasteten Stufe."""
+        utilization = self.utilization()
+        return max(utilization, key=utilization.get) if utilization else None
+
+    def __str__(self):
+        parts = [f"{name} {value:.0%} ({self.stages[name].workers}x)" for name, value in self.utilization().items()]
+        return " | ".join(parts) + f", Engpass: {self.bottleneck()}"
+
+
+def _init_worker(ops, source_ops=None, bake_luts=True):
+    """Übergibt das kompilierte Rezept einmal pro Worker statt pro Bild (siehe batch_processor._init_worker)."""
+    global _worker_ops, _worker_source
+    _worker_ops = ops
+    _worker_source = (source_ops or [], bake_luts)
+
+
+def decode_and_process(source, output_path, preset=None, item_ops=None):
+    """Dekodiert, wendet das Rezept an und kodiert (läuft im Worker-Prozess).
+
+    source sind die Dateibytes oder, bei sehr großen Bildern, der Pfad. Es
+    gilt das beim Start des Workers übergebene Rezept, mit den eigenen
+    Operationen item_ops davor. Liefert (Dateibytes, Pixelzahl, Sekunden).
+    Sehr große Ergebnisse werden nicht zurückgeschickt, sondern direkt im
+    Worker geschrieben; dann sind die Dateibytes None.
+    """
+    from src.core.batch_processor import compose_recipe, render_image
+
+    start = time.perf_counter()
+    with Image.open(source if isinstance(source, str) else io.BytesIO(source)) as image:
+        ops = compose_recipe(item_ops, *_worker_source) if item_ops else _worker_ops
+        result = render_image(image, ops)
+        pixels = result.width * result.height
+        if needs_tiling(result.size):
+            encoders.save(result, output_path, preset)
+            return None, pixels, time.perf_counter() - start
+        data = encoders.encode(result, preset if preset is not None else encoders.preset_for_path(output_path))
+        return data, pixels, time.perf_counter() - start
+
+
+class IOPipeline:
+    """Führt ein kompiliertes Rezept über (Eingabe, Ausgabe)-Paare mit überlappender Ein-/Ausgabe aus.
+
+    Aufträge der Form (Eingabe, Ausgabe, eigene Operationen) setzen diese
+    vor source_ops, das gemeinsame Rezept vor dem Kompilieren.
+    """
+
+    def __init__(self, ops, process_workers=None, read_workers=None, write_workers=None, queue_size=None,
+                 max_in_flight=None, preset=None, source_ops=None, bake_luts=True):
+        self.ops = ops
+        self.source_ops = ops if source_ops is None else source_ops
+        self.bake_luts = bake_luts
+        self.preset = preset
+        self.process_workers = process_workers or os.cpu_count() or 1
+        self.read_workers = read_workers or settings.BATCH_READ_WORKERS
+        self.write_workers = write_workers or settings.BATCH_WRITE_WORKERS
+        self.queue_size = queue_size or settings.BATCH_QUEUE_SIZE or 2 * self.process_workers
+        self.max_in_flight = max_in_flight or 2 * self.process_workers
+        self.stats = None
+
+    def run(self, jobs, on_result):
+        """Verarbeitet alle Aufträge; on_result(BatchItemResult) wird im aufrufenden Thread gemeldet.
+
+        Gibt die PipelineStats des Laufs zurück.
+        """
+        self.stats = PipelineStats({
+            "read": StageStats("read", self.read_workers),
+            "process": StageStats("process", self.process_workers),
+            "write": StageStats("write", self.write_workers),
+        })
+        read_queue = queue.Queue(self.queue_size)
+        write_queue = queue.Queue(self.queue_size)
+        done_queue = queue.Queue()
+        start = time.perf_counter()
+
+        pending = iter(jobs)
+        pending_lock = threading.Lock()
+        remaining_readers = [self.read_workers]
+        # Gesetzt, sobald die Hauptschleife endet; Leser warten dann nicht mehr auf Platz in read_queue
+        stop = threading.Event()
+        readers = [threading.Thread(target=self._read_loop, name=f"batch-read-{index}", daemon=True,
+                                    args=(pending, pending_lock, remaining_readers, read_queue, done_queue, stop))
+                   for index in range(self.read_workers)]
+        writers = [threading.Thread(target=self._write_loop, name=f"batch-write-{index}", daemon=True,
+                                    args=(write_queue, done_queue))
+                   for index in range(self.write_workers)]
+        for thread in readers + writers:
+            thread.start()
+
+        slots = threading.BoundedSemaphore(self.max_in_flight)
+        completed = False
+        try:
+            # spawn statt fork: in der GUI laufen bereits Qt-Threads, deren Sperren ein Fork erben würde
+            with ProcessPoolExecutor(max_workers=self.process_workers, mp_context=multiprocessing.get_context("spawn"),
+                                     initializer=_init_worker,
+                                     initargs=(self.ops, self.source_ops, self.bake_luts)) as executor:
+                while True:
+                    item = self._get(read_queue, done_queue, on_result)
+                    if item is _DONE:
+                        break
+                    while not slots.acquire(timeout=0.05):
+                        self._drain(done_queue, on_result)
+                    future = executor.submit(decode_and_process, item["source"], item["output_path"], self.preset,
+                                             item["ops"])
+                    future.add_done_callback(partial(self._processed, item, slots, write_queue))
+            completed = True
+        finally:
+            # Bricht die Schleife ab (Fehler in on_result, defekter Pool, Strg+C), hängen Leser sonst in put()
+            stop.set()
+            for _ in writers:
+                write_queue.put(_DONE)
+            for thread in readers + writers:
+                thread.join()
+            if completed:
+                self._drain(done_queue, on_result)
+            self.stats.wall_seconds = time.perf_counter() - start
+        logger.info("E/A-Pipeline: %s", self.stats)
+        return self.stats
+
+    def _get(self, read_queue, done_queue, on_result):
+        while True:
+            try:
+                return read_queue.get(timeout=0.05)
+            except queue.Empty:
+                self._drain(done_queue, on_result)
+
+    def _drain(self, done_queue, on_result):
+        while True:
+            try:
+                result = done_queue.get_nowait()
+            except queue.Empty:
+                return
+            on_result(result)
+
+    def _put(self, read_queue, item, stop):
+        """Wie read_queue.put(item), gibt aber auf, sobald stop gesetzt ist; True, wenn item eingereiht wurde."""
+        while not stop.is_set():
+            try:
+                read_queue.put(item, timeout=0.05)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _read_loop(self, pending, pending_lock, remaining_readers, read_queue, done_queue, stop):
+        from src.core.batch_processor import BatchItemResult
+
+        while not stop.is_set():
+            with pending_lock:
+                job = next(pending, None)
+            if job is None:
+                break
+            # (Eingabe, Ausgabe) oder (Eingabe, Ausgabe, eigene Operationen)
+            image_path, output_path = job[:2]
+            started = time.perf_counter()
+            try:
+                stat = os.stat(image_path)
+                with Image.open(image_path) as header:
+                    large = needs_tiling(header.size)
+                if large:
+                    # Nicht zusätzlich im Speicher halten: der Worker liest selbst aus der Datei
+                    source, digest = image_path, file_hash(image_path)
+                else:
+                    with open(image_path, "rb") as handle:
+                        source = handle.read()
+                    digest = content_hash(source)
+                item = {"image_path": image_path, "output_path": output_path, "source": source,
+                        "ops": job[2] if len(job) > 2 else None,
+                        "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "content_hash": digest}
+            except Exception as e:
+                done_queue.put(BatchItemResult(image_path, output_path, time.perf_counter() - started, error=str(e)))
+                continue
+            item["seconds"] = time.perf_counter() - started
+            self.stats.stages["read"].add(item["seconds"], stat.st_size)
+            if not self._put(read_queue, item, stop):
+                break
+        with pending_lock:
+            remaining_readers[0] -= 1
+            if remaining_readers[0] == 0:
+                self._put(read_queue, _DONE, stop)
+
+    def _processed(self, item, slots, write_queue, future):
+        # Läuft im Verwaltungs-Thread des Pools; blockiert bei voller write_queue (Gegendruck)
+        slots.release()
+        write_queue.put((item, future))
+
+    def _write_loop(self, write_queue, done_queue):
+        from src.core.batch_processor import BatchItemResult
+
+        while True:
+            entry = write_queue.get()
+            if entry is _DONE:
+                return
+            item, future = entry
+            image_path, output_path = item["image_path"], item["output_path"]
+            seconds = item["seconds"]
+            try:
+                data, pixel_count, process_seconds = future.result()
+                self.stats.stages["process"].add(process_seconds)
+                seconds += process_seconds
+                if data is not None:
+                    started = time.perf_counter()
+                    encoders.write(data, output_path)
+                    elapsed = time.perf_counter() - started
+                    self.stats.stages["write"].add(elapsed, len(data))
+                    seconds += elapsed
+            except Exception as e:
+                done_queue.put(BatchItemResult(image_path, output_path, seconds, error=str(e)))
+                continue
+            done_queue.put(BatchItemResult(image_path, output_path, seconds, pixel_count, size=item["size"],
+                                           mtime_ns=item["mtime_ns"], content_hash=item["content_hash"]))
@@ -0,0 +1,250 @@
+"""Belichtungs- und Weißabgleich über eine Bildfolge (z. B. alle Shots eines Drehtags).
+
+Pro Bild wird aus einer verkleinerten Dekodierung (siehe core/thumbnails.py)
+eine kompakte Statistik berechnet: Luma-Perzentile und die Kanalmittelwerte
+der Mitteltöne. Gegen ein Referenzbild oder den Median der Folge ergibt sich
+daraus je Bild eine Korrektur aus Belichtung, Weißabgleich und optional
+Kontrast. Sie wird als balance-Operation (siehe core/recipe.py) vor das
+gemeinsame Rezept gestellt und von der Stapelverarbeitung mit angewendet:
+
+    stats = StatsCache().collect(paths)
+    corrections = match_sequence(stats, reference=paths[0])
+    BatchProcessor(paths).run("export", ops, item_ops=correction_ops(corrections))
+
+Die Statistik wird unter einer Dateikennung (Stichprobenhash und mtime)
+zwischengespeichert; nach dem Hinzufügen von Bildern werden beim erneuten
+Abgleich nur die neuen dekodiert.
+"""
+import json
+import logging
+import math
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+import numpy as np
+from src.config import settings
+from src.core.scopes import LUMA_WEIGHTS, luma
+from src.core.thumbnails import decode_thumbnail, sample_hash
+
+logger = logging.getLogger(__name__)
+
+# Luma-Perzentile der Statistik
+PERCENTILES = (1, 5, 50, 95, 99)
+
+# Lumabereich der Mitteltöne, aus denen der Weißabgleich geschätzt wird
+MIDTONE_RANGE = (16, 235)
+
+# Version der Statistik; ältere Einträge im Zwischenspeicher werden neu berechnet
+STATS_VERSION = 2
+
+_WEIGHTS = np.asarray(LUMA_WEIGHTS, dtype=np.float64) / 256
+
+
+@dataclass
+class ImageStats:
+    """Kompakte Statistik eines Bildes (Werte 0..255)."""
+    percentiles: list
+    means: list
+    samples: int = 0
+
+    def percentile(self, value):
+        return self.percentiles[PERCENTILES.index(value)]
+
+    @property
+    def median(self):
+        return self.percentile(50)
+
+    @property
+    def spread(self):
+        """Tonwertumfang ohne Ausreißer (5. bis 95. Perzentil)."""
+        return self.percentile(95) - self.percentile(5)
+
+    def to_dict(self):
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(list(data["percentiles"]), list(data["means"]), data.get("samples", 0))
+
+
+@dataclass
+class Correction:
+    """Korrektur eines Bildes: Belichtung in Blenden, Weißabgleich je Kanal, Kontrast um pivot."""
+    exposure: float = 0.0
+    white_balance: tuple = (1.0, 1.0, 1.0)
+    contrast: float = 1.0
+    pivot: float = 128.0
+
+    def gains(self):
+        scale = self.contrast * 2 ** self.exposure
+        return [scale * gain for gain in self.white_balance]
+
+    def offset(self):
+        return (1 - self.contrast) * self.pivot
+
+    def is_identity(self):
+        return np.allclose(self.gains(), 1.0, atol=1e-4) and abs(self.offset()) < 1e-3
+
+    def to_op(self):
+        """Die Korrektur als Rezeptschritt."""
+        return {"op": "balance", "gains": [round(gain, 5) for gain in self.gains()], "offset": round(self.offset(), 3)}
+
+
+def image_stats(rgb):
+    """Statistik eines RGB-uint8-Arrays."""
+    rgb = rgb[..., :3]
+    values = luma(rgb)
+    cumulative = np.cumsum(np.bincount(values.ravel(), minlength=256))
+    percentiles = [int(np.searchsorted(cumulative, p / 100 * cumulative[-1])) for p in PERCENTILES]
+    # Tiefen und abgeschnittene Lichter verfälschen den Weißabgleich; ohne Mitteltöne zählt alles
+    mask = (values >= MIDTONE_RANGE[0]) & (values <= MIDTONE_RANGE[1]) & (rgb.max(axis=-1) < 255)
+    if np.count_nonzero(mask) < values.size // 100:
+        mask = np.ones(values.shape, bool)
+    means = rgb[mask].mean(axis=0, dtype=np.float64)
+    return ImageStats(percentiles, [round(float(mean), 3) for mean in means], int(values.size))
+
+
+def compute_stats(path, size=None):
+    """Statistik einer Bilddatei aus einer verkleinerten Dekodierung."""
+    return image_stats(np.asarray(decode_thumbnail(path, size or settings.MATCH_STATS_SIZE)))
+
+
+def sequence_target(stats):
+    """Median der Folge je Statistikwert."""
+    stats = list(stats)
+    if not stats:
+        raise ValueError("Keine Bildstatistik für den Abgleich vorhanden")
+    return ImageStats([float(value) for value in np.median([entry.percentiles for entry in stats], axis=0)],
+                      [float(value) for value in np.median([entry.means for entry in stats], axis=0)])
+
+
+def _clamp(value, limit):
+    return min(max(value, 1 / limit), limit)
+
+
+def derive_correction(stats, target, contrast=True):
+    """Korrektur, die stats an target angleicht.
+
+    Belichtung: Verstärkung, die den Luma-Median auf den des Ziels legt.
+    Weißabgleich: Kanalverstärkungen, die die Farbverhältnisse der Mitteltöne
+    an die des Ziels angleichen, ohne deren Luma zu ändern. Kontrast: Streckung
+    des Tonwertumfangs (5. bis 95. Perzentil) um den neuen Median. Alle
+    Anteile sind durch die MATCH_MAX_*-Einstellungen begrenzt.
+    """
+    limit = settings.MATCH_MAX_EXPOSURE
+    exposure = math.log2(max(target.median, 1.0) / max(stats.median, 1.0))
+    exposure = min(max(exposure, -limit), limit)
+
+    means = np.maximum(np.asarray(stats.means, dtype=np.float64), 1.0)
+    target_means = np.maximum(np.asarray(target.means, dtype=np.float64), 1.0)
+    gains = (target_means / (target_means @ _WEIGHTS)) / (means / (means @ _WEIGHTS))
+    gains /= ((means * gains) @ _WEIGHTS) / (means @ _WEIGHTS)
+    white_balance = tuple(_clamp(float(gain), settings.MATCH_MAX_WHITE_BALANCE) for gain in gains)
+
+    factor = 1.0
+    pivot = min(255.0, stats.median * 2 ** exposure)
+    if contrast and stats.spread > 0 and target.spread > 0:
+        factor = _clamp(target.spread / (stats.spread * 2 ** exposure), settings.MATCH_MAX_CONTRAST)
+    return Correction(exposure, white_balance, factor, pivot)
+
+
+def match_sequence(stats, reference=None, contrast=True):
+    """Korrekturen {Pfad: Correction} für alle Bilder mit Statistik.
+
+    stats ist {Pfad: ImageStats}, z. B. aus StatsCache.collect() (Einträge
+    mit Fehlern werden übergangen). Ohne reference ist das Ziel der Median
+    der Folge, sonst die Statistik des Referenzbildes.
+    """
+    stats = {path: entry for path, entry in stats.items() if isinstance(entry, ImageStats)}
+    if reference is not None:
+        if reference not in stats:
+            raise ValueError(f"Keine Statistik für das Referenzbild: {reference}")
+        target = stats[reference]
+    else:
+        target = sequence_target(stats.values())
+    return {path: Correction() if path == reference else derive_correction(entry, target, contrast)
+            for path, entry in stats.items()}
+
+
+def correction_ops(corrections):
+    """Zusätzliche Rezeptschritte je Bild für BatchProcessor.run(item_ops=...)."""
+    return {path: [correction.to_op()] for path, correction in corrections.items() if not correction.is_identity()}
+
+
+class StatsCache:
+    """Bildstatistik, dauerhaft in einer JSON-Datei abgelegt.
+
+    Schlüssel sind sample_hash (Größe, Anfang und Ende der Datei), mtime und
+    Dekodiergröße. sample_hash allein ist kein Inhaltshash: Änderungen in der
+    Dateimitte bei gleicher Größe (z. B. unkomprimiertes TIFF) fallen nur
+    über die mtime auf. Kopierte Dateien mit neuer mtime werden neu berechnet.
+    """
+
+    def __init__(self, path=None, size=None):
+        self.path = path or settings.MATCH_STATS_CACHE
+        self.size = size or settings.MATCH_STATS_SIZE
+        self.computed = 0  # Bei der letzten collect()-Anfrage neu berechnete Bilder
+        self._entries = None
+
+    @property
+    def entries(self):
+        if self._entries is None:
+            self._entries = {}
+            try:
+                with open(self.path, encoding="utf-8") as handle:
+                    data = json.load(handle)
+                if data.get("version") == STATS_VERSION:
+                    self._entries = data.get("stats", {})
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError) as e:
+                logger.warning("Statistik-Zwischenspeicher %s nicht lesbar, wird neu angelegt: %s", self.path, e)
+        return self._entries
+
+    def save(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        # Erst vollständig schreiben, dann umbenennen: ein Abbruch hinterlässt nie eine halbe Datei
+        handle, temporary = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(handle, "w", encoding="utf-8") as output:
+                json.dump({"version": STATS_VERSION, "stats": self.entries}, output)
+            os.replace(temporary, self.path)
+        except BaseException:
+            os.remove(temporary)
+            raise
+
+    def _stats(self, path):
+        key = f"{sample_hash(path)}_{os.stat(path).st_mtime_ns}_{self.size}"
+        entry = self.entries.get(key)
+        if entry is not None:
+            return ImageStats.from_dict(entry), None
+        return compute_stats(path, self.size), key
+
+    def collect(self, paths, max_workers=None):
+        """Statistik für viele Dateien; liefert {Pfad: ImageStats oder Exception}.
+
+        Nur Dateien ohne gültigen Eintrag werden dekodiert, parallel in Threads
+        (PIL und NumPy geben dabei das GIL frei). Neue Einträge werden am Ende
+        gespeichert.
+        """
+        self.entries  # vor den Threads laden
+        results = {}
+        added = {}
+        with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count() or 1) as executor:
+            futures = {executor.submit(self._stats, path): path for path in paths}
+            for future, path in futures.items():
+                try:
+                    results[path], key = future.result()
+                except Exception as e:
+                    logger.error("Statistik für %s fehlgeschlagen: %s", path, e)
+                    results[path] = e
+                    continue
+                if key is not None:
+                    added[key] = results[path].to_dict()
+        self.computed = len(added)
+        if added:
+            self.entries.update(added)
+            self.save()
+        return results
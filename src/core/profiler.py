@@ -0,0 +1,162 @@
+"""Messpunkte für die Bildverarbeitung: Zeit, CPU-Zeit, Pixel und Bytes je Operation.
+
+Teure Operationen (Laden, Konvertieren, Farbregler, LUT, Rendern,
+Kodieren) sind in einen Messbereich gefasst:
+
+    with profiler.span("adjust", pixels=height * width) as span:
+        out = ...
+        span.bytes = out.nbytes
+
+Abgeschaltet (Standard) liefert span() ein gemeinsames Leerobjekt; ein
+Messpunkt kostet dann einen Funktionsaufruf und eine Abfrage. Eingeschaltet
+wird pro Bereich Wandzeit (perf_counter), CPU-Zeit des Threads
+(thread_time), die Zahl verarbeiteter Pixel und die Größe des angelegten
+Ergebnisses festgehalten. stats() fasst pro Operation zusammen,
+dump_json() schreibt Zusammenfassung und Einzelereignisse, dump_chrome_trace()
+eine Datei für chrome://tracing bzw. Perfetto.
+
+Gemessen wird nur im eigenen Prozess; Worker-Prozesse der
+Stapelverarbeitung melden ihre Zeiten über die Stufenstatistik
+(core/io_pipeline.py).
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from src.config import settings
+
+
+class _NullSpan:
+    """Messbereich bei abgeschaltetem Profiling: nimmt Werte an und verwirft sie."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """Ein laufender Messbereich; pixels und bytes dürfen im Bereich gesetzt werden."""
+    __slots__ = ("profiler", "name", "pixels", "bytes", "start", "cpu_start")
+
+    def __init__(self, profiler, name, pixels=0, nbytes=0):
+        self.profiler = profiler
+        self.name = name
+        self.pixels = pixels
+        self.bytes = nbytes
+
+    def __enter__(self):
+        self.cpu_start = time.thread_time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        wall = time.perf_counter() - self.start
+        cpu = time.thread_time() - self.cpu_start
+        self.profiler._record(self.name, self.start, wall, cpu, self.pixels, self.bytes)
+        return False
+
+
+class Profiler:
+    """Sammelt Messbereiche (begrenzte Ereignisliste) und Summen je Operation; threadsicher."""
+
+    def __init__(self, max_events=None, enabled=False):
+        self.enabled = enabled
+        self.events = deque(maxlen=max_events or settings.PROFILE_MAX_EVENTS)
+        self._totals = {}
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+
+    def span(self, name, pixels=0, nbytes=0):
+        if not self.enabled:
+            return _NULL_SPAN
+        return Span(self, name, pixels, nbytes)
+
+    def reset(self):
+        """Verwirft alle Messwerte."""
+        with self._lock:
+            self.events.clear()
+            self._totals = {}
+            self._origin = time.perf_counter()
+
+    def _record(self, name, start, wall, cpu, pixels, nbytes):
+        with self._lock:
+            self.events.append((name, start - self._origin, wall, cpu, pixels, nbytes, threading.get_ident()))
+            count, wall_total, cpu_total, pixel_total, byte_total = self._totals.get(name, (0, 0.0, 0.0, 0, 0))
+            self._totals[name] = (count + 1, wall_total + wall, cpu_total + cpu, pixel_total + pixels,
+                                  byte_total + nbytes)
+
+    def stats(self):
+        """Pro Operation: Anzahl, Wand- und CPU-Zeit, Pixel, Bytes und MPix/s."""
+        with self._lock:
+            totals = dict(self._totals)
+        return {name: {"count": count, "wall_seconds": wall, "cpu_seconds": cpu, "pixels": pixels, "bytes": nbytes,
+                       "megapixels_per_second": pixels / 1e6 / wall if wall else 0.0}
+                for name, (count, wall, cpu, pixels, nbytes) in sorted(totals.items(), key=lambda item: -item[1][1])}
+
+    def event_dicts(self):
+        with self._lock:
+            events = list(self.events)
+        return [{"name": name, "start": start, "wall_seconds": wall, "cpu_seconds": cpu, "pixels": pixels,
+                 "bytes": nbytes, "thread": thread}
+                for name, start, wall, cpu, pixels, nbytes, thread in events]
+
+    def dump_json(self, path):
+        """Schreibt Zusammenfassung und Einzelereignisse als JSON."""
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump({"stats": self.stats(), "events": self.event_dicts()}, handle, indent=2)
+
+    def chrome_trace(self):
+        """Ereignisse im Trace-Event-Format (chrome://tracing, Perfetto)."""
+        pid = os.getpid()
+        events = [{"name": event["name"], "cat": "cineaexpress", "ph": "X", "pid": pid, "tid": event["thread"],
+                   "ts": round(event["start"] * 1e6, 3), "dur": round(event["wall_seconds"] * 1e6, 3),
+                   "args": {"cpu_ms": round(event["cpu_seconds"] * 1000, 3), "pixels": event["pixels"],
+                            "bytes": event["bytes"]}}
+                  for event in self.event_dicts()]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def dump_chrome_trace(self, path):
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(self.chrome_trace(), handle)
+
+
+_profiler = Profiler(enabled=settings.PROFILING_ENABLED)
+
+
+def get_profiler():
+    """Prozessweiter Profiler."""
+    return _profiler
+
+
+def span(name, pixels=0, nbytes=0):
+    """Messbereich des prozessweiten Profilers (Leerobjekt, wenn abgeschaltet)."""
+    if not _profiler.enabled:
+        return _NULL_SPAN
+    return Span(_profiler, name, pixels, nbytes)
+
+
+def enable():
+    _profiler.enabled = True
+
+
+def disable():
+    _profiler.enabled = False
+
+
+def is_enabled():
+    return _profiler.enabled
+
+
+def array_pixels(array):
+    """Pixelzahl eines (H, W[, C])-Arrays."""
+    return array.shape[0] * array.shape[1]
@@ -0,0 +1,255 @@
+"""Projektdateien: eine Shotliste mit den Bearbeitungen jedes Bildes.
+
+Ein Projekt besteht aus einem JSON-Manifest (<name>.cxproj) und einem
+Begleitordner (<name>.cache) für abgeleitete Daten:
+
+    {"format": "cineaexpress-project", "version": 1, "name": "Drehtag 3",
+     "shots": [{"id": "3f2a...", "image": "card/A001.jpg", "frame_format": "2.35:1",
+                "frame_width": 80, "state": {...}}, ...]}
+
+state ist ein Zustand aus core/edit_history.py (Reglerwerte, Geometrie,
+Rahmen, Szenentext, Exportzuschnitt) oder fehlt bei unbearbeiteten Shots.
+Bildpfade stehen relativ zum Manifest, damit sich Projekt und Bilder
+gemeinsam verschieben lassen.
+
+Beim Öffnen wird nur das Manifest gelesen; kein Bild wird geöffnet und
+keine Datei geprüft, so dass auch Projekte mit tausenden Shots sofort
+bereitstehen. Erst wenn ein Shot geöffnet wird, wird sein Bild dekodiert.
+Der Begleitordner enthält Vorschaubilder (ThumbnailStore aus
+core/thumbnails.py) und für bereits geöffnete Shots einen Proxy der
+Stufe settings.PROJECT_PROXY_LEVEL als .npy-Datei, der beim nächsten Öffnen
+direkt in den ImageCache gelegt wird. Der Begleitordner darf jederzeit
+gelöscht werden.
+
+to_recipe() übersetzt die Bearbeitungen eines Shots in ein Rezept (siehe
+core/recipe.py); recipes() liefert sie für BatchProcessor.run(item_ops=...).
+"""
+import json
+import logging
+import os
+import tempfile
+import uuid
+from dataclasses import dataclass, field
+import numpy as np
+from src.config import settings
+from src.core.burn_in import points_to_pixels
+from src.core.image_cache import file_key
+from src.core.thumbnails import ThumbnailStore
+
+logger = logging.getLogger(__name__)
+
+PROJECT_FORMAT = "cineaexpress-project"
+PROJECT_VERSION = 1
+
+
+@dataclass
+class ProjectShot:
+    """Ein Shot im Projekt: Bildpfad (absolut), Rahmenvorgaben und Bearbeitungszustand."""
+    image_path: str
+    id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    frame_format: str = "16:9"
+    frame_width: float = settings.DEFAULT_FRAME_WIDTH_PERCENTAGE
+    state: dict = None
+
+    @property
+    def name(self):
+        """Szenenname, sonst der Dateiname."""
+        if self.state and self.state.get("text") and self.state["text"].get("name"):
+            return self.state["text"]["name"]
+        return os.path.basename(self.image_path)
+
+    def to_dict(self, base_directory):
+        data = {"id": self.id, "image": _relative(self.image_path, base_directory),
+                "frame_format": self.frame_format, "frame_width": self.frame_width}
+        if self.state is not None:
+            data["state"] = self.state
+        return data
+
+    @classmethod
+    def from_dict(cls, data, base_directory):
+        image = data["image"]
+        if not os.path.isabs(image):
+            image = os.path.normpath(os.path.join(base_directory, image))
+        return cls(image, data.get("id") or uuid.uuid4().hex[:12], data.get("frame_format", "16:9"),
+                   data.get("frame_width", settings.DEFAULT_FRAME_WIDTH_PERCENTAGE), data.get("state"))
+
+    def to_recipe(self):
+        """Die Bearbeitungen als Rezept: Ausrichtung, Farbregler, dann Zuschnitt auf den Rahmen oder Einbrennen."""
+        if self.state is None:
+            return []
+        ops = []
+        turns, mirrored, _ = self.state["geometry"]
+        if mirrored:
+            ops.append({"op": "flip", "direction": "horizontal"})
+        if turns:
+            ops.append({"op": "rotate", "angle": 90 * turns})
+        params = {name: value for name, value in self.state["params"].items() if value}
+        if params:
+            ops.append({"op": "adjust", **params})
+        frame = self.state.get("frame")
+        if frame is not None:
+            x, y, width, height = frame
+            box = [round(x), round(y), round(x + width), round(y + height)]
+            if self.state.get("export_crop"):
+                ops.append({"op": "crop", "box": box})
+            else:
+                step = {"op": "burn_in", "frame_rect": box}
+                text = self.state.get("text")
+                if text:
+                    # Der Editor speichert Punkt, eingebrannt wird in Pixeln
+                    step.update(name=text["name"], description=text["description"],
+                                font_size=points_to_pixels(text["font_size"]))
+                ops.append(step)
+        return ops
+
+
+def _relative(path, base_directory):
+    try:
+        return os.path.relpath(path, base_directory)
+    except ValueError:
+        # Anderes Laufwerk (Windows): absolut speichern
+        return path
+
+
+class Project:
+    """Shotliste mit Manifestpfad und Begleitordner."""
+
+    def __init__(self, path=None, name="", shots=None):
+        self.path = path
+        self.name = name
+        self.shots = list(shots or [])
+        self.modified = False
+        self._thumbnail_store = None
+
+    @property
+    def base_directory(self):
+        return os.path.dirname(os.path.abspath(self.path)) if self.path else os.getcwd()
+
+    @property
+    def sidecar_directory(self):
+        """Begleitordner neben dem Manifest (None bei noch nicht gespeicherten Projekten)."""
+        return os.path.splitext(self.path)[0] + ".cache" if self.path else None
+
+    @classmethod
+    def load(cls, path):
+        """Liest nur das Manifest; Bilder werden erst beim Öffnen eines Shots geladen."""
+        with open(path, encoding="utf-8") as handle:
+            data = json.load(handle)
+        if data.get("format") != PROJECT_FORMAT:
+            raise ValueError(f"Keine CineaExpress-Projektdatei: {path}")
+        if data.get("version", 0) > PROJECT_VERSION:
+            raise ValueError(f"Projektversion {data['version']} wird nicht unterstützt: {path}")
+        base_directory = os.path.dirname(os.path.abspath(path))
+        shots = [ProjectShot.from_dict(entry, base_directory) for entry in data.get("shots", [])]
+        return cls(path, data.get("name", ""), shots)
+
+    def save(self, path=None):
+        """Schreibt das Manifest; erst vollständig, dann per Umbenennen (nie halb geschriebene Projekte)."""
+        if path is not None and path != self.path:
+            self.path = path
+            self._thumbnail_store = None
+        if self.path is None:
+            raise ValueError("Kein Speicherort für das Projekt angegeben")
+        base_directory = self.base_directory
+        data = {"format": PROJECT_FORMAT, "version": PROJECT_VERSION, "name": self.name,
+                "shots": [shot.to_dict(base_directory) for shot in self.shots]}
+        os.makedirs(base_directory, exist_ok=True)
+        handle, temporary = tempfile.mkstemp(dir=base_directory, suffix=".tmp")
+        try:
+            with os.fdopen(handle, "w", encoding="utf-8") as output:
+                json.dump(data, output, indent=1)
+            os.replace(temporary, self.path)
+        except BaseException:
+            os.remove(temporary)
+            raise
+        self.modified = False
+
+    def shot(self, shot_id):
+        for shot in self.shots:
+            if shot.id == shot_id:
+                return shot
+        raise KeyError(f"Unbekannter Shot: {shot_id}")
+
+    def add_images(self, paths):
+        """Hängt neue Shots an; bereits enthaltene Bilder werden übergangen. Liefert die neuen Shots."""
+        known = {os.path.abspath(shot.image_path) for shot in self.shots}
+        added = []
+        for path in paths:
+            path = os.path.abspath(path)
+            if path not in known:
+                known.add(path)
+                added.append(ProjectShot(path))
+        self.shots.extend(added)
+        self.modified = self.modified or bool(added)
+        return added
+
+    def remove(self, shot_id):
+        self.shots.remove(self.shot(shot_id))
+        self.modified = True
+
+    def update(self, shot_id, state=None, frame_format=None, frame_width=None):
+        """Übernimmt den Bearbeitungszustand eines Shots (z. B. beim Wechsel zum nächsten)."""
+        shot = self.shot(shot_id)
+        changes = {"state": state, "frame_format": frame_format, "frame_width": frame_width}
+        for name, value in changes.items():
+            if value is not None and getattr(shot, name) != value:
+                setattr(shot, name, value)
+                self.modified = True
+        return shot
+
+    def recipes(self):
+        """{Bildpfad: Rezept} aller bearbeiteten Shots, für BatchProcessor.run(item_ops=...)."""
+        return {shot.image_path: shot.to_recipe() for shot in self.shots if shot.state is not None}
+
+    # Begleitordner
+
+    def thumbnail_store(self):
+        """Vorschaubilder im Begleitordner (ohne gespeichertes Projekt im gemeinsamen Speicher)."""
+        if self._thumbnail_store is None:
+            sidecar = self.sidecar_directory
+            self._thumbnail_store = ThumbnailStore(os.path.join(sidecar, "thumbnails") if sidecar else None)
+        return self._thumbnail_store
+
+    def proxy_path(self, shot, level=None):
+        """Proxy-Datei eines Shots; der Name enthält mtime und Größe, geänderte Bilder verfehlen sie also."""
+        if self.sidecar_directory is None:
+            return None
+        level = settings.PROJECT_PROXY_LEVEL if level is None else level
+        _, mtime_ns, size = file_key(shot.image_path)
+        return os.path.join(self.sidecar_directory, "proxies", f"{shot.id}_{mtime_ns}_{size}_{level}.npy")
+
+    def restore_proxy(self, shot, cache, level=None):
+        """Legt einen gespeicherten Proxy des Shots in cache; True, wenn einer vorhanden war."""
+        level = settings.PROJECT_PROXY_LEVEL if level is None else level
+        try:
+            path = self.proxy_path(shot, level)
+            if path is None or not os.path.exists(path):
+                return False
+            cache.put(shot.image_path, level, np.load(path))
+        except (OSError, ValueError) as e:
+            logger.warning("Proxy für %s nicht lesbar: %s", shot.image_path, e)
+            return False
+        return True
+
+    def store_proxy(self, shot, cache, level=None):
+        """Speichert den Proxy eines geöffneten Shots aus cache im Begleitordner (falls noch nicht vorhanden)."""
+        level = settings.PROJECT_PROXY_LEVEL if level is None else level
+        path = self.proxy_path(shot, level)
+        if path is None or os.path.exists(path):
+            return path
+        array = cache.get(shot.image_path, level)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        # Ältere Proxys desselben Shots (vor einer Änderung des Bildes) sind wertlos
+        for name in os.listdir(directory):
+            if name.startswith(f"{shot.id}_") and name.endswith(f"_{level}.npy"):
+                os.remove(os.path.join(directory, name))
+        handle, temporary = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(handle, "wb") as output:
+                np.save(output, array)
+            os.replace(temporary, path)
+        except BaseException:
+            os.remove(temporary)
+            raise
+        return path
@@ -0,0 +1,289 @@
+"""Deklarative Operationsketten (Rezepte) für die Stapelverarbeitung.
+
+Ein Rezept ist eine Liste von Dictionaries, z. B.::
+
+    [{"op": "rotate", "angle": 90},
+     {"op": "flip", "direction": "horizontal"},
+     {"op": "crop", "box": [0, 0, 1920, 1080]},
+     {"op": "adjust", "brightness": 10, "contrast": 5, "grayscale": 0, "sepia": 20},
+     {"op": "lut", "path": "looks/film.cube"},
+     {"op": "balance", "gains": [1.1, 1.0, 0.92], "offset": 0},
+     {"op": "frame", "format": "16:9", "width": 80, "color": "#FF0000", "pen_width": 2},
+     {"op": "text", "name": "Szene 1", "description": "Totale", "font_size": 14},
+     {"op": "burn_in", "frame_format": "2.35:1", "matte_color": "#000000", "name": "Szene 1"},
+     {"op": "reframe", "format": "2.35:1", "width": 100, "mode": "crop"}]
+
+Rezepte sind reine Daten und lassen sich daher an Worker-Prozesse schicken.
+compile_recipe() backt Folgen punktweiser Farboperationen (adjust ohne
+Kontrast, balance, lut) einmal pro Rezept zu einer einzigen 3D-LUT zusammen und
+fasst Folgen von Drehungen, Spiegelungen und Zuschnitten zu einem
+einzigen Umkopieren (transform) zusammen.
+"""
+import functools
+import numpy as np
+from PIL import Image, ImageColor, ImageDraw, ImageFont
+from src.config import settings
+from src.core.burn_in import BurnInSpec, render_burn_in
+from src.core.color_transform import ColorTransform, estimate_mean_luma
+from src.core.framing import FRAME_MODES, frame_box, frame_rect
+from src.core.geometry import Geometry, is_geometry_step
+
+
+def _rgb_array(image):
+    """Bild als RGB- oder RGBA-uint8-Array (Alpha bleibt erhalten)."""
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+    return np.asarray(image)
+
+
+def rotate(image, angle=90):
+    """Dreht das Bild gegen den Uhrzeigersinn."""
+    if angle % 90 == 0:
+        transpose = {90: Image.ROTATE_90, 180: Image.ROTATE_180, 270: Image.ROTATE_270}.get(angle % 360)
+        return image.transpose(transpose) if transpose is not None else image
+    return image.rotate(angle, expand=True)
+
+
+def flip(image, direction="horizontal"):
+    """Spiegelt das Bild horizontal oder vertikal."""
+    if direction == "horizontal":
+        return image.transpose(Image.FLIP_LEFT_RIGHT)
+    if direction == "vertical":
+        return image.transpose(Image.FLIP_TOP_BOTTOM)
+    raise ValueError(f"Unbekannte Spiegelrichtung: {direction}")
+
+
+def crop(image, box):
+    """Schneidet das Bild auf die Box (left, upper, right, lower) zu."""
+    return image.crop(tuple(box))
+
+
+def transform(image, steps):
+    """Führt eine von compile_recipe() zusammengefasste Folge von rotate/flip/crop in einem Schritt aus."""
+    for geometry in Geometry.chain(steps, image.size):
+        image = geometry.apply_pil(image)
+    return image
+
+
+def adjust(image, brightness=0, contrast=0, grayscale=0, sepia=0):
+    """Wendet die Reglerwerte in einem fusionierten Durchlauf an."""
+    if not (brightness or contrast or grayscale or sepia):
+        return image
+    array = _rgb_array(image)
+    mean_luma = estimate_mean_luma(array) if contrast else 128.0
+    transform = ColorTransform.from_adjustments(brightness, contrast, grayscale, sepia, mean_luma)
+    return Image.fromarray(transform.apply(array))
+
+
+def balance(image, gains=(1.0, 1.0, 1.0), offset=0.0):
+    """Kanalweise Verstärkung plus Offset, z. B. eine Korrektur aus core/matching.py."""
+    transform = ColorTransform.from_gains(gains, offset)
+    if transform.is_identity():
+        return image
+    return Image.fromarray(transform.apply(_rgb_array(image)))
+
+
+def lut(image, path, method="tetrahedral"):
+    """Wendet eine LUT-Datei an."""
+    from src.filters.lut_filters import LUTFilter
+
+    array = _rgb_array(image)
+    return Image.fromarray(LUTFilter(path, method).apply_lut(array))
+
+
+def baked_lut(image, lut, method="tetrahedral"):
+    """Wendet eine von compile_recipe() gebackene LUT an."""
+    return Image.fromarray(lut.apply(_rgb_array(image), method))
+
+
+def draw_frame(image, offset=(0, 0), size=None, format=settings.DEFAULT_FRAME_FORMAT,
+               width=settings.DEFAULT_FRAME_WIDTH_PERCENTAGE, color=settings.DEFAULT_FRAME_COLOR, pen_width=2):
+    """Zeichnet den Rahmen in image, das den Ausschnitt ab offset eines Bildes der Größe size zeigt."""
+    rect = frame_rect(size or image.size, format, width)
+    dx, dy = offset
+    # Erst runden, dann verschieben: so landet jede Kante in jedem Ausschnitt auf derselben Zeile
+    left, top, right, bottom = (round(value) for value in rect)
+    ImageDraw.Draw(image).rectangle([left - dx, top - dy, right - dx, bottom - dy],
+                                    outline=ImageColor.getrgb(color), width=pen_width)
+
+
+def draw_text(image, offset=(0, 0), size=None, name="", description="", font_size=settings.DEFAULT_FONT_SIZE,
+              format=settings.DEFAULT_FRAME_FORMAT, width=settings.DEFAULT_FRAME_WIDTH_PERCENTAGE, color="#FFFFFF"):
+    """Zeichnet Szenenname und Beschreibung über dem Rahmen (Ausschnitt wie bei draw_frame)."""
+    from PySide6.QtCore import QRectF
+    from src.services.text_service import TextService
+
+    left, top, right, bottom = frame_rect(size or image.size, format, width)
+    rect = QRectF(left, top, right - left, bottom - top)
+    text_service = TextService()
+    name, description = text_service.format_scene_text(name, description)
+    name_pos, desc_pos = text_service.calculate_text_positions(rect, font_size)
+    font = load_font(font_size)
+    draw = ImageDraw.Draw(image)
+    fill = ImageColor.getrgb(color)
+    dx, dy = offset
+    draw.text((name_pos.x() - dx, name_pos.y() - dy), name, fill=fill, font=font)
+    draw.text((desc_pos.x() - dx, desc_pos.y() - dy), description, fill=fill, font=font)
+
+
+def frame(image, **params):
+    """Brennt den Bildrahmen (wie im FrameEditor) in das Bild ein."""
+    image = image.copy()
+    draw_frame(image, **params)
+    return image
+
+
+def text(image, **params):
+    """Brennt Szenenname und Beschreibung über dem Bildrahmen ein."""
+    image = image.copy()
+    draw_text(image, **params)
+    return image
+
+
+@functools.lru_cache(maxsize=64)
+def load_font(size, bold=False):
+    """TrueType-Schrift in der gewünschten Größe (Arial, DejaVu Sans oder Standardschrift)."""
+    names = ("Arial Bold.ttf", "arialbd.ttf", "DejaVuSans-Bold.ttf") if bold else ()
+    for name in names + ("Arial.ttf", "DejaVuSans.ttf"):
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    try:
+        return ImageFont.load_default(size)
+    except TypeError:
+        # Pillow < 10.1 kennt keine skalierbare Standardschrift
+        return ImageFont.load_default()
+
+
+def burn_in(image, **params):
+    """Brennt Rahmen, optionale Letterbox-Maske und Szenentext in einem Durchlauf ein (siehe core/burn_in.py)."""
+    array = np.array(_rgb_array(image))
+    render_burn_in(array, BurnInSpec(**params))
+    return Image.fromarray(array)
+
+
+def reframe(image, format=settings.DEFAULT_FRAME_FORMAT, width=100, mode="crop", matte_color="#000000",
+            matte_opacity=1.0):
+    """Schneidet auf den Rahmen zu (mode "crop") oder maskiert außerhalb davon (mode "letterbox").
+
+    Das Rahmenrechteck wird pro Bildgröße nur einmal berechnet (siehe core/framing.py).
+    """
+    box = frame_box(image.size, format, width)
+    if mode == "crop":
+        return image.crop(box)
+    if mode == "letterbox":
+        return burn_in(image, frame_rect=box, draw_frame=False, matte_color=matte_color, matte_opacity=matte_opacity)
+    raise ValueError(f"Unbekannter Rahmenmodus: {mode}")
+
+
+def draw_burn_in(array, offset=(0, 0), size=None, **params):
+    """burn_in direkt in ein (Ausschnitts-)Array, z. B. einen Streifen der kachelweisen Verarbeitung."""
+    render_burn_in(array, BurnInSpec(**params), offset, size)
+
+
+# Operationen, die nur zeichnen und sich daher streifenweise ausführen lassen
+DRAWING_OPS = {"frame": draw_frame, "text": draw_text}
+# Wie DRAWING_OPS, zeichnen aber direkt in uint8-Arrays
+ARRAY_DRAWING_OPS = {"burn_in": draw_burn_in}
+
+OPERATIONS = {
+    "rotate": rotate,
+    "flip": flip,
+    "crop": crop,
+    "transform": transform,
+    "adjust": adjust,
+    "balance": balance,
+    "lut": lut,
+    "baked_lut": baked_lut,
+    "frame": frame,
+    "text": text,
+    "burn_in": burn_in,
+    "reframe": reframe,
+}
+
+
+def validate_recipe(ops):
+    """Prüft ein Rezept und gibt es als Liste zurück."""
+    ops = list(ops)
+    for step in ops:
+        if step.get("op") not in OPERATIONS:
+            raise ValueError(f"Unbekannte Operation: {step.get('op')}")
+        if step["op"] == "reframe" and step.get("mode", "crop") not in FRAME_MODES:
+            raise ValueError(f"Unbekannter Rahmenmodus: {step['mode']}")
+    return ops
+
+
+def apply_recipe(image, ops):
+    """Wendet alle Operationen eines Rezepts der Reihe nach an."""
+    for step in ops:
+        params = {key: value for key, value in step.items() if key != "op"}
+        image = OPERATIONS[step["op"]](image, **params)
+    return image
+
+
+def pointwise_stage(step):
+    """Farbfunktion (float32, 0..255) einer punktweisen Operation, sonst None.
+
+    adjust mit Kontrast hängt vom Bildmittelwert ab und ist daher nicht
+    punktweise.
+    """
+    if step["op"] == "lut":
+        from src.filters.lut_filters import load_lut
+
+        table = load_lut(step["path"])
+        method = step.get("method", "tetrahedral")
+        return lambda rgb: table.apply_float(rgb, method)
+    if step["op"] == "adjust" and not step.get("contrast"):
+        params = {key: value for key, value in step.items() if key != "op"}
+        return ColorTransform.from_adjustments(**params).apply_float
+    if step["op"] == "balance":
+        return ColorTransform.from_gains(step.get("gains", (1.0, 1.0, 1.0)), step.get("offset", 0.0)).apply_float
+    return None
+
+
+def compile_recipe(ops, bake_size=settings.LUT_BAKE_SIZE):
+    """Backt Folgen von mindestens zwei punktweisen Farboperationen zu einer LUT.
+
+    Die Farbkosten pro Bild sind danach konstant, egal wie viele
+    Farbschritte gestapelt sind. Ebenso werden Folgen geometrischer
+    Schritte zu einer transform-Operation zusammengefasst, die die Pixel
+    nur einmal umkopiert. Das Ergebnis wird einmal pro Rezept berechnet
+    und kann für alle Bilder wiederverwendet werden.
+    """
+    compiled = []
+    run = []
+    geometry_run = []
+
+    def flush():
+        if len(run) >= 2:
+            from src.filters.lut_filters import LUT3D
+
+            compiled.append({"op": "baked_lut", "lut": LUT3D.bake([stage for _, stage in run], bake_size)})
+        else:
+            compiled.extend(step for step, _ in run)
+        run.clear()
+
+    def flush_geometry():
+        # Zuschnitte hängen von der Bildgröße ab; aufgelöst wird daher erst pro Bild
+        if len(geometry_run) >= 2:
+            compiled.append({"op": "transform", "steps": list(geometry_run)})
+        else:
+            compiled.extend(geometry_run)
+        geometry_run.clear()
+
+    for step in validate_recipe(ops):
+        stage = pointwise_stage(step)
+        if stage is not None:
+            flush_geometry()
+            run.append((step, stage))
+        elif is_geometry_step(step):
+            flush()
+            geometry_run.append(step)
+        else:
+            flush()
+            flush_geometry()
+            compiled.append(step)
+    flush()
+    flush_geometry()
+    return compiled
@@ -0,0 +1,166 @@
+"""Bildstatistik für die Scopes: Histogramme, Luma-Waveform und Vektorskop.
+
+Gerechnet wird auf einer Stichprobe: jedes n-te Pixel in beiden Richtungen
+(eine Sicht, keine Kopie), so dass höchstens max_samples Pixel gezählt
+werden. Eine Vorschau in Proxy-Auflösung reicht dafür völlig aus; Kosten
+und Ergebnis hängen kaum von der Bildgröße ab.
+
+Alle Zählungen laufen über np.bincount auf zusammengesetzten Indizes
+(Spalte x Luma für die Waveform, Cb x Cr für das Vektorskop) statt über
+Schleifen oder np.histogram2d. Die *_image()-Funktionen machen daraus
+RGBA-Arrays, die die Oberfläche direkt als QImage anzeigen kann.
+"""
+import math
+from dataclasses import dataclass
+import numpy as np
+from src.config import settings
+from src.core.color_transform import RenderCancelled
+
+# Rec. 709-Luma in Ganzzahlarithmetik (Summe 256)
+LUMA_WEIGHTS = (54, 183, 19)
+
+# Cb/Cr nach Rec. 709, bezogen auf 0..255
+CB_WEIGHTS = np.array([-0.1146, -0.3854, 0.5], dtype=np.float32)
+CR_WEIGHTS = np.array([0.5, -0.4542, -0.0458], dtype=np.float32)
+
+CHANNELS = ("red", "green", "blue")
+
+
+@dataclass
+class ScopeData:
+    """Ergebnis einer Scope-Berechnung.
+
+    histogram: Zählungen je Kanal ("red", "green", "blue", "luma"), je 256 Werte.
+    waveform: (256, Spalten), Zeile = Lumawert (0 = schwarz), Spalte = Bildspalte.
+    vectorscope: (size, size), Zeile = Cr (oben positiv), Spalte = Cb.
+    """
+    histogram: dict
+    waveform: np.ndarray
+    vectorscope: np.ndarray
+    samples: int
+
+
+def sample_step(shape, max_samples=None):
+    """Schrittweite, mit der höchstens max_samples Pixel gezählt werden."""
+    max_samples = max_samples or settings.SCOPE_MAX_SAMPLES
+    height, width = shape[:2]
+    step = max(1, math.ceil(math.sqrt(height * width / max_samples)))
+    # Durch das Aufrunden der Zeilen- und Spaltenzahl kann es knapp mehr werden
+    while -(-height // step) * -(-width // step) > max_samples:
+        step += 1
+    return step
+
+
+def subsample(array, max_samples=None):
+    """Jedes n-te Pixel (RGB) als Sicht auf array."""
+    step = sample_step(array.shape, max_samples)
+    return array[::step, ::step, :3]
+
+
+def luma(rgb):
+    """Luma (Rec. 709) eines RGB-uint8-Arrays als uint8."""
+    red, green, blue = (rgb[..., channel].astype(np.uint16) for channel in range(3))
+    return ((LUMA_WEIGHTS[0] * red + LUMA_WEIGHTS[1] * green + LUMA_WEIGHTS[2] * blue + 128) >> 8).astype(np.uint8)
+
+
+def histograms(rgb, luma_values=None):
+    """Histogramme (256 Werte) für Rot, Grün, Blau und Luma."""
+    luma_values = luma(rgb) if luma_values is None else luma_values
+    result = {name: np.bincount(rgb[..., channel].ravel(), minlength=256) for channel, name in enumerate(CHANNELS)}
+    result["luma"] = np.bincount(luma_values.ravel(), minlength=256)
+    return result
+
+
+def waveform(luma_values, columns=None):
+    """Luma-Waveform: Zählungen (256, columns) je Lumawert und Bildspalte."""
+    columns = columns or settings.SCOPE_SIZE
+    height, width = luma_values.shape
+    columns = min(columns, width)
+    column_index = np.arange(width, dtype=np.intp) * columns // width
+    index = luma_values.astype(np.intp) * columns + column_index
+    return np.bincount(index.ravel(), minlength=256 * columns).reshape(256, columns)
+
+
+def vectorscope(rgb, size=None):
+    """Vektorskop: Zählungen (size, size) über Cb (Spalte) und Cr (Zeile, oben positiv)."""
+    size = size or settings.SCOPE_SIZE
+    pixels = rgb.reshape(-1, 3).astype(np.float32)
+    scale = size / 256
+    x = ((pixels @ CB_WEIGHTS + 128) * scale).astype(np.intp)
+    y = ((128 - pixels @ CR_WEIGHTS) * scale).astype(np.intp)
+    np.clip(x, 0, size - 1, out=x)
+    np.clip(y, 0, size - 1, out=y)
+    return np.bincount(y * size + x, minlength=size * size).reshape(size, size)
+
+
+def compute_scopes(array, geometry=None, max_samples=None, size=None, cancelled=None):
+    """Berechnet alle Scopes aus einem RGB/RGBA-uint8-Array.
+
+    geometry (Drehen/Spiegeln) wird nur auf die Stichprobe angewendet, damit
+    die Waveform-Spalten der angezeigten Ausrichtung folgen. Liefert
+    cancelled() True, wird zwischen den Scopes RenderCancelled ausgelöst.
+    """
+    if array.dtype != np.uint8 or array.ndim != 3 or array.shape[2] not in (3, 4):
+        raise ValueError(f"Erwartet RGB/RGBA-uint8-Array, erhalten {array.shape} {array.dtype}")
+    rgb = subsample(array, max_samples)
+    if geometry is not None and (geometry.turns or geometry.mirrored):
+        rgb = geometry.orient(rgb)
+    luma_values = luma(rgb)
+    histogram = histograms(rgb, luma_values)
+    if cancelled is not None and cancelled():
+        raise RenderCancelled()
+    trace = waveform(luma_values, size)
+    if cancelled is not None and cancelled():
+        raise RenderCancelled()
+    return ScopeData(histogram, trace, vectorscope(rgb, size), luma_values.size)
+
+
+def _density(counts):
+    """Zählungen -> Helligkeit 0..1 (logarithmisch, damit auch seltene Werte sichtbar sind)."""
+    peak = counts.max()
+    if not peak:
+        return np.zeros(counts.shape, np.float32)
+    return np.log1p(counts.astype(np.float32)) / np.log1p(np.float32(peak))
+
+
+def _rgba(height, width):
+    image = np.zeros((height, width, 4), np.uint8)
+    image[..., 3] = 255
+    return image
+
+
+def histogram_image(histogram, height=128):
+    """RGB-Histogramm als RGBA-Bild (256 x height); überlappende Kanäle mischen sich additiv."""
+    image = _rgba(height, 256)
+    # Ausreißer an 0 und 255 (abgeschnittene Werte) bestimmen nicht die Skalierung
+    peak = max(int(histogram[name][1:255].max()) for name in CHANNELS) or 1
+    rows = np.arange(height)[:, None]
+    for channel, name in enumerate(CHANNELS):
+        heights = np.minimum(histogram[name] * height // peak, height)
+        image[..., channel][rows >= height - heights[None, :]] = 200
+    return image
+
+
+def waveform_image(trace, color=(120, 255, 120)):
+    """Waveform als RGBA-Bild (Spalten x 256), weiß = 255 oben."""
+    density = np.flipud(_density(trace))
+    image = _rgba(*density.shape)
+    image[..., :3] = (density[..., None] * np.asarray(color, np.float32)).astype(np.uint8)
+    return image
+
+
+def vectorscope_image(scope, color=(255, 255, 255)):
+    """Vektorskop als RGBA-Bild mit Fadenkreuz und Kreis für maximale Sättigung."""
+    size = scope.shape[0]
+    density = _density(scope)
+    image = _rgba(size, size)
+    image[..., :3] = (density[..., None] * np.asarray(color, np.float32)).astype(np.uint8)
+    center = size // 2
+    graticule = (60, 60, 60)
+    image[center, :, :3] = np.maximum(image[center, :, :3], graticule)
+    image[:, center, :3] = np.maximum(image[:, center, :3], graticule)
+    angles = np.linspace(0, 2 * np.pi, 4 * size, endpoint=False)
+    x = np.clip((center + (center - 1) * np.cos(angles)).astype(np.intp), 0, size - 1)
+    y = np.clip((center + (center - 1) * np.sin(angles)).astype(np.intp), 0, size - 1)
+    image[y, x, :3] = np.maximum(image[y, x, :3], graticule)
+    return image
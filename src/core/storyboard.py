@@ -0,0 +1,202 @@
+"""Storyboard- bzw. Kontaktbogen-Export für ganze Shotlisten.
+
+Eine Shotliste ist eine Folge von Shots (Bildpfad, Rahmenformat, Breite
+in %, Szenenname, Beschreibung). StoryboardRenderer setzt je Seite
+columns x rows Zellen: das verkleinert dekodierte Bild mit eingezeichnetem
+Rahmen und darunter die Beschriftung. Zellen werden parallel gerendert,
+Seiten nacheinander geschrieben; gleichzeitig im Speicher sind höchstens
+die Zellen der aktuellen und der nächsten Seite.
+
+PDF-Seiten werden mit append=True an die Datei angehängt, PNG-Seiten als
+<name>_001.png, <name>_002.png, ... geschrieben.
+"""
+import csv
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields
+from PIL import Image, ImageColor, ImageDraw
+from src.config import settings
+from src.core.recipe import draw_frame, load_font
+from src.core.thumbnails import decode_thumbnail
+from src.services.text_service import TextService
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Shot:
+    """Ein Eintrag der Shotliste."""
+    image_path: str
+    format: str = "16:9"
+    width: float = settings.DEFAULT_FRAME_WIDTH_PERCENTAGE
+    name: str = ""
+    description: str = ""
+
+    @classmethod
+    def from_dict(cls, data):
+        known = {field.name for field in fields(cls)}
+        values = {key: value for key, value in data.items() if key in known and value not in (None, "")}
+        if "width" in values:
+            values["width"] = float(values["width"])
+        return cls(**values)
+
+
+@dataclass
+class StoryboardLayout:
+    """Seitenaufbau; alle Maße in Pixeln der Ausgabeseite."""
+    columns: int = 3
+    rows: int = 4
+    cell_width: int = 600
+    cell_aspect: float = 16 / 9  # Seitenverhältnis der Bildfläche einer Zelle
+    margin: int = 60
+    gutter: int = 30
+    font_size: int = settings.DEFAULT_FONT_SIZE * 2
+    frame_color: str = settings.DEFAULT_FRAME_COLOR
+    frame_pen_width: int = 3
+    background: str = "#FFFFFF"
+    text_color: str = "#000000"
+    dpi: int = 150
+
+    @property
+    def shots_per_page(self):
+        return self.columns * self.rows
+
+    @property
+    def image_height(self):
+        return round(self.cell_width / self.cell_aspect)
+
+    @property
+    def caption_height(self):
+        return round(self.font_size * 2.8)
+
+    @property
+    def cell_height(self):
+        return self.image_height + self.caption_height
+
+    @property
+    def page_size(self):
+        width = 2 * self.margin + self.columns * self.cell_width + (self.columns - 1) * self.gutter
+        height = 2 * self.margin + self.rows * self.cell_height + (self.rows - 1) * self.gutter + self.font_size
+        return width, height
+
+
+def load_shot_list(path):
+    """Liest eine Shotliste aus JSON (Liste von Objekten) oder CSV (mit Kopfzeile)."""
+    base_directory = os.path.dirname(os.path.abspath(path))
+    if path.lower().endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as handle:
+            entries = list(csv.DictReader(handle))
+    else:
+        with open(path, encoding="utf-8") as handle:
+            entries = json.load(handle)
+    shots = [Shot.from_dict(entry) for entry in entries]
+    for shot in shots:
+        # Relative Bildpfade beziehen sich auf den Ort der Shotliste
+        shot.image_path = os.path.join(base_directory, shot.image_path)
+    return shots
+
+
+def fit_text(draw, text, font, width):
+    """Kürzt text mit Auslassungszeichen, bis er in width Pixel passt."""
+    if draw.textlength(text, font=font) <= width:
+        return text
+    # Binäre Suche nach dem längsten passenden Präfix
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if draw.textlength(text[:middle].rstrip() + "…", font=font) <= width:
+            low = middle
+        else:
+            high = middle - 1
+    return text[:low].rstrip() + "…"
+
+
+class StoryboardRenderer:
+    def __init__(self, layout=None, max_workers=None):
+        self.layout = layout or StoryboardLayout()
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.text_service = TextService()
+
+    def render_cell(self, shot):
+        """Rendert eine Zelle: Bild mit Rahmen, darunter Szenenname und Beschreibung."""
+        layout = self.layout
+        cell = Image.new("RGB", (layout.cell_width, layout.cell_height), layout.background)
+        try:
+            # Verkleinerte Dekodierung: nur so groß wie die Bildfläche der Zelle
+            image = decode_thumbnail(shot.image_path, max(layout.cell_width, layout.image_height))
+            image.thumbnail((layout.cell_width, layout.image_height), Image.LANCZOS)
+            draw_frame(image, format=shot.format, width=shot.width,
+                       color=layout.frame_color, pen_width=layout.frame_pen_width)
+            cell.paste(image, ((layout.cell_width - image.width) // 2, (layout.image_height - image.height) // 2))
+        except Exception as e:
+            logger.error("Shot %s konnte nicht gerendert werden: %s", shot.image_path, e)
+            draw = ImageDraw.Draw(cell)
+            draw.rectangle([0, 0, layout.cell_width - 1, layout.image_height - 1], outline="#999999", width=2)
+            draw.text((10, 10), os.path.basename(shot.image_path), fill="#999999", font=load_font(layout.font_size))
+
+        name, description = self.text_service.format_scene_text(shot.name, shot.description)
+        draw = ImageDraw.Draw(cell)
+        fill = ImageColor.getrgb(layout.text_color)
+        font = load_font(layout.font_size)
+        top = layout.image_height + layout.font_size // 3
+        draw.text((0, top), fit_text(draw, name, font, layout.cell_width), fill=fill, font=font)
+        draw.text((0, top + round(layout.font_size * 1.2)), fit_text(draw, description, font, layout.cell_width),
+                  fill=fill, font=font)
+        return cell
+
+    def compose_page(self, cells, page_number, page_count):
+        """Setzt die Zellen einer Seite zusammen und nummeriert die Seite."""
+        layout = self.layout
+        page = Image.new("RGB", layout.page_size, layout.background)
+        for index, cell in enumerate(cells):
+            row, column = divmod(index, layout.columns)
+            page.paste(cell, (layout.margin + column * (layout.cell_width + layout.gutter),
+                              layout.margin + row * (layout.cell_height + layout.gutter)))
+        footer = f"{page_number} / {page_count}"
+        draw = ImageDraw.Draw(page)
+        font = load_font(layout.font_size // 2 + 4)
+        width = draw.textlength(footer, font=font)
+        draw.text(((layout.page_size[0] - width) / 2, layout.page_size[1] - layout.margin),
+                  footer, fill=ImageColor.getrgb(layout.text_color), font=font)
+        return page
+
+    def pages(self, shots):
+        """Erzeugt die Seiten nacheinander; die Zellen der nächsten Seite laufen schon parallel."""
+        shots = list(shots)
+        per_page = self.layout.shots_per_page
+        chunks = [shots[start:start + per_page] for start in range(0, len(shots), per_page)]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = [executor.submit(self.render_cell, shot) for shot in chunks[0]] if chunks else []
+            for page_index in range(len(chunks)):
+                current = pending
+                if page_index + 1 < len(chunks):
+                    pending = [executor.submit(self.render_cell, shot) for shot in chunks[page_index + 1]]
+                cells = [future.result() for future in current]
+                yield self.compose_page(cells, page_index + 1, len(chunks))
+
+    def render(self, shots, output_path):
+        """Schreibt das Storyboard als PDF (eine Datei) oder PNG (eine Datei je Seite).
+
+        Gibt die Liste der geschriebenen Dateien zurück.
+        """
+        root, extension = os.path.splitext(output_path)
+        extension = extension.lower()
+        if extension not in (".pdf", ".png"):
+            raise ValueError(f"Nicht unterstütztes Storyboard-Format: {extension}")
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+
+        written = []
+        for number, page in enumerate(self.pages(shots), start=1):
+            if extension == ".pdf":
+                page.save(output_path, "PDF", resolution=self.layout.dpi, append=number > 1)
+                if number == 1:
+                    written.append(output_path)
+            else:
+                page_path = f"{root}_{number:03d}.png"
+                page.save(page_path)
+                written.append(page_path)
+            logger.debug("Storyboard-Seite %s geschrieben", number)
+        logger.info("Storyboard mit %s Shots nach %s geschrieben", len(shots), output_path)
+        return written
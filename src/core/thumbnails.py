@@ -0,0 +1,140 @@
+"""Schnelle Vorschaubilder mit verkleinerter Dekodierung und Plattenspeicher.
+
+Ein Vorschaubild entsteht auf dem billigsten verfügbaren Weg:
+
+1. eingebettetes EXIF-Vorschaubild (JPEG), wenn es groß genug ist und das
+   Seitenverhältnis des Bildes hat,
+2. JPEG-DCT-Skalierung über draft() (Dekodierung in 1/2 bis 1/8 Größe),
+3. sonst volle Dekodierung mit anschließendem reduce().
+
+ThumbnailStore legt die Ergebnisse dauerhaft unter sample_hash und mtime
+ab; umbenannte (oder mit mtime kopierte) Dateien finden ihr Vorschaubild
+daher wieder. sample_hash allein übersieht Änderungen in der Dateimitte bei
+gleicher Größe, z. B. in unkomprimierten BMP- oder TIFF-Dateien.
+"""
+import hashlib
+import io
+import logging
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from PIL import ExifTags, Image
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Bytes vom Anfang und Ende einer Datei, die in den Inhaltshash eingehen
+HASH_SAMPLE_BYTES = 64 * 1024
+
+# EXIF-Tags im IFD1 mit Position und Länge des eingebetteten JPEG-Vorschaubilds
+_EXIF_THUMBNAIL_OFFSET = 0x0201
+_EXIF_THUMBNAIL_LENGTH = 0x0202
+
+
+def sample_hash(path):
+    """Inhaltshash aus Dateigröße, Anfang und Ende der Datei.
+
+    Liest unabhängig von der Dateigröße höchstens 128 KB; bei komprimierten
+    Bildern ändern sich Kopfdaten oder Länge bei jeder Bearbeitung.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    size = os.path.getsize(path)
+    digest.update(str(size).encode())
+    with open(path, "rb") as handle:
+        digest.update(handle.read(HASH_SAMPLE_BYTES))
+        if size > 2 * HASH_SAMPLE_BYTES:
+            handle.seek(-HASH_SAMPLE_BYTES, os.SEEK_END)
+            digest.update(handle.read())
+    return digest.hexdigest()
+
+
+def exif_thumbnail(image):
+    """Eingebettetes EXIF-Vorschaubild als PIL-Bild oder None."""
+    raw = image.info.get("exif")
+    ifd1_tag = getattr(ExifTags.IFD, "IFD1", None)
+    if not raw or ifd1_tag is None:
+        return None
+    try:
+        ifd1 = image.getexif().get_ifd(ifd1_tag)
+        offset, length = ifd1.get(_EXIF_THUMBNAIL_OFFSET), ifd1.get(_EXIF_THUMBNAIL_LENGTH)
+        if not offset or not length:
+            return None
+        # Offsets zählen ab dem TIFF-Kopf, also nach dem Präfix "Exif\0\0"
+        start = offset + (6 if raw.startswith(b"Exif\x00\x00") else 0)
+        thumbnail = Image.open(io.BytesIO(raw[start:start + length]))
+        thumbnail.load()
+        return thumbnail
+    except Exception as e:
+        logger.debug("EXIF-Vorschaubild nicht lesbar: %s", e)
+        return None
+
+
+def decode_thumbnail(path, max_size=None):
+    """Dekodiert ein RGB-Vorschaubild, dessen längere Seite höchstens max_size beträgt."""
+    max_size = max_size or settings.THUMBNAIL_SIZE
+    with Image.open(path) as image:
+        width, height = image.size
+        if image.format == "JPEG":
+            embedded = exif_thumbnail(image)
+            if embedded is not None and max(embedded.size) >= min(max_size, max(width, height)) \
+                    and abs(embedded.width / embedded.height - width / height) < 0.01:
+                image = embedded
+            else:
+                # DCT-Skalierung: dekodiert direkt in der kleinsten Stufe >= Zielgröße
+                image.draft("RGB", (max_size, max_size))
+        thumbnail = image.convert("RGB") if image.mode != "RGB" else image.copy()
+    thumbnail.thumbnail((max_size, max_size), Image.LANCZOS, reducing_gap=2.0)
+    return thumbnail
+
+
+class ThumbnailStore:
+    """Dauerhafter Speicher für Vorschaubilder, abgelegt nach sample_hash, mtime und Größe."""
+
+    def __init__(self, directory=None, max_size=None, quality=85):
+        self.directory = directory or settings.THUMBNAIL_CACHE_DIR
+        self.max_size = max_size or settings.THUMBNAIL_SIZE
+        self.quality = quality
+
+    def thumbnail_path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}_{self.max_size}.jpg")
+
+    def get(self, path):
+        """Pfad des Vorschaubilds zu path; wird bei Bedarf erzeugt."""
+        target = self.thumbnail_path(f"{sample_hash(path)}_{os.stat(path).st_mtime_ns}")
+        if not os.path.exists(target):
+            thumbnail = decode_thumbnail(path, self.max_size)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            # Erst vollständig schreiben, dann umbenennen: parallele Leser sehen nie halbe Dateien
+            handle, temporary = tempfile.mkstemp(dir=os.path.dirname(target), suffix=".tmp")
+            try:
+                with os.fdopen(handle, "wb") as output:
+                    thumbnail.save(output, "JPEG", quality=self.quality)
+                os.replace(temporary, target)
+            except BaseException:
+                os.remove(temporary)
+                raise
+        return target
+
+    def load(self, path):
+        """Vorschaubild zu path als PIL-Bild."""
+        with Image.open(self.get(path)) as thumbnail:
+            thumbnail.load()
+            return thumbnail
+
+    def generate(self, paths, max_workers=None, on_result=None):
+        """Erzeugt Vorschaubilder für viele Dateien parallel; liefert {Pfad: Vorschaupfad oder Exception}.
+
+        Dekodieren und Skalieren laufen in PIL ohne GIL, daher genügen Threads.
+        """
+        results = {}
+        with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count() or 1) as executor:
+            futures = {executor.submit(self.get, path): path for path in paths}
+            for future, path in futures.items():
+                try:
+                    results[path] = future.result()
+                except Exception as e:
+                    logger.error("Vorschaubild für %s fehlgeschlagen: %s", path, e)
+                    results[path] = e
+                if on_result is not None:
+                    on_result(path, results[path])
+        return results
@@ -0,0 +1,232 @@
+"""Kachelweise, speicherbegrenzte Ausführung von Rezepten für sehr große Bilder.
+
+Bilder, deren längere Seite settings.MAX_IMAGE_DIMENSION überschreitet,
+werden nicht als Ganzes durch die Operationen gereicht. Das dekodierte Bild
+liegt genau einmal in einem uint8-Puffer; ab settings.IMAGE_MEMORY_BUDGET
+Bytes ist das ein np.memmap in settings.TEMP_DIR, dessen Seiten das
+Betriebssystem auslagern kann.
+
+- Punktweise Operationen (adjust, balance, lut, baked_lut) laufen streifenweise
+  direkt im Puffer; Zwischenpuffer bleiben unter settings.TILE_MEMORY_BUDGET.
+- crop und reframe (Zuschnitt auf den Rahmen) sind Bereichszugriffe ohne
+  Kopie, Drehungen um Vielfache von 90° und Spiegelungen werden blockweise
+  in einen neuen Puffer umkopiert.
+- frame, text und burn_in zeichnen streifenweise mit Versatz.
+
+Nur freie Drehwinkel fallen auf PIL mit dem ganzen Bild zurück.
+"""
+import logging
+import math
+import os
+import tempfile
+import numpy as np
+from PIL import Image
+from src.config import settings
+from src.core import recipe
+from src.core.color_transform import ColorTransform, estimate_mean_luma
+from src.core.framing import frame_box
+from src.core.geometry import Geometry
+
+logger = logging.getLogger(__name__)
+
+# Arbeitsspeicher je Pixelwert eines Streifens (Ein-/Ausgabe plus float32-Blöcke)
+BYTES_PER_TILE_VALUE = 4
+
+
+def needs_tiling(size):
+    """True, wenn ein Bild der Größe (Breite, Höhe) kachelweise verarbeitet werden soll."""
+    return max(size) > settings.MAX_IMAGE_DIMENSION
+
+
+def rows_per_tile(width, channels, memory_budget=None):
+    """Zeilenzahl eines Streifens, dessen Arbeitsspeicher in das Budget passt."""
+    budget = memory_budget or settings.TILE_MEMORY_BUDGET
+    return max(1, budget // (max(1, width) * channels * BYTES_PER_TILE_VALUE))
+
+
+class TiledImage:
+    """RGB/RGBA-uint8-Bildpuffer im Speicher oder als memmap auf der Platte.
+
+    array ist ein (H, W, C)-Array; Bereichszugriffe (crop) teilen sich den
+    Puffer mit dem Ausgangsbild. Alle Operationen laufen über Streifen oder
+    Blöcke, deren Größe aus memory_budget folgt.
+    """
+
+    def __init__(self, array, memory_budget=None, backing=None):
+        self.array = array
+        self.memory_budget = memory_budget or settings.TILE_MEMORY_BUDGET
+        # Temporäre Datei hinter einem memmap; wird mit dem letzten Verweis gelöscht
+        self._backing = backing
+
+    @classmethod
+    def allocate(cls, shape, memory_budget=None):
+        """Legt einen uninitialisierten Puffer an, ab IMAGE_MEMORY_BUDGET auf der Platte."""
+        if math.prod(shape) <= settings.IMAGE_MEMORY_BUDGET:
+            return cls(np.empty(shape, np.uint8), memory_budget)
+        os.makedirs(settings.TEMP_DIR, exist_ok=True)
+        backing = tempfile.TemporaryFile(dir=settings.TEMP_DIR, prefix="tile_", suffix=".raw")
+        array = np.memmap(backing, dtype=np.uint8, mode="w+", shape=shape)
+        return cls(array, memory_budget, backing)
+
+    @classmethod
+    def from_image(cls, image, memory_budget=None):
+        """Überträgt ein PIL-Bild streifenweise in einen Puffer (RGB oder RGBA)."""
+        mode = "RGBA" if "A" in image.getbands() else "RGB"
+        width, height = image.size
+        tiled = cls.allocate((height, width, len(mode)), memory_budget)
+        rows = rows_per_tile(width, len(mode), tiled.memory_budget)
+        for top in range(0, height, rows):
+            strip = image.crop((0, top, width, min(height, top + rows)))
+            if strip.mode != mode:
+                strip = strip.convert(mode)
+            tiled.array[top:top + rows] = np.asarray(strip)
+        return tiled
+
+    @property
+    def size(self):
+        return self.array.shape[1], self.array.shape[0]
+
+    @property
+    def mode(self):
+        return "RGBA" if self.array.shape[2] == 4 else "RGB"
+
+    def _derive(self, array):
+        return TiledImage(array, self.memory_budget, self._backing)
+
+    def strips(self):
+        """Liefert (top, streifen) als beschreibbare Sichten auf den Puffer."""
+        height, width, channels = self.array.shape
+        rows = rows_per_tile(width, channels, self.memory_budget)
+        for top in range(0, height, rows):
+            yield top, self.array[top:top + rows]
+
+    def materialize(self, view):
+        """Kopiert eine (gedrehte/gespiegelte) Sicht blockweise in einen neuen, zusammenhängenden Puffer."""
+        target = TiledImage.allocate(view.shape, self.memory_budget)
+        height, width, channels = view.shape
+        block = max(1, int(math.sqrt(self.memory_budget / (channels * BYTES_PER_TILE_VALUE))))
+        for top in range(0, height, block):
+            for left in range(0, width, block):
+                target.array[top:top + block, left:left + block] = view[top:top + block, left:left + block]
+        return target
+
+    def contiguous(self):
+        """Gibt das Bild mit zusammenhängendem Puffer zurück (z. B. nach crop)."""
+        if self.array.flags.c_contiguous:
+            return self
+        return self.materialize(self.array)
+
+    # Geometrie
+
+    def rotate(self, angle=90):
+        if angle % 90:
+            logger.warning("Drehung um %s° wird nicht kachelweise ausgeführt", angle)
+            return TiledImage.from_image(recipe.rotate(self.to_pil(), angle), self.memory_budget)
+        turns = (angle // 90) % 4
+        return self.materialize(np.rot90(self.array, turns)) if turns else self
+
+    def flip(self, direction="horizontal"):
+        if direction == "horizontal":
+            return self.materialize(self.array[:, ::-1])
+        if direction == "vertical":
+            return self.materialize(self.array[::-1])
+        raise ValueError(f"Unbekannte Spiegelrichtung: {direction}")
+
+    def crop(self, box):
+        left, upper, right, lower = (int(value) for value in box)
+        width, height = self.size
+        if 0 <= left <= right <= width and 0 <= upper <= lower <= height:
+            return self._derive(self.array[upper:lower, left:right])
+        # Wie PIL: Bereiche außerhalb des Bildes werden schwarz (und transparent)
+        target = TiledImage.allocate((max(0, lower - upper), max(0, right - left), self.array.shape[2]),
+                                     self.memory_budget)
+        for _, strip in target.strips():
+            strip[...] = 0
+        src_left, src_upper = max(left, 0), max(upper, 0)
+        src_right, src_lower = min(right, width), min(lower, height)
+        if src_left < src_right and src_upper < src_lower:
+            target.array[src_upper - upper:src_lower - upper, src_left - left:src_right - left] = \
+                self.array[src_upper:src_lower, src_left:src_right]
+        return target
+
+    def reframe(self, format=settings.DEFAULT_FRAME_FORMAT, width=100, mode="crop", matte_color="#000000",
+                matte_opacity=1.0):
+        box = frame_box(self.size, format, width)
+        if mode == "crop":
+            return self.crop(box)
+        if mode == "letterbox":
+            return self.draw("burn_in", frame_rect=box, draw_frame=False, matte_color=matte_color,
+                             matte_opacity=matte_opacity)
+        raise ValueError(f"Unbekannter Rahmenmodus: {mode}")
+
+    def transform(self, steps):
+        """Zusammengefasste rotate/flip/crop-Folge: Bereichszugriff plus ein Umkopieren."""
+        image = self
+        for geometry in Geometry.chain(steps, self.size):
+            cropped = image.crop(geometry.box) if geometry.box is not None else image
+            if geometry.turns or geometry.mirrored:
+                cropped = image.materialize(geometry.orient(cropped.array))
+            image = cropped
+        return image
+
+    # Punktweise Operationen (in place, streifenweise)
+
+    def adjust(self, brightness=0, contrast=0, grayscale=0, sepia=0):
+        if not (brightness or contrast or grayscale or sepia):
+            return self
+        mean_luma = estimate_mean_luma(self.array) if contrast else 128.0
+        transform = ColorTransform.from_adjustments(brightness, contrast, grayscale, sepia, mean_luma)
+        for _, strip in self.strips():
+            transform.apply(strip, out=strip)
+        return self
+
+    def balance(self, gains=(1.0, 1.0, 1.0), offset=0.0):
+        transform = ColorTransform.from_gains(gains, offset)
+        if transform.is_identity():
+            return self
+        for _, strip in self.strips():
+            transform.apply(strip, out=strip)
+        return self
+
+    def lut(self, path, method="tetrahedral"):
+        from src.filters.lut_filters import load_lut
+
+        return self.baked_lut(load_lut(path), method)
+
+    def baked_lut(self, lut, method="tetrahedral"):
+        for _, strip in self.strips():
+            strip[...] = lut.apply(strip, method)
+        return self
+
+    # Zeichnen
+
+    def draw(self, op, **params):
+        """Führt eine Zeichenoperation (recipe.DRAWING_OPS/ARRAY_DRAWING_OPS) streifenweise aus."""
+        if op in recipe.ARRAY_DRAWING_OPS:
+            for top, strip in self.strips():
+                recipe.ARRAY_DRAWING_OPS[op](strip, offset=(0, top), size=self.size, **params)
+            return self
+        draw = recipe.DRAWING_OPS[op]
+        for top, strip in self.strips():
+            region = Image.fromarray(np.ascontiguousarray(strip))
+            draw(region, offset=(0, top), size=self.size, **params)
+            strip[...] = np.asarray(region)
+        return self
+
+    def to_pil(self):
+        """PIL-Bild, das sich den (zusammenhängenden) Puffer teilt, z. B. zum Speichern."""
+        array = self.contiguous().array
+        height, width = array.shape[:2]
+        return Image.frombuffer(self.mode, (width, height), array, "raw", self.mode, 0, 1)
+
+
+def apply_recipe_tiled(tiled, ops):
+    """Führt ein (validiertes oder kompiliertes) Rezept kachelweise auf einem TiledImage aus."""
+    for step in ops:
+        params = {key: value for key, value in step.items() if key != "op"}
+        op = step["op"]
+        if op in recipe.DRAWING_OPS or op in recipe.ARRAY_DRAWING_OPS:
+            tiled = tiled.draw(op, **params)
+        else:
+            tiled = getattr(tiled, op)(**params)
+    return tiled
@@ -1,27 +1,244 @@
+import os
+import threading
 import numpy as np
-import cv2
+from PIL import Image
+from src.core import profiler
+
+# Pixel pro Kachel bei der Anwendung; hält die Zwischenpuffer im Cache
+LUT_TILE_PIXELS = 1 << 14
+# Anzahl geparster LUTs, die im Speicher gehalten werden
+LUT_CACHE_SIZE = 16
+
+_lut_cache = {}
+_lut_cache_lock = threading.Lock()
+
+
+def parse_cube(path):
+    """Liest eine Adobe/Resolve-.cube-Datei als float32-Gitter (N, N, N, 3) [r, g, b]."""
+    size = None
+    domain_min = np.zeros(3, np.float32)
+    domain_max = np.ones(3, np.float32)
+    values = []
+    with open(path, "r", encoding="utf-8", errors="replace") as handle:
+        for line in handle:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            keyword = line.split()[0].upper()
+            if keyword == "LUT_3D_SIZE":
+                size = int(line.split()[1])
+            elif keyword == "LUT_1D_SIZE":
+                raise ValueError(f"1D-LUTs werden nicht unterstützt: {path}")
+            elif keyword == "DOMAIN_MIN":
+                domain_min = np.array(line.split()[1:4], np.float32)
+            elif keyword == "DOMAIN_MAX":
+                domain_max = np.array(line.split()[1:4], np.float32)
+            elif keyword[0].isalpha() or keyword[0] == "_":
+                # TITLE und herstellerspezifische Schlüsselwörter
+                continue
+            else:
+                values.append(line)
+
+    if size is None:
+        raise ValueError(f"LUT_3D_SIZE fehlt in {path}")
+    table = np.loadtxt(values, dtype=np.float32, ndmin=2) if values else np.empty((0, 3), np.float32)
+    if table.shape != (size ** 3, 3):
+        raise ValueError(f"Erwartet {size ** 3} Einträge in {path}, gefunden {table.shape[0]}")
+    # In .cube-Dateien läuft Rot am schnellsten: Zeilen sind [b][g][r] geordnet
+    lattice = table.reshape(size, size, size, 3).transpose(2, 1, 0, 3)
+    lattice = (lattice - domain_min) / (domain_max - domain_min)
+    return np.ascontiguousarray(lattice, dtype=np.float32)
+
+
+def load_hald(path):
+    """Liest ein HaldCLUT-PNG (Level L, Bildgröße L^3 x L^3) als Gitter (L^2, L^2, L^2, 3)."""
+    with Image.open(path) as image:
+        pixels = np.asarray(image.convert("RGB"))
+    height, width = pixels.shape[:2]
+    level = round(width ** (1 / 3))
+    if width != height or level ** 3 != width:
+        raise ValueError(f"Keine gültige HaldCLUT-Größe: {width}x{height}")
+    size = level * level
+    # Auch hier läuft Rot am schnellsten, dann Grün, dann Blau
+    lattice = pixels.reshape(size, size, size, 3).transpose(2, 1, 0, 3)
+    return np.ascontiguousarray(lattice, dtype=np.float32) / 255.0
+
+
+class LUT3D:
+    """Kompaktes 3D-LUT-Gitter mit vektorisierter Interpolation.
+
+    Das Gitter hat die Form (N, N, N, 3) mit Index [r, g, b] und Werten in
+    [0, 1]. apply() interpoliert trilinear oder tetraedrisch über ganze
+    Bilder, kachelweise, damit die Zwischenpuffer klein bleiben.
+    """
+
+    METHODS = ("tetrahedral", "trilinear")
+
+    def __init__(self, lattice):
+        lattice = np.asarray(lattice, dtype=np.float32)
+        if lattice.ndim != 4 or lattice.shape[3] != 3 or len(set(lattice.shape[:3])) != 1:
+            raise ValueError(f"Erwartet Gitter der Form (N, N, N, 3), erhalten {lattice.shape}")
+        self.size = lattice.shape[0]
+        self.lattice = np.ascontiguousarray(lattice)
+        # Kanalweise flache Ebenen: schnelle 1D-Gathers statt Zeilenindizierung
+        self._planes = [np.ascontiguousarray(self.lattice[..., channel]).ravel() for channel in range(3)]
+        self._strides = (self.size * self.size, self.size, 1)
+        # Für 8-Bit-Eingaben stehen Gitterindex und Nachkommaanteil pro Wert fest
+        position = np.arange(256, dtype=np.float32) * ((self.size - 1) / 255.0)
+        base = np.minimum(position.astype(np.intp), self.size - 2)
+        self._fraction_table = (position - base).astype(np.float32)
+        self._index_tables = [base * stride for stride in self._strides]
+
+    @classmethod
+    def identity(cls, size=33):
+        """Neutrales Gitter, das jede Farbe auf sich selbst abbildet."""
+        axis = np.linspace(0, 1, size, dtype=np.float32)
+        r, g, b = np.meshgrid(axis, axis, axis, indexing="ij")
+        return cls(np.stack([r, g, b], axis=-1))
+
+    @classmethod
+    def bake(cls, stages, size=33):
+        """Tastet eine Kette punktweiser Farbfunktionen einmal auf einem Gitter ab.
+
+        Jede Stufe bildet float32-Farben (n, 3) im Bereich 0..255 auf neue
+        Farben im gleichen Bereich ab. Das Ergebnis ersetzt die ganze Kette.
+        """
+        nodes = cls.identity(size).lattice.reshape(-1, 3) * 255
+        for stage in stages:
+            nodes = stage(nodes)
+        return cls(np.clip(nodes / 255, 0, 1).reshape(size, size, size, 3))
+
+    @classmethod
+    def from_file(cls, path):
+        """Lädt .cube-Dateien oder HaldCLUT-Bilder."""
+        if path.lower().endswith(".cube"):
+            return cls(parse_cube(path))
+        return cls(load_hald(path))
+
+    def apply(self, image, method="tetrahedral"):
+        """Wendet die LUT auf ein RGB- oder RGBA-uint8-Array an (Alpha bleibt erhalten)."""
+        if method not in self.METHODS:
+            raise ValueError(f"Unbekannte Interpolation: {method}")
+        if image.dtype != np.uint8 or image.ndim != 3 or image.shape[2] not in (3, 4):
+            raise ValueError(f"Erwartet RGB/RGBA-uint8-Array, erhalten {image.shape} {image.dtype}")
+        interpolate = self._tetrahedral if method == "tetrahedral" else self._trilinear
+        with profiler.span("lut", image.shape[0] * image.shape[1], image.nbytes):
+            return self._apply(image, interpolate)
+
+    def _apply(self, image, interpolate):
+        out = np.empty_like(image)
+        if image.shape[2] == 4:
+            out[..., 3] = image[..., 3]
+        height, width = image.shape[:2]
+        rows = max(1, LUT_TILE_PIXELS // max(1, width))
+        for top in range(0, height, rows):
+            tile = image[top:top + rows, :, :3].reshape(-1, 3)
+            result = interpolate(*self._locate(tile))
+            result *= 255
+            result += 0.5
+            np.clip(result, 0, 255, out=result)
+            out[top:top + rows, :, :3] = result.reshape(-1, width, 3)
+        return out
+
+    def _locate(self, rgb):
+        """Basis-Gitterindex und Nachkommaanteile (r, g, b) je Pixel."""
+        r, g, b = rgb[:, 0], rgb[:, 1], rgb[:, 2]
+        index = self._index_tables[0][r] + self._index_tables[1][g] + self._index_tables[2][b]
+        fractions = self._fraction_table
+        return index, fractions[r], fractions[g], fractions[b]
+
+    def apply_float(self, rgb, method="tetrahedral"):
+        """Wendet die LUT auf float32-Farben (n, 3) im Bereich 0..255 an."""
+        if method not in self.METHODS:
+            raise ValueError(f"Unbekannte Interpolation: {method}")
+        position = np.clip(rgb, 0, 255).astype(np.float32) * ((self.size - 1) / 255.0)
+        base = np.minimum(position.astype(np.intp), self.size - 2)
+        fraction = position - base
+        index = base @ np.array(self._strides, np.intp)
+        interpolate = self._tetrahedral if method == "tetrahedral" else self._trilinear
+        return interpolate(index, fraction[:, 0], fraction[:, 1], fraction[:, 2]) * 255
+
+    def _trilinear(self, index, fr, fg, fb):
+        sr, sg, sb = self._strides
+        weights = []
+        offsets = []
+        for dr, wr in ((0, 1 - fr), (sr, fr)):
+            for dg, wg in ((0, 1 - fg), (sg, fg)):
+                wrg = wr * wg
+                for db, wb in ((0, 1 - fb), (sb, fb)):
+                    offsets.append(dr + dg + db)
+                    weights.append(wrg * wb)
+        result = np.zeros((len(index), 3), np.float32)
+        for offset, weight in zip(offsets, weights):
+            corner = index + offset
+            for channel, plane in enumerate(self._planes):
+                result[:, channel] += plane.take(corner) * weight
+        return result
+
+    def _tetrahedral(self, index, fr, fg, fb):
+        sr, sg, sb = self._strides
+        # Der Tetraeder ergibt sich aus der Reihenfolge der Nachkommaanteile;
+        # Gleichstände werden für Maximum (r, g, b) und Minimum (b, g, r) fest aufgelöst
+        r_max = (fr >= fg) & (fr >= fb)
+        g_max = ~r_max & (fg >= fb)
+        b_min = (fb <= fg) & (fb <= fr)
+        g_min = ~b_min & (fg <= fr)
+        max_stride = np.where(r_max, sr, np.where(g_max, sg, sb))
+        min_stride = np.where(b_min, sb, np.where(g_min, sg, sr))
+        f_max = np.maximum(np.maximum(fr, fg), fb)
+        f_min = np.minimum(np.minimum(fr, fg), fb)
+        f_mid = fr + fg + fb - f_max - f_min
+
+        first = index + max_stride
+        second = index + (sr + sg + sb - min_stride)
+        last = index + (sr + sg + sb)
+        corners = ((index, 1 - f_max), (first, f_max - f_mid), (second, f_mid - f_min), (last, f_min))
+        result = np.empty((len(index), 3), np.float32)
+        for channel, plane in enumerate(self._planes):
+            acc = plane.take(index) * corners[0][1]
+            for corner, weight in corners[1:]:
+                acc += plane.take(corner) * weight
+            result[:, channel] = acc
+        return result
+
+
+def load_lut(lut_path):
+    """Lädt eine LUT; bereits gelesene Dateien werden über Pfad und mtime wiederverwendet."""
+    stat = os.stat(lut_path)
+    key = (os.path.abspath(lut_path), stat.st_mtime_ns, stat.st_size)
+    with _lut_cache_lock:
+        lut = _lut_cache.get(key)
+    if lut is None:
+        lut = LUT3D.from_file(lut_path)
+        with _lut_cache_lock:
+            _lut_cache[key] = lut
+            while len(_lut_cache) > LUT_CACHE_SIZE:
+                _lut_cache.pop(next(iter(_lut_cache)))
+    return lut
+
 
 class LUTFilter:
-    def __init__(self, lut_path):
+    def __init__(self, lut_path, method="tetrahedral"):
+        self.method = method
         self.lut = self._load_lut(lut_path)
 
     def _load_lut(self, lut_path):
-        """Lädt eine 3D-LUT-Datei."""
-        lut = cv2.imread(lut_path, cv2.IMREAD_UNCHANGED)
-        lut = lut.astype(np.float32) / 255.0
-        return lut
+        """Lädt eine 3D-LUT-Datei (.cube oder HaldCLUT)."""
+        return load_lut(lut_path)
 
     def apply_lut(self, image):
         """Wendet die 3D-LUT auf das Bild an."""
-        return cv2.transform(image, self.lut)
+        return self.lut.apply(image, self.method)
 
 class ColorFilter:
     def apply_grayscale(self, image):
         """Wendet einen Graustufen-Filter auf das Bild an."""
+        import cv2
         return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
 
     def apply_sepia(self, image):
         """Wendet einen Sepia-Filter auf das Bild an."""
+        import cv2
         sepia_filter = np.array([[0.272, 0.534, 0.131],
                                  [0.349, 0.686, 0.168],
                                  [0.393, 0.769, 0.189]])
@@ -1,9 +1,15 @@
 import logging
-from PySide6.QtGui import QImage
-from PIL import Image, ImageEnhance, ImageOps
+import os
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QImage, QImageReader
+from PIL import Image, UnidentifiedImageError
 import numpy as np
+from src.config import settings
+from src.core import encoders
+from src.core.color_transform import ColorTransform, estimate_mean_luma
+from src.core.thumbnails import ThumbnailStore
+from src.utils.image_utils import normalize_qimage, qimage_to_numpy, numpy_to_qimage, qimage_to_pil, pil_to_qimage
 
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 class ImageProcessingService:
@@ -12,130 +18,156 @@ class ImageProcessingService:
             image = QImage(image_path)
             if image.isNull():
                 raise ValueError(f"Failed to load image from {image_path}")
-            logger.info(f"Image loaded from {image_path}")
+            image = normalize_qimage(image)
+            logger.info("Image loaded from %s", image_path)
             return image
         except Exception as e:
-            logger.error(f"Error loading image: {str(e)}")
+            logger.error("Error loading image: %s", e)
             raise
 
-    def save_image(self, image: QImage, file_path: str):
+    def load_thumbnail(self, image_path: str, store: ThumbnailStore = None) -> QImage:
+        """Small preview from the persistent thumbnail store, generated with reduced-size decoding."""
+        store = store or ThumbnailStore()
         try:
+            return normalize_qimage(QImage(store.get(image_path)))
+        except UnidentifiedImageError:
+            # Formats only Qt can read: let the Qt decoder scale while decoding
+            return self.read_scaled(image_path, store.max_size)
+        except Exception as e:
+            logger.error("Error loading thumbnail: %s", e)
+            raise
+
+    def read_scaled(self, image_path: str, max_size: int) -> QImage:
+        """Decode directly at reduced size with QImageReader.setScaledSize."""
+        try:
+            reader = QImageReader(image_path)
+            size = reader.size()
+            if size.isValid() and max(size.width(), size.height()) > max_size:
+                reader.setScaledSize(size.scaled(max_size, max_size, Qt.KeepAspectRatio))
+            image = reader.read()
+            if image.isNull():
+                raise ValueError(f"Failed to load image from {image_path}: {reader.errorString()}")
+            return normalize_qimage(image)
+        except Exception as e:
+            logger.error("Error reading scaled image: %s", e)
+            raise
+
+    def save_image(self, image: QImage, file_path: str, preset=None):
+        """Save through the encoder presets (core/encoders.py); Qt only writes formats they do not cover."""
+        try:
+            extension = os.path.splitext(file_path)[1].lower()
+            if preset is not None or extension in settings.DEFAULT_ENCODER_PRESETS:
+                result = encoders.save(self.qimage_to_pil(image), file_path, preset)
+                logger.info("Image saved to %s (%s, %s bytes, encoded in %.0f ms)", file_path, result.preset,
+                            result.bytes, result.seconds * 1000)
+                return
             if not image.save(file_path):
                 raise ValueError(f"Failed to save image to {file_path}")
-            logger.info(f"Image saved to {file_path}")
+            logger.info("Image saved to %s", file_path)
         except Exception as e:
-            logger.error(f"Error saving image: {str(e)}")
+            logger.error("Error saving image: %s", e)
             raise
 
-    def qimage_to_pil(self, qimage: QImage) -> Image.Image:
+    def qimage_to_array(self, qimage: QImage) -> np.ndarray:
+        """Read-only RGBA view (H, W, 4) of the QImage pixels, without copying."""
         try:
-            """Convert QImage to PIL Image."""
-            # Get the dimensions of the QImage
-            width = qimage.width()
-            height = qimage.height()
-
-            # Get the format of the QImage
-            format = qimage.format()
-
-            # Convert QImage to bytes
-            bits = qimage.bits()
-            bits.setsize(height * width * 4)  # 4 bytes per pixel (RGBA)
-            arr = np.frombuffer(bits, np.uint8).reshape((height, width, 4))
-
-            # Convert to correct color format
-            if format == QImage.Format_RGB32:
-                arr = arr[:,:,:3]
-            elif format == QImage.Format_ARGB32:
-                arr = arr[:,:,[2,1,0,3]]  # BGRA to RGBA
-
-            # Create PIL Image
-            if arr.shape[2] == 3:
-                image = Image.fromarray(arr, 'RGB')
-            elif arr.shape[2] == 4:
-                image = Image.fromarray(arr, 'RGBA')
-            else:
-                raise ValueError(f"Unexpected number of channels: {arr.shape[2]}")
+            return qimage_to_numpy(qimage)
+        except Exception as e:
+            logger.error("Error converting QImage to array: %s", e)
+            raise
 
-            return image
+    def array_to_qimage(self, arr: np.ndarray) -> QImage:
+        """QImage borrowing the pixels of an RGBA uint8 array (H, W, 4); copy() it before it crosses threads."""
+        try:
+            return numpy_to_qimage(arr)
+        except Exception as e:
+            logger.error("Error converting array to QImage: %s", e)
+            raise
 
+    def qimage_to_pil(self, qimage: QImage) -> Image.Image:
+        try:
+            return qimage_to_pil(qimage)
         except Exception as e:
-            logger.error(f"Error converting QImage to PIL: {str(e)}")
+            logger.error("Error converting QImage to PIL: %s", e)
             raise
-    
+
     def pil_to_qimage(self, pil_image: Image.Image) -> QImage:
         try:
-            if pil_image.mode == "RGB":
-                r, g, b = pil_image.split()
-                pil_image = Image.merge("RGB", (b, g, r))
-            elif pil_image.mode == "RGBA":
-                r, g, b, a = pil_image.split()
-                pil_image = Image.merge("RGBA", (b, g, r, a))
-            
-            im2 = pil_image.convert("RGBA")
-            data = im2.tobytes("raw", "RGBA")
-            qimage = QImage(data, im2.size[0], im2.size[1], QImage.Format_RGBA8888)
+            qimage = pil_to_qimage(pil_image)
             logger.debug("PIL Image converted to QImage")
             return qimage
         except Exception as e:
-            logger.error(f"Error converting PIL to QImage: {str(e)}")
+            logger.error("Error converting PIL to QImage: %s", e)
+            raise
+
+    def apply_color_transform(self, image: QImage, transform: ColorTransform) -> QImage:
+        try:
+            arr = self.qimage_to_array(image)
+            return self.array_to_qimage(transform.apply(arr))
+        except Exception as e:
+            logger.error("Error applying color transform: %s", e)
+            raise
+
+    def apply_adjustments(self, image: QImage, brightness: float = 0, contrast: float = 0,
+                          grayscale: float = 0, sepia: float = 0) -> QImage:
+        """Apply all four slider adjustments in one fused pass."""
+        try:
+            arr = self.qimage_to_array(image)
+            mean_luma = estimate_mean_luma(arr) if contrast else 128.0
+            transform = ColorTransform.from_adjustments(brightness, contrast, grayscale, sepia, mean_luma)
+            adjusted = self.array_to_qimage(transform.apply(arr))
+            logger.debug("Adjustments applied: brightness=%s, contrast=%s, grayscale=%s, sepia=%s",
+                         brightness, contrast, grayscale, sepia)
+            return adjusted
+        except Exception as e:
+            logger.error("Error applying adjustments: %s", e)
             raise
 
     def adjust_brightness(self, image: QImage, value: float) -> QImage:
         try:
-            pil_image = self.qimage_to_pil(image)
-            enhancer = ImageEnhance.Brightness(pil_image)
-            adjusted = enhancer.enhance(1 + value / 100)
-            logger.debug(f"Brightness adjusted by {value}")
-            return self.pil_to_qimage(adjusted)
+            adjusted = self.apply_color_transform(image, ColorTransform.from_adjustments(brightness=value))
+            logger.debug("Brightness adjusted by %s", value)
+            return adjusted
         except Exception as e:
-            logger.error(f"Error adjusting brightness: {str(e)}")
+            logger.error("Error adjusting brightness: %s", e)
             raise
 
     def adjust_contrast(self, image: QImage, value: float) -> QImage:
         try:
-            pil_image = self.qimage_to_pil(image)
-            enhancer = ImageEnhance.Contrast(pil_image)
-            adjusted = enhancer.enhance(1 + value / 100)
-            logger.debug(f"Contrast adjusted by {value}")
-            return self.pil_to_qimage(adjusted)
+            arr = self.qimage_to_array(image)
+            transform = ColorTransform.from_adjustments(contrast=value, mean_luma=estimate_mean_luma(arr))
+            adjusted = self.array_to_qimage(transform.apply(arr))
+            logger.debug("Contrast adjusted by %s", value)
+            return adjusted
         except Exception as e:
-            logger.error(f"Error adjusting contrast: {str(e)}")
+            logger.error("Error adjusting contrast: %s", e)
             raise
 
     def apply_grayscale(self, image: QImage, intensity: float) -> QImage:
         try:
-            pil_image = self.qimage_to_pil(image)
-            gray_image = ImageOps.grayscale(pil_image)
-            blended = Image.blend(pil_image.convert("RGB"), gray_image.convert("RGB"), intensity / 100)
-            logger.debug(f"Grayscale applied with intensity {intensity}")
-            return self.pil_to_qimage(blended)
+            adjusted = self.apply_color_transform(image, ColorTransform.from_adjustments(grayscale=intensity))
+            logger.debug("Grayscale applied with intensity %s", intensity)
+            return adjusted
         except Exception as e:
-            logger.error(f"Error applying grayscale: {str(e)}")
+            logger.error("Error applying grayscale: %s", e)
             raise
 
     def sepia_filter(self, image: Image.Image) -> Image.Image:
         try:
-            img_array = np.array(image)
-            sepia_filter = np.array([
-                [0.393, 0.769, 0.189],
-                [0.349, 0.686, 0.168],
-                [0.272, 0.534, 0.131]
-            ])
-            sepia_img = np.clip(img_array.dot(sepia_filter.T), 0, 255).astype(np.uint8)
+            img_array = np.asarray(image.convert("RGB"))
+            sepia_img = ColorTransform.from_adjustments(sepia=100).apply(img_array)
             return Image.fromarray(sepia_img)
         except Exception as e:
-            logger.error(f"Error applying sepia filter: {str(e)}")
+            logger.error("Error applying sepia filter: %s", e)
             raise
 
     def apply_sepia(self, image: QImage, intensity: float) -> QImage:
         try:
-            pil_image = self.qimage_to_pil(image)
-            sepia_image = self.sepia_filter(pil_image)
-            blended = Image.blend(pil_image.convert("RGB"), sepia_image, intensity / 100)
-            logger.debug(f"Sepia applied with intensity {intensity}")
-            return self.pil_to_qimage(blended)
+            adjusted = self.apply_color_transform(image, ColorTransform.from_adjustments(sepia=intensity))
+            logger.debug("Sepia applied with intensity %s", intensity)
+            return adjusted
         except Exception as e:
-            logger.error(f"Error applying sepia: {str(e)}")
+            logger.error("Error applying sepia: %s", e)
             raise
 
     def rotate_image(self, image: QImage) -> QImage:
@@ -145,7 +177,7 @@ class ImageProcessingService:
             logger.debug("Image rotated 90 degrees")
             return self.pil_to_qimage(rotated)
         except Exception as e:
-            logger.error(f"Error rotating image: {str(e)}")
+            logger.error("Error rotating image: %s", e)
             raise
 
     def flip_image_horizontal(self, image: QImage) -> QImage:
@@ -155,7 +187,7 @@ class ImageProcessingService:
             logger.debug("Image flipped horizontally")
             return self.pil_to_qimage(flipped)
         except Exception as e:
-            logger.error(f"Error flipping image horizontally: {str(e)}")
+            logger.error("Error flipping image horizontally: %s", e)
             raise
 
     def flip_image_vertical(self, image: QImage) -> QImage:
@@ -165,5 +197,5 @@ class ImageProcessingService:
             logger.debug("Image flipped vertically")
             return self.pil_to_qimage(flipped)
         except Exception as e:
-            logger.error(f"Error flipping image vertically: {str(e)}")
+            logger.error("Error flipping image vertically: %s", e)
             raise
\ No newline at end of file
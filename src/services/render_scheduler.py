@@ -0,0 +1,108 @@
+import logging
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+from src.core.color_transform import RenderCancelled
+
+logger = logging.getLogger(__name__)
+
+class RenderJobSignals(QObject):
+    finished = Signal(int, object)
+    cancelled = Signal(int)
+    failed = Signal(int, str)
+
+class RenderJob(QRunnable):
+    def __init__(self, generation: int, render_fn, request, is_stale):
+        super().__init__()
+        self.generation = generation
+        self.render_fn = render_fn
+        self.request = request
+        self.is_stale = is_stale
+        self.signals = RenderJobSignals()
+        # The scheduler keeps the job alive until its signals have been delivered
+        self.setAutoDelete(False)
+
+    def run(self):
+        try:
+            result = self.render_fn(self.request, self.is_stale)
+        except RenderCancelled:
+            self.signals.cancelled.emit(self.generation)
+        except Exception as e:
+            self.signals.failed.emit(self.generation, str(e))
+        else:
+            self.signals.finished.emit(self.generation, result)
+
+class RenderScheduler(QObject):
+    """Runs renders on a worker thread, newest request wins.
+
+    render_fn(request, cancelled) is called off the GUI thread with at most
+    one render in flight. Requests arriving while a render runs replace each
+    other; the running render is asked to cancel via cancelled(), and only
+    the result of the newest request is emitted on result_ready.
+    """
+    result_ready = Signal(object)
+    render_failed = Signal(str)
+
+    def __init__(self, render_fn, parent=None):
+        super().__init__(parent)
+        self.render_fn = render_fn
+        self.thread_pool = QThreadPool(self)
+        self.thread_pool.setMaxThreadCount(1)
+
+        self._generation = 0
+        self._pending = None
+        self._in_flight = None
+
+    def request(self, request):
+        self._generation += 1
+        self._pending = (self._generation, request)
+        if self._in_flight is None:
+            self._start_pending()
+
+    def cancel(self, wait: bool = False):
+        """Drop the pending request and mark any running render as stale.
+
+        With wait, also block until the running render has returned, so the caller
+        may use whatever render_fn shares (e.g. the pipeline) on its own thread.
+        """
+        self._generation += 1
+        self._pending = None
+        if wait:
+            self.wait()
+
+    def is_busy(self) -> bool:
+        return self._in_flight is not None or self._pending is not None
+
+    def wait(self, msecs: int = -1) -> bool:
+        """Block until the worker is idle (pending results are delivered by the event loop)."""
+        return self.thread_pool.waitForDone(msecs)
+
+    def _start_pending(self):
+        generation, request = self._pending
+        self._pending = None
+        job = RenderJob(generation, self.render_fn, request, lambda: generation != self._generation)
+        job.signals.finished.connect(self._on_finished)
+        job.signals.cancelled.connect(self._on_cancelled)
+        job.signals.failed.connect(self._on_failed)
+        self._in_flight = job
+        self.thread_pool.start(job)
+
+    def _job_done(self):
+        self._in_flight = None
+        if self._pending is not None:
+            self._start_pending()
+
+    def _on_finished(self, generation: int, result):
+        if generation == self._generation:
+            self.result_ready.emit(result)
+        else:
+            logger.debug("Dropped stale render %s", generation)
+        self._job_done()
+
+    def _on_cancelled(self, generation: int):
+        logger.debug("Cancelled stale render %s", generation)
+        self._job_done()
+
+    def _on_failed(self, generation: int, message: str):
+        logger.error("Render failed: %s", message)
+        if generation == self._generation:
+            self.render_failed.emit(message)
+        self._job_done()
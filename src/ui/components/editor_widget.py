@@ -1,16 +1,41 @@
 import logging
+import math
 import weakref
+from PIL import Image
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QGraphicsView, QGraphicsScene, QGraphicsPixmapItem, QFileDialog
-from PySide6.QtGui import QPixmap, QImage
-from PySide6.QtCore import Qt, QRectF
+from PySide6.QtGui import QPixmap, QImage, QTransform
+from PySide6.QtCore import Qt, QRectF, QTimer, Signal
+from src.config import settings
 from src.services.image_processing_service import ImageProcessingService
+from src.core.adjustment_pipeline import AdjustmentPipeline, proxy_level_for_scale
+from src.core.burn_in import BurnInSpec, render_burn_in
+from src.core.edit_history import EditHistory, initial_state, state_geometry
+from src.core.encoders import supported_extensions
+from src.core.image_cache import PYRAMID_LEVELS, default_cache
+from src.services.render_scheduler import RenderScheduler
 from src.ui.components.frame_editor import FrameEditor
 from src.ui.components.text_overlay import TextOverlay
 
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+# Wartezeit nach der letzten Interaktion, bevor in voller Auflösung gerendert wird
+FULL_RENDER_DELAY_MS = 300
+
+# Linienstile des FrameEditor -> Strichmuster in core/burn_in.py
+PEN_STYLES = {
+    Qt.SolidLine: "solid",
+    Qt.DashLine: "dash",
+    Qt.DotLine: "dot",
+    Qt.DashDotLine: "dashdot",
+    Qt.DashDotDotLine: "dashdotdot",
+}
+
 class EditorWidget(QWidget):
+    # Emitted after undo/redo with the restored history state so the controls can follow
+    state_restored = Signal(dict)
+    # Emitted with the displayed pixels (RGBA array, often a proxy) and the pipeline geometry
+    image_rendered = Signal(object, object)
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.layout = QVBoxLayout(self)
@@ -25,6 +50,27 @@ class EditorWidget(QWidget):
         self.graphics_scene.addItem(self.text_overlay)
 
         self.image_service = ImageProcessingService()
+        self.image_cache = default_cache()
+        self.pipeline = AdjustmentPipeline()
+        self.render_scheduler = RenderScheduler(self.render_request, self)
+        self.render_scheduler.result_ready.connect(self.on_render_finished)
+        self.displayed_level = 0
+        self.displayed_array = None
+        # Optional letterbox matte outside the frame on export: (color, opacity) or None
+        self.export_matte = None
+        # Crop the export to the frame guide instead of burning the guide in
+        self.export_crop = False
+        # Encoder preset name for saving (core/encoders.py); None picks it from the file extension
+        self.export_preset = None
+        # Undo/redo records parameter ops, not pixels (core/edit_history.py)
+        self.history = EditHistory()
+        self._restoring = False
+
+        # Vorschau läuft auf Proxys, volle Auflösung erst wenn die Interaktion ruht
+        self.full_render_timer = QTimer(self)
+        self.full_render_timer.setSingleShot(True)
+        self.full_render_timer.setInterval(FULL_RENDER_DELAY_MS)
+        self.full_render_timer.timeout.connect(self.render_full_resolution)
 
     @property
     def frame_editor(self):
@@ -34,35 +80,83 @@ class EditorWidget(QWidget):
     def frame_editor(self, value):
         self._frame_editor = weakref.ref(value) if value is not None else None
 
-    def load_image(self, image_path):
+    def load_image(self, image_path, state=None):
+        """Open an image, optionally with a saved edit state (e.g. a project shot) as the new undo base.
+
+        If only a proxy of the image is cached (e.g. restored from a project sidecar), it is shown
+        right away and the full-resolution decode and render run on the render thread.
+        """
         try:
-            image = self.image_service.load_image(image_path)
-            self.display_image(image, init_frame=True)
+            self.stop_background_render()
+            self.full_render_timer.stop()
+            level = self.load_source(image_path)
+            if state is not None:
+                # Saved adjustments go into the first render instead of a second pass
+                self.pipeline.params.update(state["params"])
+                self.pipeline.geometry = state_geometry(state)
+            array = self.pipeline.render(level=level)
+            self.show_rendered(array, level, array.shape[1] / self.pipeline.source_size()[0], init_frame=True)
+            if state is None:
+                self.reset_history()
+            else:
+                self.restore_state(state)
+                self.history.reset(state)
+                self.state_restored.emit(state)
+            if level > 0:
+                self.schedule_render(level=0)
+            return True
         except Exception as e:
-            logger.error(f"Error loading image: {str(e)}")
+            logger.error("Error loading image: %s", e)
+            return False
+
+    def load_source(self, image_path):
+        """Hand the image to the pipeline; returns the proxy level to show first (0 = full resolution)."""
+        loader = self.image_cache.proxy_loader(image_path)
+        if not self.image_cache.contains(image_path, 0):
+            levels = [level for level in range(1, PYRAMID_LEVELS + 1) if self.image_cache.contains(image_path, level)]
+            if levels:
+                # The header gives the size; the pixels are decoded by the first full-resolution render
+                with Image.open(image_path) as image:
+                    self.pipeline.set_source(None, loader, image.size)
+                level = min(levels)
+                if level <= self.pipeline.max_proxy_level():
+                    return level
+        # Recently opened shots come straight from the shared cache, proxies included
+        self.pipeline.set_source(self.image_cache.get(image_path), loader)
+        return 0
 
     def save_image(self):
         if not self.pixmap_item:
             logger.warning("No image to save")
             return
-        file_path, _ = QFileDialog.getSaveFileName(self, "Save Image", "", "Images (*.png *.jpg *.jpeg *.bmp)")
+        patterns = " ".join(f"*{extension}" for extension in supported_extensions())
+        file_path, _ = QFileDialog.getSaveFileName(self, "Save Image", "", f"Images ({patterns})")
         if file_path:
             try:
-                self.image_service.save_image(self.pixmap_item.pixmap().toImage(), file_path)
-                logger.info(f"Image saved to {file_path}")
+                self.image_service.save_image(self.render_export(burn_in=True), file_path, self.export_preset)
+                logger.info("Image saved to %s", file_path)
             except Exception as e:
-                logger.error(f"Error saving image: {str(e)}")
+                logger.error("Error saving image: %s", e)
 
-    def display_image(self, image, init_frame=False):
+    def display_image(self, image, init_frame=False, scale=1.0):
         if isinstance(image, QImage):
             pixmap = QPixmap.fromImage(image)
         else:
             pixmap = QPixmap(image)
-        
+
+        if scale != 1.0:
+            # Proxy: die logische Größe bleibt die des Originals
+            pixmap.setDevicePixelRatio(scale)
+
+        if not init_frame and self.has_same_geometry(pixmap, scale):
+            self.pixmap_item.setPixmap(pixmap)
+            return
+
         if self.pixmap_item:
             self.graphics_scene.removeItem(self.pixmap_item)
         self.pixmap_item = self.graphics_scene.addPixmap(pixmap)
-        self.graphics_view.fitInView(self.pixmap_item, Qt.KeepAspectRatio)
+        self.pixmap_item.setTransformationMode(Qt.SmoothTransformation)
+        self.update_geometry()
         
         if init_frame or not self.is_frame_editor_valid():
             self.init_frame_editor()
@@ -71,16 +165,43 @@ class EditorWidget(QWidget):
         
         self.update_text_overlay()
 
+    def has_same_geometry(self, pixmap, scale=1.0):
+        """True if the pixmap covers the current item's area (within one proxy pixel)."""
+        if not self.pixmap_item or not self.is_frame_editor_valid():
+            return False
+        current = self.pixmap_item.boundingRect().size()
+        new = pixmap.deviceIndependentSize()
+        tolerance = 1 / scale
+        return abs(current.width() - new.width()) <= tolerance and abs(current.height() - new.height()) <= tolerance
+
+    def image_rect(self):
+        """Displayed image area in scene coordinates (after rotation/flip)."""
+        return self.pixmap_item.mapRectToScene(self.pixmap_item.boundingRect())
+
+    def update_geometry(self):
+        """Show the pipeline's orientation through the item transform; no pixels are touched."""
+        matrix = self.pipeline.geometry.matrix(self.pipeline.source_size())
+        transform = QTransform(matrix[0, 0], matrix[1, 0], matrix[0, 1], matrix[1, 1], matrix[0, 2], matrix[1, 2])
+        self.pixmap_item.setTransform(transform)
+        if self.is_frame_editor_valid():
+            # The frame guide stays upright: undo the image transform for the child item
+            self.frame_editor.setTransform(transform.inverted()[0])
+        image_rect = self.image_rect()
+        self.graphics_scene.setSceneRect(image_rect)
+        self.graphics_view.fitInView(image_rect, Qt.KeepAspectRatio)
+
     def init_frame_editor(self):
         if self.frame_editor:
             self.graphics_scene.removeItem(self.frame_editor)
         if self.pixmap_item:
-            image_rect = self.pixmap_item.boundingRect()
+            image_rect = self.image_rect()
             frame_rect = QRectF(image_rect.width() * 0.1, image_rect.height() * 0.1,
                                 image_rect.width() * 0.8, image_rect.height() * 0.8)
             new_frame_editor = FrameEditor(frame_rect)
             self.graphics_scene.addItem(new_frame_editor)
             new_frame_editor.setParentItem(self.pixmap_item)
+            new_frame_editor.setTransform(self.pixmap_item.transform().inverted()[0])
+            new_frame_editor.frame_moved.connect(self.on_frame_changed)
             self.frame_editor = new_frame_editor
             logger.info("Frame editor initialized")
 
@@ -106,54 +227,78 @@ class EditorWidget(QWidget):
             logger.warning("Frame editor is not valid, reinitializing...")
             self.init_frame_editor()
 
+    def frame_rect(self):
+        """Frame guide in oriented image pixels, including any offset from dragging it."""
+        rect = self.frame_editor.mapRectToScene(self.frame_editor.rect())
+        return rect.translated(-self.image_rect().topLeft())
+
+    def set_frame_rect(self, values):
+        """Place the frame guide at (x, y, width, height) in oriented image pixels."""
+        x, y, width, height = values
+        self.frame_editor.setPos(0, 0)
+        rect = QRectF(x, y, width, height).translated(self.image_rect().topLeft())
+        self.frame_editor.setRect(self.frame_editor.mapRectFromScene(rect))
+
     def update_text_overlay(self):
         if self.is_frame_editor_valid():
-            self.text_overlay.update_position(self.frame_editor.rect())
+            self.text_overlay.update_position(self.frame_rect())
 
     def set_frame_format(self, format_str):
         self.ensure_frame_editor()
         if self.is_frame_editor_valid():
             self.frame_editor.set_format(format_str)
             self.update_text_overlay()
-            logger.debug(f"Frame format set to {format_str}")
+            logger.debug("Frame format set to %s", format_str)
 
     def set_frame_width(self, width):
         self.ensure_frame_editor()
         if self.is_frame_editor_valid():
             self.frame_editor.set_width(width)
             self.update_text_overlay()
-            logger.debug(f"Frame width set to {width}")
+            logger.debug("Frame width set to %s", width)
+
+    def change_geometry(self, change, op):
+        """Apply a lazy rotate/flip: only the item transform changes, pixels are resampled at export."""
+        image_size = self.image_rect().size()
+        change()
+        self.update_geometry()
+        if self.image_rect().size() != image_size:
+            self.init_frame_editor()
+        self.update_text_overlay()
+        # The frame guide may have been reset, so it is part of the same undo step
+        self.record(op, self.frame_op())
+        if self.displayed_array is not None:
+            self.image_rendered.emit(self.displayed_array, self.pipeline.geometry)
 
     def rotate_image(self):
         if self.pixmap_item:
             try:
-                rotated = self.image_service.rotate_image(self.pixmap_item.pixmap().toImage())
-                self.display_image(rotated, init_frame=False)
+                self.change_geometry(self.pipeline.rotate90, {"op": "rotate", "angle": 90})
                 logger.info("Image rotated")
             except Exception as e:
-                logger.error(f"Error rotating image: {str(e)}")
+                logger.error("Error rotating image: %s", e)
 
     def flip_image_horizontal(self):
         if self.pixmap_item:
             try:
-                flipped = self.image_service.flip_image_horizontal(self.pixmap_item.pixmap().toImage())
-                self.display_image(flipped, init_frame=False)
+                self.change_geometry(self.pipeline.flip_horizontal, {"op": "flip", "direction": "horizontal"})
                 logger.info("Image flipped horizontally")
             except Exception as e:
-                logger.error(f"Error flipping image horizontally: {str(e)}")
+                logger.error("Error flipping image horizontally: %s", e)
 
     def flip_image_vertical(self):
         if self.pixmap_item:
             try:
-                flipped = self.image_service.flip_image_vertical(self.pixmap_item.pixmap().toImage())
-                self.display_image(flipped, init_frame=False)
+                self.change_geometry(self.pipeline.flip_vertical, {"op": "flip", "direction": "vertical"})
                 logger.info("Image flipped vertically")
             except Exception as e:
-                logger.error(f"Error flipping image vertically: {str(e)}")
+                logger.error("Error flipping image vertically: %s", e)
 
     def enable_crop(self):
-        logger.info("Crop functionality not yet implemented")
-        pass
+        """Toggle crop-to-frame: the saved image is cut to the frame guide."""
+        self.export_crop = not self.export_crop
+        self.record({"op": "export_crop", "enabled": self.export_crop})
+        logger.info("Crop to frame on export %s", "enabled" if self.export_crop else "disabled")
 
     def enable_drawing(self):
         logger.info("Drawing functionality not yet implemented")
@@ -161,54 +306,242 @@ class EditorWidget(QWidget):
 
     def zoom_in(self):
         self.graphics_view.scale(1.2, 1.2)
+        self.on_view_scale_changed()
         logger.debug("Zoomed in")
 
     def zoom_out(self):
         self.graphics_view.scale(1/1.2, 1/1.2)
+        self.on_view_scale_changed()
         logger.debug("Zoomed out")
 
+    def preview_level(self):
+        """Proxy level matching the current view scale and zoom."""
+        transform = self.graphics_view.transform()
+        view_scale = math.hypot(transform.m11(), transform.m12()) * self.devicePixelRatioF()
+        return proxy_level_for_scale(view_scale, self.pipeline.max_proxy_level())
+
+    def on_view_scale_changed(self):
+        if self.pixmap_item and self.pipeline.has_source() and self.preview_level() < self.displayed_level:
+            self.schedule_render()
+
+    def stop_background_render(self):
+        """Cancel the background render and wait for it; True if one was running or queued.
+
+        The render worker shares the pipeline's source and stage cache, so the GUI thread
+        calls this before it renders or replaces the source itself.
+        """
+        busy = self.render_scheduler.is_busy()
+        self.render_scheduler.cancel(wait=True)
+        return busy
+
+    def render_adjustments(self):
+        """Render the adjustment stack from the cached source and return it as QImage."""
+        resume = self.stop_background_render()
+        array = self.pipeline.render()
+        if resume:
+            self.schedule_render()
+        return self.image_service.array_to_qimage(array)
+
+    def render_export(self, burn_in=False):
+        """Full-resolution render with the orientation applied in one resample.
+
+        With burn_in the frame guide, matte and scene text are rasterized into the pixels.
+        """
+        resume = self.stop_background_render()
+        array = self.pipeline.render_export(geometry=self.export_geometry())
+        if resume:
+            self.schedule_render()
+        # A cropped export ends at the frame, so guide, matte and scene text fall outside it
+        if burn_in and not self.export_crop:
+            if not array.flags.writeable:
+                array = array.copy()
+            render_burn_in(array, self.burn_in_spec())
+        return self.image_service.array_to_qimage(array)
+
+    def export_geometry(self):
+        """Pipeline geometry, cut to the frame guide when crop-to-frame is on."""
+        geometry = self.pipeline.geometry
+        if self.export_crop and self.is_frame_editor_valid():
+            source_size = self.pipeline.source_size()
+            width, height = geometry.output_size(source_size)
+            rect = self.frame_rect()
+            box = (max(0, round(rect.left())), max(0, round(rect.top())),
+                   min(width, round(rect.right())), min(height, round(rect.bottom())))
+            # Only the frame region of the source is rendered on export
+            geometry = geometry.cropped(box, source_size)
+        return geometry
+
+    def burn_in_spec(self) -> BurnInSpec:
+        """Frame guide and scene text as shown in the view, in export pixel coordinates."""
+        spec = BurnInSpec(draw_frame=False)
+        if self.is_frame_editor_valid():
+            rect = self.frame_rect()
+            spec.frame_rect = (rect.left(), rect.top(), rect.right(), rect.bottom())
+            spec.draw_frame = True
+            spec.frame_color = self.frame_editor.frame_color.name()
+            spec.pen_width = self.frame_editor.frame_pen_width
+            spec.pen_style = PEN_STYLES.get(self.frame_editor.frame_style, "solid")
+            if self.export_matte is not None:
+                spec.matte_color, spec.matte_opacity = self.export_matte
+            spec.name = self.text_overlay.name_item.toPlainText()
+            spec.description = self.text_overlay.desc_item.toPlainText()
+            spec.font_size = self.text_overlay.name_item.font().pixelSize()
+            spec.text_color = self.text_overlay.name_item.defaultTextColor().name()
+        return spec
+
+    def set_export_matte(self, color=None, opacity=1.0):
+        """Letterbox the area outside the frame on export; color None switches it off."""
+        self.export_matte = (color, opacity) if color is not None else None
+
+    def render_request(self, request, cancelled):
+        """Runs on the render worker thread."""
+        params, level = request
+        level = min(level, self.pipeline.max_proxy_level())
+        result = self.pipeline.render(params, cancelled, level)
+        return result, level, result.shape[1] / self.pipeline.source_size()[0], params
+
+    def schedule_render(self, level=None):
+        if not self.pipeline.has_source():
+            return
+        if level is None:
+            level = self.preview_level()
+        self.render_scheduler.request((self.pipeline.snapshot(), level))
+        if level > 0:
+            self.full_render_timer.start()
+        else:
+            self.full_render_timer.stop()
+
+    def render_full_resolution(self):
+        self.schedule_render(level=0)
+
+    def show_rendered(self, array, level, scale=1.0, init_frame=False):
+        self.displayed_level = level
+        self.displayed_array = array
+        self.display_image(self.image_service.array_to_qimage(array), init_frame=init_frame, scale=scale)
+        self.image_rendered.emit(array, self.pipeline.geometry)
+
+    def on_render_finished(self, result):
+        array, level, scale, params = result
+        self.show_rendered(array, level, scale)
+        # Periodic pixel checkpoint, so jumping back here later needs no render
+        if any(params.values()) and params == self.history.state["params"] and self.history.wants_checkpoint():
+            self.history.add_pixels(params, array, level)
+
+    def apply_adjustment(self, name, value):
+        if self.pixmap_item and self.pipeline.has_source():
+            if self.pipeline.set_param(name, value):
+                # A slider drag becomes a single undo step
+                self.record({"op": "adjust", "name": name, "value": value}, merge=True)
+                self.schedule_render()
+
     def adjust_brightness(self, value):
         if self.pixmap_item:
             try:
-                adjusted = self.image_service.adjust_brightness(self.pixmap_item.pixmap().toImage(), value)
-                self.display_image(adjusted, init_frame=False)
-                logger.debug(f"Brightness adjusted to {value}")
+                self.apply_adjustment("brightness", value)
+                logger.debug("Brightness adjusted to %s", value)
             except Exception as e:
-                logger.error(f"Error adjusting brightness: {str(e)}")
+                logger.error("Error adjusting brightness: %s", e)
 
     def adjust_contrast(self, value):
         if self.pixmap_item:
             try:
-                adjusted = self.image_service.adjust_contrast(self.pixmap_item.pixmap().toImage(), value)
-                self.display_image(adjusted, init_frame=False)
-                logger.debug(f"Contrast adjusted to {value}")
+                self.apply_adjustment("contrast", value)
+                logger.debug("Contrast adjusted to %s", value)
             except Exception as e:
-                logger.error(f"Error adjusting contrast: {str(e)}")
+                logger.error("Error adjusting contrast: %s", e)
 
     def adjust_grayscale_intensity(self, value):
         if self.pixmap_item:
             try:
-                adjusted = self.image_service.apply_grayscale(self.pixmap_item.pixmap().toImage(), value)
-                self.display_image(adjusted, init_frame=False)
-                logger.debug(f"Grayscale intensity adjusted to {value}")
+                self.apply_adjustment("grayscale", value)
+                logger.debug("Grayscale intensity adjusted to %s", value)
             except Exception as e:
-                logger.error(f"Error adjusting grayscale intensity: {str(e)}")
+                logger.error("Error adjusting grayscale intensity: %s", e)
 
     def adjust_sepia_intensity(self, value):
         if self.pixmap_item:
             try:
-                adjusted = self.image_service.apply_sepia(self.pixmap_item.pixmap().toImage(), value)
-                self.display_image(adjusted, init_frame=False)
-                logger.debug(f"Sepia intensity adjusted to {value}")
+                self.apply_adjustment("sepia", value)
+                logger.debug("Sepia intensity adjusted to %s", value)
             except Exception as e:
-                logger.error(f"Error adjusting sepia intensity: {str(e)}")
+                logger.error("Error adjusting sepia intensity: %s", e)
 
     def add_text_to_scene(self, name, description, font_size):
         self.ensure_frame_editor()
         if self.is_frame_editor_valid():
             self.text_overlay.set_text(name, description)
             self.text_overlay.set_font_size(font_size)
-            self.text_overlay.update_position(self.frame_editor.rect())
+            self.update_text_overlay()
+            self.record({"op": "text", "name": name, "description": description, "font_size": font_size})
             logger.info("Text added to scene")
         else:
-            logger.warning("Cannot add text: Frame editor is not valid")
\ No newline at end of file
+            logger.warning("Cannot add text: Frame editor is not valid")
+
+    def frame_op(self):
+        if not self.is_frame_editor_valid():
+            return {"op": "frame", "rect": None}
+        rect = self.frame_rect()
+        return {"op": "frame", "rect": [round(value, 2) for value in (rect.x(), rect.y(), rect.width(), rect.height())]}
+
+    def on_frame_changed(self):
+        # Dragging or resizing the guide coalesces into one undo step
+        self.record(self.frame_op(), merge=True)
+
+    def record(self, *ops, merge=False):
+        """Add an undo step unless a history state is being restored."""
+        if self._restoring or not self.pixmap_item:
+            return
+        self.history.record(*ops, merge=merge)
+
+    def reset_history(self):
+        state = initial_state(self.pipeline.params)
+        state["frame"] = self.frame_op()["rect"]
+        state["export_crop"] = self.export_crop
+        self.history.reset(state)
+
+    def undo(self):
+        state = self.history.undo()
+        if state is not None:
+            self.apply_state(state)
+            logger.info("Undo (%s steps left)", self.history.index)
+
+    def redo(self):
+        state = self.history.redo()
+        if state is not None:
+            self.apply_state(state)
+            logger.info("Redo")
+
+    def restore_state(self, state):
+        """Set parameters, orientation, frame guide, scene text and crop flag without recording undo steps."""
+        self._restoring = True
+        try:
+            self.pipeline.params.update(state["params"])
+            self.pipeline.geometry = state_geometry(state)
+            self.update_geometry()
+            self.ensure_frame_editor()
+            if state["frame"] is not None:
+                self.set_frame_rect(state["frame"])
+            text = state["text"] or {"name": "", "description": "", "font_size": settings.DEFAULT_FONT_SIZE}
+            self.text_overlay.set_text(text["name"], text["description"])
+            self.text_overlay.set_font_size(text["font_size"])
+            self.update_text_overlay()
+            self.export_crop = state["export_crop"]
+        finally:
+            self._restoring = False
+
+    def apply_state(self, state):
+        """Restore a history state; pixels come from a checkpoint or are re-rendered from the cached source."""
+        if not self.pixmap_item:
+            return
+        self.restore_state(state)
+        self.state_restored.emit(state)
+        for level in (0, self.preview_level()):
+            array = self.history.pixels(state["params"], level)
+            if array is not None:
+                self.render_scheduler.cancel()
+                self.show_rendered(array, level, array.shape[1] / self.pipeline.source_size()[0])
+                if level == 0:
+                    self.full_render_timer.stop()
+                    return
+                break
+        self.schedule_render()
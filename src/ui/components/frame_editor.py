@@ -3,7 +3,6 @@ from PySide6.QtWidgets import QGraphicsRectItem
 from PySide6.QtGui import QPen, QColor
 from PySide6.QtCore import Qt, QRectF, Signal, QObject
 
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 class FrameEditorSignals(QObject):
@@ -32,17 +31,17 @@ class FrameEditor(QGraphicsRectItem):
     def set_color(self, color: QColor):
         self.frame_color = color
         self.update_pen()
-        logger.debug(f"Frame color set to {color.name()}")
+        logger.debug("Frame color set to %s", color.name())
 
     def set_pen_width(self, width: int):
         self.frame_pen_width = width
         self.update_pen()
-        logger.debug(f"Frame pen width set to {width}")
+        logger.debug("Frame pen width set to %s", width)
 
     def set_style(self, style: Qt.PenStyle):
         self.frame_style = style
         self.update_pen()
-        logger.debug(f"Frame style set to {style}")
+        logger.debug("Frame style set to %s", style)
 
     def set_format(self, format_str):
         try:
@@ -52,9 +51,9 @@ class FrameEditor(QGraphicsRectItem):
             new_rect = QRectF(current_rect.x(), current_rect.y(), current_rect.width(), new_height)
             self.setRect(new_rect)
             self.frame_moved.emit()
-            logger.debug(f"Frame format set to {format_str}")
+            logger.debug("Frame format set to %s", format_str)
         except Exception as e:
-            logger.error(f"Error setting frame format: {str(e)}")
+            logger.error("Error setting frame format: %s", e)
 
     def set_width(self, width_percentage):
         if self.scene():
@@ -66,9 +65,9 @@ class FrameEditor(QGraphicsRectItem):
                 new_rect = QRectF(current_rect.x(), current_rect.y(), new_width, new_height)
                 self.setRect(new_rect)
                 self.frame_moved.emit()
-                logger.debug(f"Frame width set to {width_percentage}%")
+                logger.debug("Frame width set to %s%%", width_percentage)
             except Exception as e:
-                logger.error(f"Error setting frame width: {str(e)}")
+                logger.error("Error setting frame width: %s", e)
         else:
             logger.warning("FrameEditor is not in a scene")
 
@@ -0,0 +1,76 @@
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel
+from PySide6.QtGui import QPixmap
+from PySide6.QtCore import QTimer
+from src.config import settings
+from src.core import profiler
+from src.core.scopes import compute_scopes, histogram_image, vectorscope_image, waveform_image
+from src.services.render_scheduler import RenderScheduler
+from src.utils.image_utils import numpy_to_qimage
+
+class ScopesPanel(QWidget):
+    """Histogram, waveform and vectorscope of the current preview.
+
+    Scopes are computed from a strided sample of whatever the editor last
+    displayed (usually a proxy) on their own worker thread, at most once per
+    SCOPE_UPDATE_MS, so slider drags never wait for them.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QVBoxLayout(self)
+        self.histogram_label = self.add_scope(layout, "Histogram", 256, 128)
+        self.waveform_label = self.add_scope(layout, "Waveform", 256, 160)
+        self.vectorscope_label = self.add_scope(layout, "Vectorscope", 192, 192)
+        layout.addStretch()
+
+        self.scheduler = RenderScheduler(self.compute, self)
+        self.scheduler.result_ready.connect(self.show_scopes)
+        self.update_timer = QTimer(self)
+        self.update_timer.setSingleShot(True)
+        self.update_timer.setInterval(settings.SCOPE_UPDATE_MS)
+        self.update_timer.timeout.connect(self.flush)
+        self._pending = None
+        self._current = None
+
+    def add_scope(self, layout, title, width, height):
+        layout.addWidget(QLabel(title))
+        label = QLabel()
+        label.setFixedSize(width, height)
+        label.setScaledContents(True)
+        label.setStyleSheet("background-color: black;")
+        layout.addWidget(label)
+        return label
+
+    def set_image(self, array, geometry=None):
+        """Queue the displayed pixels (RGBA array, not copied) and their orientation for the next update."""
+        if self._current is not None and self._current[0] is array and self._current[1] == geometry:
+            return
+        self._pending = (array, geometry)
+        if self.isVisible() and not self.update_timer.isActive():
+            self.update_timer.start()
+
+    def flush(self):
+        if self._pending is None:
+            return
+        self._current = self._pending
+        self._pending = None
+        self.scheduler.request(self._current)
+
+    def compute(self, request, cancelled):
+        """Runs on the scope worker thread."""
+        array, geometry = request
+        with profiler.span("scopes") as span:
+            data = compute_scopes(array, geometry, cancelled=cancelled)
+            span.pixels = data.samples
+            return histogram_image(data.histogram), waveform_image(data.waveform), vectorscope_image(data.vectorscope)
+
+    def show_scopes(self, images):
+        # The worker hands over arrays; the borrowing QImages exist only here on the GUI thread
+        labels = (self.histogram_label, self.waveform_label, self.vectorscope_label)
+        for label, image in zip(labels, images):
+            label.setPixmap(QPixmap.fromImage(numpy_to_qimage(image)))
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self._pending is not None:
+            self.update_timer.start()
@@ -0,0 +1,134 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QListView, QPushButton, QFileDialog
+from PySide6.QtGui import QIcon, QPixmap
+from PySide6.QtCore import Qt, QAbstractListModel, QModelIndex, QSize, Signal
+from src.config import settings
+from src.utils.image_utils import numpy_to_qimage
+
+logger = logging.getLogger(__name__)
+
+# Threads, die Vorschaubilder für die Liste erzeugen bzw. aus dem Projektordner lesen
+THUMBNAIL_WORKERS = 2
+
+class ShotListModel(QAbstractListModel):
+    """Shots of a project; thumbnails are only requested for rows the view actually paints."""
+
+    # Emitted from a worker thread, delivered on the GUI thread
+    thumbnail_loaded = Signal(str, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.project = None
+        self._icons = {}
+        self._requested = set()
+        self._executor = ThreadPoolExecutor(max_workers=THUMBNAIL_WORKERS, thread_name_prefix="shot-thumbnails")
+        self.thumbnail_loaded.connect(self.on_thumbnail_loaded)
+
+    def set_project(self, project):
+        self.beginResetModel()
+        self.project = project
+        self._icons = {}
+        self._requested = set()
+        self.endResetModel()
+
+    def shots_added(self, count):
+        """Announce count shots appended to the project."""
+        total = len(self.project.shots)
+        self.beginInsertRows(QModelIndex(), total - count, total - 1)
+        self.endInsertRows()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid() or self.project is None:
+            return 0
+        return len(self.project.shots)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or self.project is None:
+            return None
+        shot = self.project.shots[index.row()]
+        if role == Qt.DisplayRole:
+            return shot.name
+        if role == Qt.ToolTipRole:
+            return shot.image_path
+        if role == Qt.UserRole:
+            return shot.id
+        if role == Qt.DecorationRole:
+            icon = self._icons.get(shot.id)
+            if icon is None and shot.id not in self._requested:
+                self._requested.add(shot.id)
+                self._executor.submit(self.load_thumbnail, self.project.thumbnail_store(), shot.id, shot.image_path)
+            return icon
+        return None
+
+    def refresh(self, shot_id):
+        """Repaint the row of a shot, e.g. after its name changed."""
+        for row, shot in enumerate(self.project.shots if self.project is not None else []):
+            if shot.id == shot_id:
+                index = self.index(row)
+                self.dataChanged.emit(index, index)
+                return
+
+    def load_thumbnail(self, store, shot_id, image_path):
+        """Runs on a thumbnail worker; reuses the project's sidecar thumbnail if there is one."""
+        try:
+            thumbnail = store.load(image_path).convert("RGBA")
+            # QImage may be built off the GUI thread, QPixmap may not
+            image = numpy_to_qimage(np.asarray(thumbnail)).copy()
+        except Exception as e:
+            logger.warning("No thumbnail for %s: %s", image_path, e)
+            image = None
+        self.thumbnail_loaded.emit(shot_id, image)
+
+    def on_thumbnail_loaded(self, shot_id, image):
+        if image is None:
+            return
+        self._icons[shot_id] = QIcon(QPixmap.fromImage(image))
+        self.refresh(shot_id)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class ShotListPanel(QWidget):
+    """Shot list of the open project; selecting a row opens that shot in the editor."""
+    shot_selected = Signal(str)
+    add_images_requested = Signal(list)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QVBoxLayout(self)
+        self.model = ShotListModel(self)
+        self.view = QListView()
+        self.view.setModel(self.model)
+        self.view.setIconSize(QSize(settings.THUMBNAIL_SIZE // 2, settings.THUMBNAIL_SIZE // 2))
+        # Rows share one size, so laying out a long list never queries every row
+        self.view.setUniformItemSizes(True)
+        self.view.clicked.connect(self.on_clicked)
+        layout.addWidget(self.view)
+
+        buttons = QHBoxLayout()
+        add_button = QPushButton("Add Images...")
+        add_button.clicked.connect(self.add_images_dialog)
+        buttons.addWidget(add_button)
+        layout.addLayout(buttons)
+
+    def set_project(self, project):
+        self.model.set_project(project)
+
+    def on_clicked(self, index):
+        self.shot_selected.emit(index.data(Qt.UserRole))
+
+    def select(self, shot_id):
+        for row in range(self.model.rowCount()):
+            index = self.model.index(row)
+            if index.data(Qt.UserRole) == shot_id:
+                self.view.setCurrentIndex(index)
+                return
+
+    def add_images_dialog(self):
+        patterns = " ".join(f"*{extension}" for extension in settings.SUPPORTED_IMAGE_FORMATS)
+        file_names, _ = QFileDialog.getOpenFileNames(self, "Add Images", "", f"Images ({patterns})")
+        if file_names:
+            self.add_images_requested.emit(file_names)
@@ -0,0 +1,89 @@
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QCheckBox, QPushButton, QTableWidget,
+                               QTableWidgetItem, QHeaderView, QFileDialog)
+from PySide6.QtCore import Qt, QTimer
+from src.core import profiler
+
+# Spalten der Tabelle: Überschrift und Wert aus Profiler.stats()
+COLUMNS = [
+    ("Op", lambda name, stats: name),
+    ("Count", lambda name, stats: str(stats["count"])),
+    ("Wall ms", lambda name, stats: f"{stats['wall_seconds'] * 1000:.1f}"),
+    ("CPU ms", lambda name, stats: f"{stats['cpu_seconds'] * 1000:.1f}"),
+    ("MPix", lambda name, stats: f"{stats['pixels'] / 1e6:.1f}"),
+    ("MB", lambda name, stats: f"{stats['bytes'] / 1e6:.1f}"),
+    ("MPix/s", lambda name, stats: f"{stats['megapixels_per_second']:.0f}"),
+]
+
+# Aktualisierungsintervall der Tabelle, solange das Panel sichtbar ist
+REFRESH_INTERVAL_MS = 1000
+
+class StatsPanel(QWidget):
+    """Per-op timing from core/profiler.py, with switches for recording and a trace export."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.profiler = profiler.get_profiler()
+        layout = QVBoxLayout(self)
+
+        controls = QHBoxLayout()
+        self.enabled_checkbox = QCheckBox("Record")
+        self.enabled_checkbox.setChecked(self.profiler.enabled)
+        self.enabled_checkbox.toggled.connect(self.set_enabled)
+        controls.addWidget(self.enabled_checkbox)
+        reset_button = QPushButton("Reset")
+        reset_button.clicked.connect(self.reset)
+        controls.addWidget(reset_button)
+        export_button = QPushButton("Save Trace...")
+        export_button.clicked.connect(self.save_trace)
+        controls.addWidget(export_button)
+        layout.addLayout(controls)
+
+        self.table = QTableWidget(0, len(COLUMNS))
+        self.table.setHorizontalHeaderLabels([title for title, _ in COLUMNS])
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.table)
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(REFRESH_INTERVAL_MS)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+    def set_enabled(self, enabled):
+        self.profiler.enabled = enabled
+        self.refresh()
+
+    def reset(self):
+        self.profiler.reset()
+        self.refresh()
+
+    def refresh(self):
+        stats = self.profiler.stats()
+        self.table.setRowCount(len(stats))
+        for row, (name, values) in enumerate(stats.items()):
+            for column, (_, value) in enumerate(COLUMNS):
+                item = QTableWidgetItem(value(name, values))
+                if column:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.table.setItem(row, column, item)
+
+    def save_trace(self):
+        file_path, selected = QFileDialog.getSaveFileName(self, "Save Trace", "",
+                                                          "Chrome Trace (*.json);;Stats JSON (*.json)")
+        if file_path:
+            self.write_trace(file_path, chrome=selected.startswith("Chrome"))
+
+    def write_trace(self, file_path, chrome=True):
+        if chrome:
+            self.profiler.dump_chrome_trace(file_path)
+        else:
+            self.profiler.dump_json(file_path)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self.refresh_timer.start()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.refresh_timer.stop()
@@ -1,6 +1,7 @@
 from PySide6.QtWidgets import QGraphicsItemGroup, QGraphicsTextItem
 from PySide6.QtGui import QFont, QColor
 from PySide6.QtCore import QPointF
+from src.core.burn_in import points_to_pixels
 
 class TextOverlay(QGraphicsItemGroup):
     def __init__(self, parent=None):
@@ -20,11 +21,14 @@ class TextOverlay(QGraphicsItemGroup):
         self.desc_item.setPlainText(description)
 
     def set_font_size(self, size: int):
-        name_font = QFont("Arial", size)
+        # Size in points; drawn at a fixed pixel size so exports match the view on any screen
+        name_font = QFont("Arial")
+        name_font.setPixelSize(points_to_pixels(size))
         name_font.setBold(True)
         self.name_item.setFont(name_font)
         
-        desc_font = QFont("Arial", size)
+        desc_font = QFont("Arial")
+        desc_font.setPixelSize(points_to_pixels(size))
         self.desc_item.setFont(desc_font)
 
     def set_color(self, color: QColor):
@@ -32,5 +36,5 @@ class TextOverlay(QGraphicsItemGroup):
         self.desc_item.setDefaultTextColor(color)
 
     def update_position(self, frame_rect):
-        self.name_item.setPos(frame_rect.topLeft() + QPointF(10, -self.name_item.font().pointSize() * 2 - 10))
-        self.desc_item.setPos(frame_rect.topLeft() + QPointF(10, -self.desc_item.font().pointSize() - 5))
\ No newline at end of file
+        self.name_item.setPos(frame_rect.topLeft() + QPointF(10, -self.name_item.font().pixelSize() * 2 - 10))
+        self.desc_item.setPos(frame_rect.topLeft() + QPointF(10, -self.desc_item.font().pixelSize() - 5))
\ No newline at end of file
@@ -1,10 +1,15 @@
 from PySide6.QtWidgets import QToolBar, QFileDialog
-from PySide6.QtGui import QAction, QIcon
+from PySide6.QtGui import QAction, QIcon, QKeySequence
 from PySide6.QtCore import Signal
+from src.config import settings
 
 class Toolbar(QToolBar):
     open_image = Signal(str)
     save_image = Signal()
+    open_project = Signal(str)
+    save_project = Signal()
+    undo = Signal()
+    redo = Signal()
     rotate_image = Signal()
     flip_horizontal = Signal()
     flip_vertical = Signal()
@@ -12,6 +17,8 @@ class Toolbar(QToolBar):
     enable_draw = Signal()
     zoom_in = Signal()
     zoom_out = Signal()
+    toggle_stats = Signal()
+    toggle_scopes = Signal()
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -21,6 +28,10 @@ class Toolbar(QToolBar):
     def setup_actions(self):
         self.addAction(self.create_action("Open", "open.png", self.open_image_dialog))
         self.addAction(self.create_action("Save", "save.png", self.save_image.emit))
+        self.addAction(self.create_action("Open Project", "open_project.png", self.open_project_dialog))
+        self.addAction(self.create_action("Save Project", "save_project.png", self.save_project.emit, QKeySequence.Save))
+        self.addAction(self.create_action("Undo", "undo.png", self.undo.emit, QKeySequence.Undo))
+        self.addAction(self.create_action("Redo", "redo.png", self.redo.emit, QKeySequence.Redo))
         self.addAction(self.create_action("Rotate", "rotate.png", self.rotate_image.emit))
         self.addAction(self.create_action("Flip H", "flip_h.png", self.flip_horizontal.emit))
         self.addAction(self.create_action("Flip V", "flip_v.png", self.flip_vertical.emit))
@@ -28,13 +39,23 @@ class Toolbar(QToolBar):
         self.addAction(self.create_action("Draw", "draw.png", self.enable_draw.emit))
         self.addAction(self.create_action("Zoom In", "zoom_in.png", self.zoom_in.emit))
         self.addAction(self.create_action("Zoom Out", "zoom_out.png", self.zoom_out.emit))
+        self.addAction(self.create_action("Scopes", "scopes.png", self.toggle_scopes.emit))
+        self.addAction(self.create_action("Stats", "stats.png", self.toggle_stats.emit))
 
-    def create_action(self, text, icon_name, slot):
+    def create_action(self, text, icon_name, slot, shortcut=None):
         action = QAction(QIcon(f"src/resources/icons/{icon_name}"), text, self)
+        if shortcut is not None:
+            action.setShortcut(shortcut)
         action.triggered.connect(slot)
         return action
 
     def open_image_dialog(self):
         file_name, _ = QFileDialog.getOpenFileName(self, "Open Image File", "", "Images (*.png *.jpg *.jpeg *.bmp *.gif)")
         if file_name:
-            self.open_image.emit(file_name)
\ No newline at end of file
+            self.open_image.emit(file_name)
+
+    def open_project_dialog(self):
+        file_name, _ = QFileDialog.getOpenFileName(self, "Open Project", "",
+                                                   f"CineaExpress Projects (*{settings.PROJECT_EXTENSION})")
+        if file_name:
+            self.open_project.emit(file_name)
@@ -1,9 +1,19 @@
-from PySide6.QtWidgets import QMainWindow, QHBoxLayout, QWidget, QVBoxLayout, QLabel, QSlider, QComboBox, QLineEdit, QTextEdit, QPushButton
+import copy
+import logging
+import os
+from PySide6.QtWidgets import QMainWindow, QDockWidget, QHBoxLayout, QWidget, QVBoxLayout, QLabel, QSlider, QComboBox, QLineEdit, QTextEdit, QPushButton, QFileDialog, QMessageBox
 from PySide6.QtGui import QAction
 from PySide6.QtCore import Qt, Signal
+from src.config import settings
+from src.core.project import Project
 from src.ui.components.editor_widget import EditorWidget
+from src.ui.components.scopes_panel import ScopesPanel
+from src.ui.components.shot_list import ShotListPanel
+from src.ui.components.stats_panel import StatsPanel
 from src.ui.components.toolbar import Toolbar
 
+logger = logging.getLogger(__name__)
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -30,6 +40,27 @@ class MainWindow(QMainWindow):
 
         main_layout.addWidget(sidebar)
 
+        # Scopes neben dem Editor
+        self.scopes_panel = ScopesPanel()
+        self.scopes_dock = QDockWidget("Scopes", self)
+        self.scopes_dock.setWidget(self.scopes_panel)
+        self.addDockWidget(Qt.RightDockWidgetArea, self.scopes_dock)
+
+        # Shotliste des Projekts; ein leeres Projekt nimmt auch einzeln geöffnete Bilder auf
+        self.project = Project()
+        self.current_shot_id = None
+        self.shot_list = ShotListPanel()
+        self.shot_list.set_project(self.project)
+        self.shots_dock = QDockWidget("Shots", self)
+        self.shots_dock.setWidget(self.shot_list)
+        self.addDockWidget(Qt.LeftDockWidgetArea, self.shots_dock)
+
+        # Profiling-Statistik, standardmäßig ausgeblendet
+        self.stats_dock = QDockWidget("Stats", self)
+        self.stats_dock.setWidget(StatsPanel(self.stats_dock))
+        self.addDockWidget(Qt.BottomDockWidgetArea, self.stats_dock)
+        self.stats_dock.hide()
+
         # Toolbar
         self.toolbar = Toolbar(self)
         self.addToolBar(self.toolbar)
@@ -86,8 +117,14 @@ class MainWindow(QMainWindow):
 
     def setup_connections(self):
         # Toolbar connections
-        self.toolbar.open_image.connect(self.editor_widget.load_image)
+        self.toolbar.open_image.connect(self.open_image)
         self.toolbar.save_image.connect(self.editor_widget.save_image)
+        self.toolbar.open_project.connect(self.open_project)
+        self.toolbar.save_project.connect(self.save_project)
+        self.shot_list.shot_selected.connect(self.open_shot)
+        self.shot_list.add_images_requested.connect(self.add_images)
+        self.toolbar.undo.connect(self.editor_widget.undo)
+        self.toolbar.redo.connect(self.editor_widget.redo)
         self.toolbar.rotate_image.connect(self.editor_widget.rotate_image)
         self.toolbar.flip_horizontal.connect(self.editor_widget.flip_image_horizontal)
         self.toolbar.flip_vertical.connect(self.editor_widget.flip_image_vertical)
@@ -95,6 +132,9 @@ class MainWindow(QMainWindow):
         self.toolbar.enable_draw.connect(self.editor_widget.enable_drawing)
         self.toolbar.zoom_in.connect(self.editor_widget.zoom_in)
         self.toolbar.zoom_out.connect(self.editor_widget.zoom_out)
+        self.toolbar.toggle_stats.connect(lambda: self.stats_dock.setVisible(not self.stats_dock.isVisible()))
+        self.toolbar.toggle_scopes.connect(lambda: self.scopes_dock.setVisible(not self.scopes_dock.isVisible()))
+        self.editor_widget.image_rendered.connect(self.scopes_panel.set_image)
 
         # Frame settings connections
         self.format_combo.currentTextChanged.connect(self.editor_widget.set_frame_format)
@@ -106,8 +146,148 @@ class MainWindow(QMainWindow):
         self.grayscale_intensity_slider.valueChanged.connect(self.editor_widget.adjust_grayscale_intensity)
         self.sepia_intensity_slider.valueChanged.connect(self.editor_widget.adjust_sepia_intensity)
 
+        # Undo/Redo: Regler dem wiederhergestellten Zustand anpassen
+        self.editor_widget.state_restored.connect(self.sync_controls)
+
     def add_text_to_scene(self):
         scene_name = self.scene_name_input.text()
         scene_description = self.scene_description_input.toPlainText()
         font_size = int(self.font_size_combo.currentText())
-        self.editor_widget.add_text_to_scene(scene_name, scene_description, font_size)
\ No newline at end of file
+        self.editor_widget.add_text_to_scene(scene_name, scene_description, font_size)
+
+    def sync_controls(self, state):
+        """Regler und Textfelder auf einen Verlaufszustand setzen, ohne neue Schritte auszulösen."""
+        sliders = {
+            "brightness": self.brightness_slider,
+            "contrast": self.contrast_slider,
+            "grayscale": self.grayscale_intensity_slider,
+            "sepia": self.sepia_intensity_slider,
+        }
+        for name, slider in sliders.items():
+            slider.blockSignals(True)
+            slider.setValue(state["params"][name])
+            slider.blockSignals(False)
+        if state["text"] is not None:
+            self.scene_name_input.setText(state["text"]["name"])
+            self.scene_description_input.setPlainText(state["text"]["description"])
+            self.font_size_combo.setCurrentText(str(state["text"]["font_size"]))
+
+    def open_image(self, image_path):
+        """Open a single image as a shot of the current project."""
+        self.add_images([image_path])
+        image_path = os.path.abspath(image_path)
+        for shot in self.project.shots:
+            if shot.image_path == image_path:
+                self.open_shot(shot.id)
+                return
+
+    def add_images(self, image_paths):
+        added = self.project.add_images(image_paths)
+        if added:
+            self.shot_list.model.shots_added(len(added))
+        return added
+
+    def open_project(self, path):
+        """Read the manifest only; images are decoded when a shot is opened."""
+        if not self.confirm_unsaved_changes():
+            return
+        try:
+            project = Project.load(path)
+        except (OSError, ValueError) as e:
+            logger.error("Error opening project: %s", e)
+            return
+        self.project = project
+        self.current_shot_id = None
+        self.shot_list.set_project(project)
+        self.setWindowTitle(f"CineaExpress - {project.name or os.path.basename(path)}")
+        if project.shots:
+            self.open_shot(project.shots[0].id)
+
+    def save_project(self):
+        """Save the project, asking for a path the first time; returns True once it is on disk."""
+        self.commit_current_shot()
+        path = self.project.path
+        if path is None:
+            path, _ = QFileDialog.getSaveFileName(self, "Save Project", "",
+                                                  f"CineaExpress Projects (*{settings.PROJECT_EXTENSION})")
+            if not path:
+                return False
+            if not path.endswith(settings.PROJECT_EXTENSION):
+                path += settings.PROJECT_EXTENSION
+        try:
+            self.project.save(path)
+            # The sidecar exists from now on; keep the open shot's proxy there
+            self.store_current_proxy()
+            logger.info("Project saved to %s", path)
+            return True
+        except OSError as e:
+            logger.error("Error saving project: %s", e)
+            return False
+
+    def confirm_unsaved_changes(self):
+        """Offer to save a modified project; returns False if the user cancels."""
+        self.commit_current_shot()
+        # An untitled project that only collected opened images has nothing worth keeping
+        if not self.project.modified or (self.project.path is None
+                                         and all(shot.state is None for shot in self.project.shots)):
+            return True
+        answer = QMessageBox.question(self, "Unsaved Changes", "Save changes to the project?",
+                                      QMessageBox.Save | QMessageBox.Discard | QMessageBox.Cancel,
+                                      QMessageBox.Save)
+        if answer == QMessageBox.Save:
+            return self.save_project()
+        return answer == QMessageBox.Discard
+
+    def open_shot(self, shot_id):
+        """Keep the edits of the current shot, then load the selected one with its saved state."""
+        if shot_id == self.current_shot_id:
+            return
+        self.commit_current_shot()
+        shot = self.project.shot(shot_id)
+        # A proxy from the sidecar is shown at once; the full image is decoded on the render thread
+        self.project.restore_proxy(shot, self.editor_widget.image_cache)
+        # The saved frame rect already reflects format and width; only the controls follow
+        self.format_combo.blockSignals(True)
+        self.format_combo.setCurrentText(shot.frame_format)
+        self.format_combo.blockSignals(False)
+        self.width_slider.blockSignals(True)
+        self.width_slider.setValue(int(shot.frame_width))
+        self.width_slider.blockSignals(False)
+        if not self.editor_widget.load_image(shot.image_path, shot.state):
+            return
+        if shot.state is None:
+            # Unedited shots start from their frame defaults; that is their undo base, not an edit
+            self.editor_widget.set_frame_format(shot.frame_format)
+            self.editor_widget.set_frame_width(shot.frame_width)
+            self.editor_widget.reset_history()
+        self.current_shot_id = shot_id
+        self.shot_list.select(shot_id)
+        self.store_current_proxy()
+
+    def store_current_proxy(self):
+        if self.current_shot_id is None:
+            return
+        try:
+            self.project.store_proxy(self.project.shot(self.current_shot_id), self.editor_widget.image_cache)
+        except (OSError, ValueError) as e:
+            logger.warning("Could not store proxy: %s", e)
+
+    def commit_current_shot(self):
+        """Copy the editor state of the open shot into the project."""
+        if self.current_shot_id is None or not self.editor_widget.pixmap_item:
+            return
+        shot = self.project.shot(self.current_shot_id)
+        history = self.editor_widget.history
+        # Shots that were only looked at stay unedited
+        if shot.state is None and not history.can_undo():
+            return
+        self.project.update(shot.id, copy.deepcopy(history.state), self.format_combo.currentText(),
+                            self.width_slider.value())
+        self.shot_list.model.refresh(shot.id)
+
+    def closeEvent(self, event):
+        if not self.confirm_unsaved_changes():
+            event.ignore()
+            return
+        self.shot_list.model.shutdown()
+        super().closeEvent(event)
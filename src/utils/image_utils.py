@@ -2,39 +2,84 @@ from PySide6.QtGui import QImage, QPixmap
 from PIL import Image
 import numpy as np
 
-def qimage_to_numpy(qimage: QImage) -> np.ndarray:
-    """Convert QImage to numpy array."""
-    width = qimage.width()
-    height = qimage.height()
+# Internal pixel format: every image is normalized to this once at load time
+INTERNAL_FORMAT = QImage.Format_RGBA8888
+
+
+class _QImageBuffer:
+    """Exposes a QImage's pixel memory to NumPy and keeps the QImage alive."""
+
+    def __init__(self, qimage: QImage, writable: bool):
+        self.qimage = qimage
+        bits = qimage.bits() if writable else qimage.constBits()
+        self.address = np.frombuffer(bits, np.uint8).ctypes.data
+        self.__array_interface__ = {
+            "version": 3,
+            "shape": (qimage.height(), qimage.width(), 4),
+            "strides": (qimage.bytesPerLine(), 4, 1),
+            "typestr": "|u1",
+            "data": (self.address, not writable),
+        }
+
+
+def normalize_qimage(qimage: QImage) -> QImage:
+    """Convert a QImage to the internal RGBA8888 format (no-op if it already is)."""
+    if qimage.format() == INTERNAL_FORMAT:
+        return qimage
+    return qimage.convertToFormat(INTERNAL_FORMAT)
+
+
+def qimage_to_numpy(qimage: QImage, writable: bool = False) -> np.ndarray:
+    """Wrap an RGBA8888 QImage as an (H, W, 4) uint8 view without copying.
+
+    The view honours bytesPerLine padding and keeps the QImage alive for as
+    long as it exists. Images in other formats are converted first.
+    """
+    qimage = normalize_qimage(qimage)
+    if qimage.isNull():
+        return np.empty((0, 0, 4), np.uint8)
+    return np.asarray(_QImageBuffer(qimage, writable))
 
-    ptr = qimage.bits()
-    ptr.setsize(height * width * 4)
-    arr = np.frombuffer(ptr, np.uint8).reshape((height, width, 4))
-    return arr
 
 def numpy_to_qimage(arr: np.ndarray) -> QImage:
-    """Convert numpy array to QImage."""
-    height, width, channel = arr.shape
-    bytesPerLine = 3 * width
-    return QImage(arr.data, width, height, bytesPerLine, QImage.Format_RGB888)
+    """Wrap an (H, W, 4) uint8 RGBA array as a QImage that borrows its memory.
+
+    Row padding is passed on as bytesPerLine. The array is kept alive only by
+    a Python attribute on the returned QImage object. Copies made on the C++
+    side, e.g. when the image is passed through a queued signal, do not keep
+    it alive. Call QImage.copy() before such an image leaves the thread or
+    outlives the wrapper. QPixmap.fromImage() also detaches from the array.
+    Arrays whose pixels are not laid out row by row are copied once.
+    """
+    if arr.ndim != 3 or arr.shape[2] != 4 or arr.dtype != np.uint8:
+        raise ValueError(f"Expected RGBA uint8 array, got {arr.shape} {arr.dtype}")
+    if arr.strides[1:] != (4, 1) or arr.strides[0] < arr.shape[1] * 4 or arr.strides[0] % 4:
+        arr = np.ascontiguousarray(arr)
+    height, width = arr.shape[:2]
+    if arr.flags.c_contiguous:
+        rows = arr
+    else:
+        # Padded rows: expose the whole strided span as one flat byte buffer
+        span = arr.strides[0] * (height - 1) + width * 4
+        rows = np.lib.stride_tricks.as_strided(arr, shape=(span,), strides=(1,))
+    qimage = QImage(rows.data, width, height, arr.strides[0], INTERNAL_FORMAT)
+    qimage._numpy_owner = rows
+    return qimage
+
+
+def qimage_to_pil(qimage: QImage) -> Image.Image:
+    """Convert QImage to an RGBA PIL Image, sharing memory when rows are unpadded."""
+    return Image.fromarray(qimage_to_numpy(qimage), "RGBA")
+
+
+def pil_to_qimage(pil_image: Image.Image) -> QImage:
+    """Convert PIL Image to an RGBA8888 QImage with a single copy."""
+    if pil_image.mode != "RGBA":
+        pil_image = pil_image.convert("RGBA")
+    return numpy_to_qimage(np.asarray(pil_image))
+
 
 def pil_to_qpixmap(pil_image: Image.Image) -> QPixmap:
     """Convert PIL Image to QPixmap."""
     qimage = pil_to_qimage(pil_image)
     return QPixmap.fromImage(qimage)
-
-def pil_to_qimage(pil_image: Image.Image) -> QImage:
-    """Convert PIL Image to QImage."""
-    if pil_image.mode == "RGB":
-        r, g, b = pil_image.split()
-        pil_image = Image.merge("RGB", (b, g, r))
-    elif pil_image.mode == "RGBA":
-        r, g, b, a = pil_image.split()
-        pil_image = Image.merge("RGBA", (b, g, r, a))
-    
-    im2 = pil_image.convert("RGBA")
-    data = im2.tobytes("raw", "RGBA")
-    qimage = QImage(data, im2.size[0], im2.size[1], QImage.Format_RGBA8888)
-    return qimage
-
-# Weitere Utility-Funktionen...
\ No newline at end of file
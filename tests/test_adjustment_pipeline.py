@@ -0,0 +1,101 @@
+import unittest
+from unittest import mock
+import numpy as np
+from src.core import adjustment_pipeline
+from src.core.adjustment_pipeline import AdjustmentPipeline, downsample_half, proxy_level_for_scale
+
+class TestAdjustmentPipeline(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.source = rng.integers(0, 256, (32, 48, 4), dtype=np.uint8)
+        self.pipeline = AdjustmentPipeline(self.source)
+
+    def test_neutral_render_returns_source(self):
+        self.assertIs(self.pipeline.render(), self.source)
+
+    def test_render_does_not_compound(self):
+        self.pipeline.set_param("brightness", 20)
+        first = self.pipeline.render()
+        self.pipeline.set_param("brightness", 10)
+        self.pipeline.set_param("brightness", 20)
+        second = self.pipeline.render()
+        np.testing.assert_array_equal(first, second)
+        np.testing.assert_array_equal(self.source[..., 3], second[..., 3])
+
+    def test_unchanged_stages_are_cached(self):
+        self.pipeline.set_param("brightness", 20)
+        self.pipeline.set_param("sepia", 50)
+        first = self.pipeline.render()
+        self.pipeline.set_param("sepia", 50)
+        self.assertIs(self.pipeline.render(), first)
+
+    def test_unchanged_prefix_is_not_recomputed(self):
+        source = np.random.default_rng(1).integers(0, 256, (600, 800, 4), dtype=np.uint8)
+        pipeline = AdjustmentPipeline(source)
+        pipeline.set_param("contrast", 20)
+        pipeline.set_param("sepia", 50)
+        pipeline.render(level=1)
+        pipeline.set_param("sepia", 60)
+        # Proxy and mean luma do not depend on the changed slider
+        with mock.patch.object(adjustment_pipeline, "downsample_half", side_effect=AssertionError("recomputed")), \
+                mock.patch.object(adjustment_pipeline, "estimate_mean_luma", side_effect=AssertionError("recomputed")):
+            result = pipeline.render(level=1)
+        self.assertEqual(result.shape, (300, 400, 4))
+
+    def test_grayscale_full_intensity_is_gray(self):
+        self.pipeline.set_param("grayscale", 100)
+        result = self.pipeline.render().astype(int)
+        self.assertLessEqual(np.abs(result[..., 0] - result[..., 1]).max(), 1)
+        self.assertLessEqual(np.abs(result[..., 1] - result[..., 2]).max(), 1)
+
+    def test_rotate_and_flip_are_lazy(self):
+        source = self.pipeline.source
+        revision = self.pipeline.revision
+        self.pipeline.rotate90()
+        self.pipeline.flip_horizontal()
+        self.assertIs(self.pipeline.source, source)
+        self.assertEqual(self.pipeline.revision, revision)
+        self.assertEqual(self.pipeline.render().shape, source.shape)
+        expected = np.rot90(source)[:, ::-1]
+        self.assertTrue((self.pipeline.render_export() == expected).all())
+
+    def test_proxy_render_is_downsampled(self):
+        source = np.full((1030, 1500, 4), 200, np.uint8)
+        pipeline = AdjustmentPipeline(source)
+        self.assertEqual(pipeline.max_proxy_level(), 2)
+        pipeline.set_param("brightness", -50)
+        proxy = pipeline.render(level=5)
+        self.assertEqual(proxy.shape, (257, 375, 4))
+        self.assertTrue((proxy[..., :3] == 100).all())
+        self.assertEqual(pipeline.render().shape, source.shape)
+
+    def test_deferred_source_is_loaded_on_full_resolution_render(self):
+        source = np.full((1030, 1500, 4), 200, np.uint8)
+        proxy = downsample_half(downsample_half(source))
+        requested = []
+
+        def loader(level):
+            requested.append(level)
+            return source if level == 0 else proxy if level == 2 else None
+
+        pipeline = AdjustmentPipeline()
+        pipeline.set_source(None, loader, size=(1500, 1030))
+        pipeline.set_param("contrast", 20)
+        self.assertEqual(pipeline.render(level=2).shape, proxy.shape)
+        self.assertEqual(requested, [2])
+        self.assertFalse(pipeline.source_loaded())
+        self.assertEqual(pipeline.render().shape, source.shape)
+        self.assertIs(pipeline.source, source)
+        self.assertEqual(requested, [2, 0])
+
+    def test_downsample_half_averages_blocks(self):
+        block = np.array([[[0] * 4, [4] * 4], [[8] * 4, [12] * 4]], np.uint8)
+        self.assertEqual(downsample_half(block)[0, 0, 0], 6)
+
+    def test_proxy_level_for_scale(self):
+        self.assertEqual(proxy_level_for_scale(1.5, 4), 0)
+        self.assertEqual(proxy_level_for_scale(0.3, 4), 1)
+        self.assertEqual(proxy_level_for_scale(0.05, 2), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from PIL import Image
+from src.core.batch_processor import BatchProcessor
+from src.core.recipe import apply_recipe, compile_recipe, validate_recipe
+
+class TestBatchProcessor(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.input_dir = os.path.join(self.tmp.name, "in")
+        self.output_dir = os.path.join(self.tmp.name, "out")
+        os.makedirs(self.input_dir)
+        rng = np.random.default_rng(3)
+        for index in range(5):
+            pixels = rng.integers(0, 256, (60, 80, 3), dtype=np.uint8)
+            Image.fromarray(pixels).save(os.path.join(self.input_dir, f"shot_{index}.png"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_run_processes_glob_in_parallel(self):
+        processor = BatchProcessor(os.path.join(self.input_dir, "*.png"), max_workers=2, max_in_flight=2)
+        seen = []
+        summary = processor.run(self.output_dir, [{"op": "rotate", "angle": 90},
+                                                  {"op": "adjust", "brightness": 10}],
+                                on_result=seen.append)
+        self.assertEqual(summary.processed, 5)
+        self.assertEqual(len(seen), 5)
+        self.assertGreater(summary.images_per_second, 0)
+        with Image.open(os.path.join(self.output_dir, "shot_0.png")) as image:
+            self.assertEqual(image.size, (60, 80))
+
+    def test_rerun_skips_unchanged_items(self):
+        processor = BatchProcessor(os.path.join(self.input_dir, "*.png"), max_workers=2)
+        ops = [{"op": "flip", "direction": "vertical"}]
+        self.assertEqual(processor.run(self.output_dir, ops).processed, 5)
+
+        changed = os.path.join(self.input_dir, "shot_3.png")
+        Image.new("RGB", (80, 60), "white").save(changed)
+        os.remove(os.path.join(self.output_dir, "shot_4.png"))
+        summary = processor.run(self.output_dir, ops)
+        self.assertEqual(summary.skipped, 3)
+        self.assertEqual(sorted(os.path.basename(r.image_path) for r in summary.results if not r.skipped),
+                         ["shot_3.png", "shot_4.png"])
+
+        self.assertEqual(processor.run(self.output_dir, ops + [{"op": "adjust", "sepia": 50}]).processed, 5)
+
+    def test_touched_but_identical_input_is_skipped(self):
+        processor = BatchProcessor(os.path.join(self.input_dir, "*.png"), max_workers=1)
+        processor.run(self.output_dir, [])
+        path = os.path.join(self.input_dir, "shot_0.png")
+        os.utime(path, ns=(1, 1))
+        self.assertEqual(processor.run(self.output_dir, []).skipped, 5)
+
+    def test_changed_lut_file_invalidates_outputs(self):
+        path = os.path.join(self.tmp.name, "look.cube")
+
+        def write_cube(scale):
+            with open(path, "w") as handle:
+                handle.write("LUT_3D_SIZE 2\n")
+                for b in (0, 1):
+                    for g in (0, 1):
+                        for r in (0, 1):
+                            handle.write("%f %f %f\n" % (r * scale, g * scale, b * scale))
+
+        write_cube(1.0)
+        processor = BatchProcessor(os.path.join(self.input_dir, "*.png"), max_workers=1)
+        ops = [{"op": "lut", "path": path}]
+        self.assertEqual(processor.run(self.output_dir, ops).processed, 5)
+        self.assertEqual(processor.run(self.output_dir, ops).skipped, 5)
+        # Gleicher Name, neuer Inhalt
+        write_cube(0.5)
+        os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 10 ** 9))
+        self.assertEqual(processor.run(self.output_dir, ops).processed, 5)
+
+    def test_subdirectories_keep_outputs_apart(self):
+        for card in ("A", "B"):
+            os.makedirs(os.path.join(self.input_dir, card))
+            Image.new("RGB", (8, 6), "red" if card == "A" else "blue").save(
+                os.path.join(self.input_dir, card, "A001.png"))
+        processor = BatchProcessor(os.path.join(self.input_dir, "*", "A001.png"), max_workers=1)
+        self.assertEqual(processor.run(self.output_dir, []).processed, 2)
+        with Image.open(os.path.join(self.output_dir, "B", "A001.png")) as image:
+            self.assertEqual(image.getpixel((0, 0)), (0, 0, 255))
+
+    def test_colliding_outputs_are_rejected_before_processing(self):
+        Image.new("RGB", (8, 6)).save(os.path.join(self.input_dir, "shot_0.jpg"))
+        processor = BatchProcessor(os.path.join(self.input_dir, "shot_0.*"), max_workers=1)
+        with self.assertRaises(ValueError):
+            processor.run(self.output_dir, [], preset="jpeg")
+        self.assertFalse(os.path.exists(os.path.join(self.output_dir, "shot_0.jpg")))
+
+    def test_failures_are_reported_not_raised(self):
+        processor = BatchProcessor([os.path.join(self.input_dir, "missing.png")], max_workers=1)
+        summary = processor.run(self.output_dir, [])
+        self.assertEqual(summary.processed, 0)
+        self.assertEqual(len(summary.failed), 1)
+
+    def test_recipe_frame_burn_in(self):
+        image = Image.new("RGB", (160, 90), "black")
+        framed = apply_recipe(image, [{"op": "frame", "format": "16:9", "width": 50, "color": "#FF0000"}])
+        self.assertEqual(framed.getpixel((40, 45)), (255, 0, 0))
+
+    def test_pointwise_runs_are_baked(self):
+        ops = [{"op": "adjust", "brightness": 10}, {"op": "adjust", "sepia": 30},
+               {"op": "rotate", "angle": 90},
+               {"op": "adjust", "contrast": 20}, {"op": "adjust", "grayscale": 50}]
+        compiled = compile_recipe(ops)
+        self.assertEqual([step["op"] for step in compiled], ["baked_lut", "rotate", "adjust", "adjust"])
+
+        image = Image.open(os.path.join(self.input_dir, "shot_0.png"))
+        expected = np.asarray(apply_recipe(image, ops), dtype=int)
+        actual = np.asarray(apply_recipe(image, compiled), dtype=int)
+        self.assertLessEqual(np.abs(actual - expected).max(), 3)
+
+    def test_unknown_operation_is_rejected(self):
+        with self.assertRaises(ValueError):
+            validate_recipe([{"op": "explode"}])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+import numpy as np
+from PIL import Image
+from src.core.burn_in import BurnInSpec, GlyphCache, points_to_pixels, render_burn_in
+from src.core.recipe import apply_recipe
+
+class TestBurnIn(unittest.TestCase):
+    def setUp(self):
+        self.array = np.full((60, 100, 3), 100, dtype=np.uint8)
+
+    def test_solid_frame_band(self):
+        spec = BurnInSpec(frame_rect=(20, 10, 80, 50), frame_color="#FF0000", pen_width=2)
+        render_burn_in(self.array, spec)
+        self.assertEqual(tuple(self.array[10, 50]), (255, 0, 0))
+        self.assertEqual(tuple(self.array[9, 50]), (255, 0, 0))
+        self.assertEqual(tuple(self.array[30, 20]), (255, 0, 0))
+        self.assertEqual(tuple(self.array[30, 50]), (100, 100, 100))
+        self.assertEqual(tuple(self.array[12, 50]), (100, 100, 100))
+
+    def test_dashed_frame_has_gaps(self):
+        spec = BurnInSpec(frame_rect=(20, 10, 80, 50), frame_color="#FF0000", pen_width=2, pen_style="dash")
+        render_burn_in(self.array, spec)
+        top_edge = self.array[10, 20:80, 0]
+        # Strich 8 px, Lücke 4 px
+        self.assertTrue((top_edge[:8] == 255).all())
+        self.assertTrue((top_edge[8:12] == 100).all())
+        self.assertTrue((top_edge[12:20] == 255).all())
+
+    def test_unknown_pen_style(self):
+        with self.assertRaises(ValueError):
+            render_burn_in(self.array, BurnInSpec(frame_rect=(20, 10, 80, 50), pen_style="wavy"))
+
+    def test_matte_outside_frame(self):
+        spec = BurnInSpec(frame_rect=(20, 10, 80, 50), draw_frame=False, matte_color="#000000", matte_opacity=0.5)
+        render_burn_in(self.array, spec)
+        self.assertEqual(tuple(self.array[0, 0]), (50, 50, 50))
+        self.assertEqual(tuple(self.array[55, 90]), (50, 50, 50))
+        self.assertEqual(tuple(self.array[30, 50]), (100, 100, 100))
+
+    def test_point_sizes_are_converted_to_pixels(self):
+        # Die Oberfläche rechnet in Punkt, eingebrannt wird in Pixeln (96 dpi)
+        self.assertEqual(points_to_pixels(12), 16)
+        self.assertEqual(points_to_pixels(14), 19)
+
+    def test_text_uses_glyph_cache(self):
+        cache = GlyphCache()
+        spec = BurnInSpec(frame_rect=(10, 40, 90, 55), draw_frame=False, name="AAA", description="AB",
+                          font_size=10, text_color="#FFFFFF")
+        render_burn_in(self.array, spec, glyph_cache=cache)
+        self.assertGreater(self.array.max(), 100)
+        # "A" fett und normal, "B" normal: drei Rasterungen
+        self.assertEqual(cache.misses, 3)
+        render_burn_in(self.array, spec, glyph_cache=cache)
+        self.assertEqual(cache.misses, 3)
+        self.assertEqual(cache.hits, 2 + 5)
+
+    def test_strips_match_whole_image(self):
+        rng = np.random.default_rng(3)
+        image = rng.integers(0, 256, (64, 96, 3), dtype=np.uint8)
+        spec = BurnInSpec(frame_rect=(12.4, 30.6, 80.2, 60.1), pen_width=3, pen_style="dashdot",
+                          matte_color="#102030", matte_opacity=0.7, name="Szene 1", description="Totale",
+                          font_size=9)
+        expected = render_burn_in(image.copy(), spec)
+        actual = image.copy()
+        for top in range(0, 64, 7):
+            render_burn_in(actual[top:top + 7], spec, offset=(0, top), size=(96, 64))
+        np.testing.assert_array_equal(actual, expected)
+
+    def test_recipe_op(self):
+        image = Image.fromarray(self.array)
+        result = apply_recipe(image, [{"op": "burn_in", "frame_format": "4:3", "frame_width": 50,
+                                       "frame_color": "#00FF00", "matte_color": "#000000"}])
+        pixels = np.asarray(result)
+        self.assertEqual(tuple(pixels[0, 0]), (0, 0, 0))
+        self.assertEqual(tuple(pixels[30, 50]), (100, 100, 100))
+        self.assertIn((0, 255, 0), {tuple(pixel) for pixel in pixels.reshape(-1, 3)})
+        self.assertEqual(tuple(self.array[0, 0]), (100, 100, 100))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from PIL import Image
+from src.cli import load_recipe, main
+
+class TestCli(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.input_dir = os.path.join(self.tmp.name, "in")
+        os.makedirs(self.input_dir)
+        for index in range(2):
+            Image.new("RGB", (80, 45), (index * 100, 50, 50)).save(os.path.join(self.input_dir, f"shot_{index}.png"))
+        self.recipe = os.path.join(self.tmp.name, "recipe.json")
+        with open(self.recipe, "w", encoding="utf-8") as handle:
+            json.dump({"ops": [{"op": "flip", "direction": "horizontal"}, {"op": "frame", "width": 50}]}, handle)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_cli(self, *argv):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            code = main(list(argv))
+        return code, output.getvalue()
+
+    def test_load_recipe_accepts_list_or_mapping(self):
+        self.assertEqual(load_recipe(self.recipe)[0]["op"], "flip")
+        path = os.path.join(self.tmp.name, "list.json")
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump([{"op": "rotate", "angle": 90}], handle)
+        self.assertEqual(load_recipe(path), [{"op": "rotate", "angle": 90}])
+
+    def test_render_command(self):
+        output_dir = os.path.join(self.tmp.name, "out")
+        code, output = self.run_cli("render", self.recipe, os.path.join(self.input_dir, "*.png"),
+                                    "-o", output_dir, "-j", "1")
+        self.assertEqual(code, 0)
+        self.assertIn("2/2", output)
+        with Image.open(os.path.join(output_dir, "shot_0.png")) as image:
+            self.assertEqual(image.size, (80, 45))
+
+    def test_render_reframe(self):
+        output_dir = os.path.join(self.tmp.name, "out")
+        code, _ = self.run_cli("render", self.recipe, os.path.join(self.input_dir, "*.png"),
+                               "-o", output_dir, "-j", "1", "-q", "--reframe", "2:1")
+        self.assertEqual(code, 0)
+        with Image.open(os.path.join(output_dir, "shot_0.png")) as image:
+            self.assertEqual(image.size, (80, 40))
+
+    def test_unknown_operation_fails_cleanly(self):
+        with open(self.recipe, "w", encoding="utf-8") as handle:
+            json.dump([{"op": "explode"}], handle)
+        with contextlib.redirect_stderr(io.StringIO()):
+            code, _ = self.run_cli("render", self.recipe, self.input_dir, "-o", self.tmp.name)
+        self.assertEqual(code, 2)
+
+    def test_match_command(self):
+        output_dir = os.path.join(self.tmp.name, "out")
+        stats_cache = os.path.join(self.tmp.name, "stats.json")
+        code, output = self.run_cli("match", os.path.join(self.input_dir, "*.png"), "-o", output_dir, "-j", "1",
+                                    "--stats-cache", stats_cache, "--recipe", self.recipe)
+        self.assertEqual(code, 0)
+        self.assertIn("2 computed", output)
+        self.assertTrue(os.path.exists(os.path.join(output_dir, "shot_1.png")))
+        code, output = self.run_cli("match", os.path.join(self.input_dir, "*.png"), "--dry-run",
+                                    "--stats-cache", stats_cache)
+        self.assertEqual(code, 0)
+        self.assertIn("0 computed, 2 cached", output)
+
+    def test_project_command(self):
+        from src.core.project import Project
+
+        project = Project()
+        project.add_images([os.path.join(self.input_dir, "shot_0.png")])
+        project.shots[0].state = {"params": {"brightness": 0}, "geometry": [1, False, None], "frame": None}
+        project_path = os.path.join(self.tmp.name, "day.cxproj")
+        project.save(project_path)
+        output_dir = os.path.join(self.tmp.name, "out")
+        code, output = self.run_cli("project", project_path, "-o", output_dir, "-j", "1")
+        self.assertEqual(code, 0)
+        self.assertIn("1/1", output)
+        with Image.open(os.path.join(output_dir, "shot_0.png")) as image:
+            self.assertEqual(image.size, (45, 80))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+import numpy as np
+from PIL import Image, ImageEnhance
+from src.core.color_transform import ColorTransform, estimate_mean_luma
+
+class TestColorTransform(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.rgb = rng.integers(0, 256, (40, 30, 3), dtype=np.uint8)
+
+    def test_brightness_matches_pil(self):
+        expected = np.asarray(ImageEnhance.Brightness(Image.fromarray(self.rgb)).enhance(1.3)).astype(int)
+        result = ColorTransform.from_adjustments(brightness=30).apply(self.rgb).astype(int)
+        self.assertLessEqual(np.abs(result - expected).max(), 1)
+
+    def test_contrast_matches_pil(self):
+        expected = np.asarray(ImageEnhance.Contrast(Image.fromarray(self.rgb)).enhance(0.6)).astype(int)
+        transform = ColorTransform.from_adjustments(contrast=-40, mean_luma=estimate_mean_luma(self.rgb))
+        result = transform.apply(self.rgb).astype(int)
+        self.assertLessEqual(np.abs(result - expected).max(), 1)
+
+    def test_brightness_and_contrast_use_lut_path(self):
+        transform = ColorTransform.from_adjustments(brightness=10, contrast=20)
+        self.assertTrue(transform.is_separable())
+        self.assertEqual(transform.luts().shape, (3, 256))
+
+    def test_fused_equals_sequential_without_clipping(self):
+        fused = ColorTransform.from_adjustments(grayscale=40, sepia=30)
+        gray = ColorTransform.from_adjustments(grayscale=40).affine
+        sepia = ColorTransform.from_adjustments(sepia=30).affine
+        np.testing.assert_allclose(fused.affine[:, :3], sepia[:, :3] @ gray[:, :3], atol=1e-6)
+
+    def test_alpha_is_preserved_and_out_is_reused(self):
+        rgba = np.dstack([self.rgb, np.full(self.rgb.shape[:2], 77, np.uint8)])
+        out = np.empty_like(rgba)
+        result = ColorTransform.from_adjustments(sepia=100).apply(rgba, out=out)
+        self.assertIs(result, out)
+        self.assertTrue((result[..., 3] == 77).all())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import unittest
+import numpy as np
+from src.core.edit_history import EditHistory, apply_op, initial_state, state_geometry
+from src.core.geometry import Geometry
+
+class TestEditHistory(unittest.TestCase):
+    def setUp(self):
+        self.history = EditHistory(max_steps=1000, checkpoint_interval=10, pixel_budget=1000, merge_seconds=60)
+
+    def test_undo_redo(self):
+        self.history.record({"op": "adjust", "name": "brightness", "value": 20})
+        self.history.record({"op": "rotate", "angle": 90})
+        self.assertEqual(self.history.state["geometry"][0], 1)
+
+        state = self.history.undo()
+        self.assertEqual(state["geometry"][0], 0)
+        self.assertEqual(state["params"]["brightness"], 20)
+        state = self.history.undo()
+        self.assertEqual(state["params"]["brightness"], 0)
+        self.assertIsNone(self.history.undo())
+
+        self.history.redo()
+        state = self.history.redo()
+        self.assertEqual(state["geometry"][0], 1)
+        self.assertIsNone(self.history.redo())
+
+    def test_record_drops_redo_tail(self):
+        self.history.record({"op": "flip", "direction": "horizontal"})
+        self.history.record({"op": "export_crop", "enabled": True})
+        self.history.undo()
+        self.history.record({"op": "text", "name": "1A", "description": "Totale", "font_size": 14})
+        self.assertFalse(self.history.can_redo())
+        self.assertFalse(self.history.state["export_crop"])
+        self.assertEqual(self.history.state["text"]["name"], "1A")
+
+    def test_merge_coalesces_slider_drag(self):
+        for value in range(1, 51):
+            self.history.record({"op": "adjust", "name": "contrast", "value": value}, merge=True)
+        self.history.record({"op": "adjust", "name": "sepia", "value": 30}, merge=True)
+        self.assertEqual(len(self.history.steps), 2)
+        self.assertEqual(self.history.undo()["params"]["contrast"], 50)
+        self.assertEqual(self.history.undo()["params"]["contrast"], 0)
+
+    def test_replay_matches_direct_application(self):
+        ops = []
+        for index in range(95):
+            op = [{"op": "adjust", "name": "brightness", "value": index},
+                  {"op": "rotate", "angle": 90},
+                  {"op": "flip", "direction": "vertical"},
+                  {"op": "frame", "rect": [index, 2, 80, 45]}][index % 4]
+            ops.append(op)
+            self.history.record(op)
+        state = initial_state()
+        for op in ops[:57]:
+            state = apply_op(state, op)
+        self.assertEqual(self.history.state_at(57), state)
+
+        for _ in range(38):
+            self.history.undo()
+        self.assertEqual(self.history.state, state)
+        expected = Geometry()
+        for op in ops[:57]:
+            if op["op"] == "rotate":
+                expected = expected.rotated(90)
+            elif op["op"] == "flip":
+                expected = expected.flipped("vertical")
+        self.assertEqual(state_geometry(self.history.state), expected)
+
+    def test_max_steps_folds_into_base(self):
+        history = EditHistory(max_steps=5, checkpoint_interval=2)
+        for value in range(1, 9):
+            history.record({"op": "adjust", "name": "brightness", "value": value})
+        self.assertEqual(len(history.steps), 5)
+        while history.can_undo():
+            state = history.undo()
+        self.assertEqual(state["params"]["brightness"], 3)
+
+    def test_pixel_checkpoints_respect_budget(self):
+        params = initial_state()["params"]
+        arrays = []
+        for value in range(4):
+            params = dict(params, brightness=value)
+            arrays.append(np.full((10, 10, 4), value, np.uint8))
+            self.assertTrue(self.history.add_pixels(params, arrays[-1]))
+        # 400 Bytes je Array, Budget 1000: nur die letzten zwei bleiben
+        self.assertEqual(self.history.pixel_bytes, 800)
+        self.assertIsNone(self.history.pixels(dict(params, brightness=1)))
+        self.assertIs(self.history.pixels(dict(params, brightness=3)), arrays[3])
+        self.assertFalse(self.history.add_pixels(params, np.zeros((20, 20, 4), np.uint8)))
+
+    def test_hundreds_of_steps_cost_kilobytes(self):
+        history = EditHistory(pixel_budget=0)
+        for index in range(500):
+            history.record({"op": "adjust", "name": ["brightness", "contrast"][index % 2], "value": index % 100})
+            if index % 50 == 0:
+                history.record({"op": "rotate", "angle": 90}, {"op": "frame", "rect": [10.5, 20.25, 800.0, 450.0]})
+        self.assertLess(history.nbytes(), 100 * 1024)
+
+    def test_unknown_op_raises(self):
+        with self.assertRaises(ValueError):
+            self.history.record({"op": "blur", "radius": 3})
+
+if __name__ == '__main__':
+    unittest.main()
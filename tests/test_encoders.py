@@ -0,0 +1,92 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from PIL import Image
+from src.core import encoders
+from src.core.batch_processor import BatchProcessor
+from src.core.file_manager import FileManager
+
+class TestEncoders(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(4)
+        self.image = Image.fromarray(rng.integers(0, 256, (48, 64, 3), dtype=np.uint8))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_preset_from_extension(self):
+        self.assertEqual(encoders.preset_for_path("a/b.JPEG").name, "jpeg")
+        self.assertEqual(encoders.preset_for_path("b.tiff").format, "TIFF")
+        with self.assertRaises(ValueError):
+            encoders.preset_for_path("b.xyz")
+        with self.assertRaises(ValueError):
+            encoders.get_preset("jpeg-ultra")
+
+    def test_defaults_write_the_same_bytes_as_image_save(self):
+        for extension in (".jpg", ".png", ".webp", ".tif", ".bmp"):
+            preset = encoders.preset_for_path("a" + extension)
+            if not preset.available():
+                continue
+            path = os.path.join(self.tmp.name, "default" + extension)
+            encoders.save(self.image, path)
+            expected = os.path.join(self.tmp.name, "plain" + extension)
+            self.image.save(expected)
+            with open(path, "rb") as written, open(expected, "rb") as plain:
+                self.assertEqual(written.read(), plain.read(), extension)
+
+    def test_jpeg_options_are_applied(self):
+        for name, subsampling in (("jpeg-dailies", 2), ("jpeg-444", 0), ("jpeg-high", 0)):
+            path = os.path.join(self.tmp.name, f"{name}.jpg")
+            result = encoders.save(self.image.convert("RGBA"), path, name)
+            self.assertEqual((result.preset, result.pixels), (name, 64 * 48))
+            self.assertEqual(result.bytes, os.path.getsize(path))
+            with Image.open(path) as written:
+                from PIL import JpegImagePlugin
+                self.assertEqual(JpegImagePlugin.get_sampling(written), subsampling)
+        self.assertEqual([name for name in os.listdir(self.tmp.name) if name.endswith(".tmp")], [])
+
+    def test_lossless_presets_round_trip(self):
+        for name in ("png-fast", "png-small", "webp-lossless", "tiff", "tiff-deflate"):
+            preset = encoders.get_preset(name)
+            if not preset.available():
+                continue
+            path = os.path.join(self.tmp.name, name + preset.extension)
+            encoders.save(self.image, path, preset)
+            with Image.open(path) as written:
+                self.assertEqual(written.convert("RGB").tobytes(), self.image.tobytes(), name)
+
+    def test_tiff_16_bit(self):
+        preset = encoders.get_preset("tiff-16")
+        if not preset.available():
+            self.skipTest("OpenCV nicht installiert")
+        import cv2
+        path = os.path.join(self.tmp.name, "deep.tif")
+        encoders.save(self.image, path, preset)
+        written = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+        self.assertEqual(written.dtype, np.uint16)
+        np.testing.assert_array_equal(written[..., ::-1], np.asarray(self.image).astype(np.uint16) * 257)
+
+    def test_benchmark_is_sorted_by_time(self):
+        results = encoders.benchmark(self.image, ["png", "jpeg-dailies", "bmp"], repeat=1)
+        self.assertEqual(sorted(result.preset for result in results), ["bmp", "jpeg-dailies", "png"])
+        self.assertEqual([result.seconds for result in results], sorted(result.seconds for result in results))
+
+    def test_supported_formats(self):
+        formats = FileManager().get_supported_formats()
+        self.assertTrue({"png", "jpg", "tif"} <= set(formats))
+
+    def test_batch_preset_changes_extension_and_invalidates(self):
+        input_path = os.path.join(self.tmp.name, "shot.png")
+        self.image.save(input_path)
+        output_dir = os.path.join(self.tmp.name, "out")
+        processor = BatchProcessor([input_path], max_workers=1)
+        self.assertEqual(processor.run(output_dir, [], preset="jpeg-dailies").processed, 1)
+        with Image.open(os.path.join(output_dir, "shot.jpg")) as written:
+            self.assertEqual(written.format, "JPEG")
+        self.assertEqual(processor.run(output_dir, [], preset="jpeg-dailies").skipped, 1)
+        self.assertEqual(processor.run(output_dir, [], preset="jpeg-high").processed, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,18 +1,30 @@
+import os
+import tempfile
 import unittest
+import numpy as np
+from PIL import Image
 from src.core.file_manager import FileManager
 
 class TestFileManager(unittest.TestCase):
     def setUp(self):
         self.manager = FileManager()
+        self.directory = tempfile.TemporaryDirectory()
+        self.image_path = os.path.join(self.directory.name, "test_image.jpg")
+        rng = np.random.default_rng(3)
+        Image.fromarray(rng.integers(0, 256, (60, 80, 3), dtype=np.uint8)).save(self.image_path)
+
+    def tearDown(self):
+        self.directory.cleanup()
 
     def test_load_image(self):
-        image = self.manager.load_image("test_image.jpg")
+        image = self.manager.load_image(self.image_path)
         self.assertIsNotNone(image)
 
     def test_save_image(self):
-        image = self.manager.load_image("test_image.jpg")
-        self.manager.save_image(image, "output_image.jpg")
-        self.assertTrue(os.path.exists("output_image.jpg"))
+        output_path = os.path.join(self.directory.name, "output_image.jpg")
+        image = self.manager.load_image(self.image_path)
+        self.manager.save_image(image, output_path)
+        self.assertTrue(os.path.exists(output_path))
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+import numpy as np
+from PIL import Image
+from src.core.adjustment_pipeline import AdjustmentPipeline
+from src.core.framing import frame_box, frame_cache_info, frame_rect
+from src.core.geometry import Geometry
+from src.core.recipe import apply_recipe, compile_recipe, validate_recipe
+from src.core.tiling import TiledImage, apply_recipe_tiled
+
+class TestFraming(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(11)
+        self.image = Image.fromarray(rng.integers(0, 256, (90, 160, 3), dtype=np.uint8))
+
+    def test_frame_rect_matches_editor(self):
+        left, top, right, bottom = frame_rect((160, 90), "16:9", 80)
+        self.assertAlmostEqual(right - left, 128)
+        self.assertAlmostEqual(bottom - top, 72)
+        self.assertAlmostEqual(left, 16)
+
+    def test_frame_box_fits_inside_image(self):
+        self.assertEqual(frame_box((160, 90), "2:1", 100), (0, 5, 160, 85))
+        # 4:3 bei voller Breite wäre höher als das Bild: mit gleichem Verhältnis eingepasst
+        self.assertEqual(frame_box((160, 90), "4:3", 100), (20, 0, 140, 90))
+
+    def test_frame_geometry_is_cached(self):
+        before = frame_cache_info()["frame_box"].hits
+        for _ in range(5):
+            frame_box((1234, 567), "2.35:1", 90)
+        self.assertEqual(frame_cache_info()["frame_box"].hits - before, 4)
+
+    def test_reframe_crop_and_letterbox(self):
+        cropped = apply_recipe(self.image, [{"op": "reframe", "format": "2:1"}])
+        self.assertEqual(cropped.tobytes(), self.image.crop((0, 5, 160, 85)).tobytes())
+        matted = np.asarray(apply_recipe(self.image, [{"op": "reframe", "format": "2:1", "mode": "letterbox"}]))
+        self.assertEqual(matted.shape, (90, 160, 3))
+        self.assertFalse(matted[:5].any())
+        self.assertFalse(matted[85:].any())
+        np.testing.assert_array_equal(matted[5:85], np.asarray(self.image)[5:85])
+
+    def test_unknown_mode_is_rejected(self):
+        with self.assertRaises(ValueError):
+            validate_recipe([{"op": "reframe", "mode": "stretch"}])
+
+    def test_reframe_after_rotation_folds_into_transform(self):
+        ops = [{"op": "rotate", "angle": 90}, {"op": "reframe", "format": "1:1"}]
+        compiled = compile_recipe(ops)
+        self.assertEqual([step["op"] for step in compiled], ["transform"])
+        expected = self.image.rotate(90, expand=True).crop(frame_box((90, 160), "1:1"))
+        self.assertEqual(apply_recipe(self.image, compiled).tobytes(), expected.tobytes())
+        self.assertEqual(apply_recipe(self.image, ops).tobytes(), expected.tobytes())
+
+    def test_tiled_reframe_matches_recipe(self):
+        for mode in ("crop", "letterbox"):
+            ops = [{"op": "reframe", "format": "2.35:1", "width": 90, "mode": mode}]
+            tiled = apply_recipe_tiled(TiledImage.from_image(self.image, memory_budget=4096), ops)
+            self.assertEqual(tiled.to_pil().tobytes(), apply_recipe(self.image, ops).tobytes())
+
+    def test_pipeline_renders_only_the_cropped_region(self):
+        source = np.asarray(self.image.convert("RGBA"))
+        pipeline = AdjustmentPipeline(source)
+        pipeline.set_param("brightness", 20)
+        pipeline.set_param("contrast", 10)
+        geometry = Geometry(turns=1).cropped((10, 20, 60, 150), (160, 90))
+        expected = geometry.apply(pipeline.render())
+        np.testing.assert_array_equal(pipeline.render_export(geometry=geometry), expected)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+import numpy as np
+from PIL import Image
+from src.core.geometry import Geometry
+from src.core.recipe import apply_recipe, compile_recipe
+
+def apply_sequentially(array, steps):
+    for step in steps:
+        if step["op"] == "rotate":
+            array = np.rot90(array, step["angle"] // 90)
+        elif step["op"] == "flip":
+            array = array[:, ::-1] if step["direction"] == "horizontal" else array[::-1]
+        else:
+            left, upper, right, lower = step["box"]
+            array = array[upper:lower, left:right]
+    return array
+
+class TestGeometry(unittest.TestCase):
+    def setUp(self):
+        self.array = np.random.default_rng(6).integers(0, 256, (30, 50, 3), dtype=np.uint8)
+
+    def test_all_orientations_match_sequential_steps(self):
+        rng = np.random.default_rng(7)
+        choices = [{"op": "rotate", "angle": 90}, {"op": "rotate", "angle": 270},
+                   {"op": "flip", "direction": "horizontal"}, {"op": "flip", "direction": "vertical"}]
+        for _ in range(40):
+            steps = [choices[index] for index in rng.integers(0, len(choices), rng.integers(1, 7))]
+            geometry = Geometry.from_steps(steps, (50, 30))
+            self.assertTrue((geometry.apply(self.array) == apply_sequentially(self.array, steps)).all(), steps)
+
+    def test_crop_after_rotation_maps_to_source(self):
+        steps = [{"op": "rotate", "angle": 90}, {"op": "flip", "direction": "horizontal"},
+                 {"op": "crop", "box": [3, 5, 20, 40]}, {"op": "rotate", "angle": 90},
+                 {"op": "crop", "box": [2, 1, 30, 12]}]
+        geometry = Geometry.from_steps(steps, (50, 30))
+        expected = apply_sequentially(self.array, steps)
+        self.assertEqual(geometry.output_size((50, 30)), (expected.shape[1], expected.shape[0]))
+        self.assertTrue((geometry.apply(self.array) == expected).all())
+
+    def test_crop_past_previous_crop_starts_new_geometry(self):
+        # In der gedrehten Ausgabe (20x20) reicht der zweite Zuschnitt über den ersten hinaus
+        steps = [{"op": "crop", "box": [10, 5, 30, 25]}, {"op": "rotate", "angle": 90},
+                 {"op": "crop", "box": [-5, 2, 15, 40]}]
+        geometries = Geometry.chain(steps, (50, 30))
+        self.assertEqual(geometries, [Geometry(turns=1, box=(10, 5, 30, 25)), Geometry(box=(-5, 2, 15, 40))])
+        with self.assertRaises(ValueError):
+            Geometry.from_steps(steps, (50, 30))
+
+    def test_out_of_range_crops_match_sequential_recipe(self):
+        rng = np.random.default_rng(8)
+        image = Image.fromarray(self.array)
+        for _ in range(200):
+            ops = []
+            for _ in range(rng.integers(2, 5)):
+                if rng.random() < 0.3:
+                    ops.append({"op": "rotate", "angle": 90 * int(rng.integers(1, 4))})
+                else:
+                    left, upper = (int(value) for value in rng.integers(-5, 30, 2))
+                    ops.append({"op": "crop", "box": [left, upper, left + int(rng.integers(1, 25)),
+                                                      upper + int(rng.integers(1, 25))]})
+            expected = apply_recipe(image, ops)
+            result = apply_recipe(image, compile_recipe(ops))
+            self.assertEqual((result.size, result.tobytes()), (expected.size, expected.tobytes()), ops)
+        ops = [{"op": "crop", "box": [23, 0, 28, 20]}, {"op": "crop", "box": [2, -2, 6, 15]}]
+        self.assertEqual(apply_recipe(Image.new("RGB", (40, 30)), compile_recipe(ops)).size, (4, 17))
+
+    def test_out_of_range_box_is_padded_on_both_paths(self):
+        geometry = Geometry(turns=1, box=(-4, 20, 30, 36))
+        expected = np.asarray(geometry.apply_pil(Image.fromarray(self.array)))
+        result = geometry.apply(self.array)
+        self.assertTrue((result == expected).all())
+        self.assertEqual(result.shape, (34, 16, 3))
+        self.assertTrue((result[:, -4:] == 0).all())
+
+    def test_matrix_maps_source_onto_output(self):
+        geometry = Geometry().rotated(90).flipped("vertical")
+        corners = geometry.matrix((50, 30)) @ np.array([[0, 50], [0, 30], [1, 1]])
+        self.assertEqual(sorted(corners[0]), [0, 30])
+        self.assertEqual(sorted(corners[1]), [0, 50])
+
+    def test_pil_path_uses_single_transpose(self):
+        image = Image.fromarray(self.array)
+        geometry = Geometry(turns=3, mirrored=True, box=(4, 2, 44, 28))
+        self.assertTrue((np.asarray(geometry.apply_pil(image)) == geometry.apply(self.array)).all())
+
+    def test_recipe_runs_are_folded(self):
+        ops = [{"op": "rotate", "angle": 90}, {"op": "flip", "direction": "horizontal"},
+               {"op": "crop", "box": [0, 0, 20, 25]}, {"op": "adjust", "contrast": 10},
+               {"op": "rotate", "angle": 45}]
+        compiled = compile_recipe(ops)
+        self.assertEqual([step["op"] for step in compiled], ["transform", "adjust", "rotate"])
+        image = Image.fromarray(self.array)
+        self.assertEqual(apply_recipe(image, compiled).tobytes(), apply_recipe(image, ops).tobytes())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+from PIL import Image
+from src.core.adjustment_pipeline import AdjustmentPipeline
+from src.core.image_cache import ImageCache
+
+class TestImageCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.paths = []
+        for index in range(3):
+            path = os.path.join(self.tmp.name, f"shot_{index}.png")
+            Image.new("RGB", (64, 48), (index * 40, 100, 200)).save(path)
+            self.paths.append(path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_second_get_is_a_hit(self):
+        cache = ImageCache()
+        first = cache.get(self.paths[0])
+        self.assertIs(cache.get(self.paths[0]), first)
+        self.assertEqual(first.shape, (48, 64, 4))
+        self.assertFalse(first.flags.writeable)
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+
+    def test_pyramid_levels(self):
+        cache = ImageCache()
+        self.assertEqual([cache.get(self.paths[0], level).shape[:2] for level in range(4)],
+                         [(48, 64), (24, 32), (12, 16), (6, 8)])
+        self.assertEqual(cache.stats()["entries"], 4)
+
+    def test_lru_eviction_under_budget(self):
+        cache = ImageCache(max_bytes=2 * 48 * 64 * 4)
+        cache.get(self.paths[0])
+        cache.get(self.paths[1])
+        cache.get(self.paths[0])
+        cache.get(self.paths[2])
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertTrue(cache.contains(self.paths[0]))
+        self.assertFalse(cache.contains(self.paths[1]))
+        self.assertLessEqual(cache.stats()["bytes"], cache.max_bytes)
+
+    def test_changed_file_is_reloaded(self):
+        cache = ImageCache()
+        self.assertEqual(cache.get(self.paths[0])[0, 0, 0], 0)
+        Image.new("RGB", (64, 48), (255, 0, 0)).save(self.paths[0])
+        os.utime(self.paths[0], ns=(0, os.stat(self.paths[0]).st_mtime_ns + 10 ** 9))
+        self.assertEqual(cache.get(self.paths[0])[0, 0, 0], 255)
+        self.assertEqual(cache.stats()["entries"], 1)
+
+    def test_pil_view_keeps_mode(self):
+        self.assertEqual(ImageCache().get_pil(self.paths[0]).mode, "RGB")
+
+    def test_pipeline_uses_cached_proxies(self):
+        path = os.path.join(self.tmp.name, "large.png")
+        Image.new("RGB", (1200, 1040), "gray").save(path)
+        cache = ImageCache()
+        pipeline = AdjustmentPipeline()
+        pipeline.set_source(cache.get(path), cache.proxy_loader(path))
+        self.assertIs(pipeline.proxy(1), cache.get(path, 1))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,21 @@
+import os
+import tempfile
 import unittest
+import numpy as np
+from PIL import Image
 from src.core.image_processor import ImageProcessor
 
 class TestImageProcessor(unittest.TestCase):
     def setUp(self):
-        self.processor = ImageProcessor("test_image.jpg")
+        self.directory = tempfile.TemporaryDirectory()
+        image_path = os.path.join(self.directory.name, "test_image.jpg")
+        rng = np.random.default_rng(3)
+        Image.fromarray(rng.integers(0, 256, (60, 80, 3), dtype=np.uint8)).save(image_path)
+        self.processor = ImageProcessor(image_path)
+
+    def tearDown(self):
+        self.processor.image.close()
+        self.directory.cleanup()
 
     def test_rotate(self):
         rotated_image = self.processor.rotate(90)
@@ -0,0 +1,45 @@
+import gc
+import unittest
+import numpy as np
+from PySide6.QtGui import QImage
+from src.utils.image_utils import qimage_to_numpy, numpy_to_qimage, qimage_to_pil, pil_to_qimage
+
+class TestImageUtils(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(2)
+        self.pixels = rng.integers(0, 256, (7, 5, 4), dtype=np.uint8)
+
+    def test_qimage_view_shares_memory(self):
+        qimage = numpy_to_qimage(self.pixels)
+        view = qimage_to_numpy(qimage)
+        self.assertTrue(np.shares_memory(view, self.pixels))
+        np.testing.assert_array_equal(view, self.pixels)
+
+    def test_padded_rows_are_respected(self):
+        padded = np.zeros((7, 8, 4), np.uint8)
+        padded[:, :5] = self.pixels
+        qimage = numpy_to_qimage(padded[:, :5])
+        self.assertEqual(qimage.bytesPerLine(), 32)
+        np.testing.assert_array_equal(qimage_to_numpy(qimage), self.pixels)
+        np.testing.assert_array_equal(qimage_to_numpy(qimage.copy()), self.pixels)
+
+    def test_view_keeps_qimage_alive(self):
+        qimage = QImage(64, 64, QImage.Format_RGBA8888)
+        qimage.fill(0x11223344)
+        view = qimage_to_numpy(qimage)
+        expected = view.copy()
+        del qimage
+        gc.collect()
+        np.testing.assert_array_equal(view, expected)
+
+    def test_other_formats_are_normalized(self):
+        qimage = numpy_to_qimage(self.pixels).convertToFormat(QImage.Format_ARGB32)
+        np.testing.assert_array_equal(qimage_to_numpy(qimage)[..., :3], self.pixels[..., :3])
+
+    def test_pil_round_trip(self):
+        pil_image = qimage_to_pil(numpy_to_qimage(self.pixels))
+        self.assertEqual(pil_image.mode, "RGBA")
+        np.testing.assert_array_equal(qimage_to_numpy(pil_to_qimage(pil_image)), self.pixels)
+
+if __name__ == '__main__':
+    unittest.main()
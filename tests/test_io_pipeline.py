@@ -0,0 +1,129 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+import numpy as np
+from PIL import Image
+from src.core import io_pipeline
+from src.core.batch_manifest import file_hash
+from src.core.batch_processor import BatchProcessor
+from src.core.io_pipeline import STAGES, IOPipeline, StageStats, decode_and_process
+
+class TestIOPipeline(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.input_dir = os.path.join(self.tmp.name, "in")
+        os.makedirs(self.input_dir)
+        rng = np.random.default_rng(8)
+        self.jobs = []
+        for index in range(6):
+            path = os.path.join(self.input_dir, f"shot_{index}.png")
+            Image.fromarray(rng.integers(0, 256, (40, 70, 3), dtype=np.uint8)).save(path)
+            self.jobs.append((path, os.path.join(self.tmp.name, f"out_{index}.jpg")))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_all_stages_run_and_report_utilization(self):
+        results = []
+        pipeline = IOPipeline([{"op": "rotate", "angle": 90}], process_workers=1, read_workers=2,
+                              write_workers=2, queue_size=1)
+        stats = pipeline.run(self.jobs, results.append)
+        self.assertEqual(len(results), 6)
+        self.assertTrue(all(result.ok and result.content_hash for result in results))
+        for _, output_path in self.jobs:
+            with Image.open(output_path) as image:
+                self.assertEqual((image.format, image.size), ("JPEG", (40, 70)))
+        self.assertEqual(tuple(stats.stages), STAGES)
+        for stage in stats.stages.values():
+            self.assertEqual(stage.items, 6)
+            self.assertGreater(stage.busy_seconds, 0)
+        self.assertIn(stats.bottleneck(), STAGES)
+        self.assertTrue(all(0 < value <= 1 for value in stats.utilization().values()))
+
+    def test_failures_in_any_stage_are_reported(self):
+        with open(os.path.join(self.input_dir, "broken.png"), "wb") as handle:
+            handle.write(b"not an image")
+        jobs = [(os.path.join(self.input_dir, "missing.png"), os.path.join(self.tmp.name, "a.png")),
+                (os.path.join(self.input_dir, "broken.png"), os.path.join(self.tmp.name, "b.png")),
+                (self.jobs[0][0], os.path.join(self.tmp.name, "missing_dir", "c.png")),
+                self.jobs[1]]
+        results = []
+        IOPipeline([], process_workers=1).run(jobs, results.append)
+        self.assertEqual(sorted(result.ok for result in results), [False, False, False, True])
+
+    def test_failing_callback_does_not_hang(self):
+        # Ein Lesefehler liefert sofort ein Ergebnis, während der Pool noch startet
+        jobs = [(os.path.join(self.input_dir, "missing.png"), os.path.join(self.tmp.name, "a.png"))] + self.jobs * 7
+
+        def on_result(result):
+            raise RuntimeError("callback failed")
+
+        errors = []
+
+        def run():
+            try:
+                IOPipeline([], process_workers=1, read_workers=2, queue_size=1).run(jobs, on_result)
+            except RuntimeError as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        thread.join(30)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(len(errors), 1)
+
+    def test_matches_unpipelined_batch(self):
+        pattern = os.path.join(self.input_dir, "*.png")
+        ops = [{"op": "flip"}, {"op": "adjust", "brightness": 15}]
+        outputs = {}
+        for pipelined in (True, False):
+            output_dir = os.path.join(self.tmp.name, str(pipelined))
+            summary = BatchProcessor(pattern, max_workers=1).run(output_dir, ops, pipelined=pipelined)
+            self.assertEqual(summary.processed, 6)
+            self.assertEqual(summary.stages is not None, pipelined)
+            with Image.open(os.path.join(output_dir, "shot_2.png")) as image:
+                outputs[pipelined] = image.tobytes()
+        self.assertEqual(outputs[True], outputs[False])
+
+    def test_palette_and_info_survive_the_write_stage(self):
+        path = os.path.join(self.input_dir, "palette.png")
+        image = Image.new("P", (30, 20), 1)
+        image.putpalette([0, 0, 0, 255, 0, 0])
+        image.save(path, icc_profile=b"profile")
+        output_path = os.path.join(self.tmp.name, "palette_out.png")
+        results = []
+        IOPipeline([{"op": "flip"}], process_workers=1).run([(path, output_path)], results.append)
+        self.assertTrue(results[0].ok)
+        with Image.open(output_path) as output:
+            self.assertEqual(output.mode, "P")
+            self.assertEqual(output.convert("RGB").getpixel((0, 0)), (255, 0, 0))
+            self.assertEqual(output.info["icc_profile"], b"profile")
+
+    def test_worker_returns_encoded_file(self):
+        io_pipeline._init_worker([{"op": "rotate", "angle": 90}])
+        with open(self.jobs[0][0], "rb") as handle:
+            data, pixels, _ = decode_and_process(handle.read(), self.jobs[0][1])
+        # Kodierte JPEG-Bytes statt Rohpixeln gehen zurück an den Schreib-Thread
+        self.assertTrue(data.startswith(b"\xff\xd8"))
+        self.assertEqual(pixels, 40 * 70)
+
+    def test_large_images_are_passed_as_paths(self):
+        results = []
+        # Gelten alle Bilder als groß, darf der Leser ihre Bytes nicht laden (und also nicht hashen)
+        with mock.patch.object(io_pipeline, "needs_tiling", return_value=True), \
+                mock.patch.object(io_pipeline, "content_hash", side_effect=AssertionError("bytes read")):
+            IOPipeline([], process_workers=1).run(self.jobs[:2], results.append)
+        self.assertTrue(all(result.ok for result in results), results)
+        self.assertEqual({result.content_hash for result in results}, {file_hash(path) for path, _ in self.jobs[:2]})
+
+    def test_stage_utilization(self):
+        stage = StageStats("read", workers=2)
+        stage.add(1.0)
+        stage.add(2.0, 100)
+        self.assertAlmostEqual(stage.utilization(3.0), 0.5)
+        self.assertEqual((stage.items, stage.bytes), (2, 100))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from PIL import Image
+from src.core.color_transform import ColorTransform
+from src.filters.lut_filters import LUT3D, LUTFilter, load_lut
+
+# Affine Referenzfunktion: beide Interpolationen müssen sie exakt wiedergeben
+REFERENCE_MATRIX = np.array([[0.8, 0.1, 0.05], [0.05, 0.7, 0.2], [0.1, 0.1, 0.6]], np.float32)
+REFERENCE_OFFSET = np.array([0.05, 0.1, 0.0], np.float32)
+
+
+def reference_color(rgb):
+    return rgb @ REFERENCE_MATRIX.T + REFERENCE_OFFSET
+
+
+def write_cube(path, size, func):
+    axis = np.linspace(0, 1, size)
+    with open(path, "w") as handle:
+        handle.write('TITLE "test"\n# Kommentar\nLUT_3D_SIZE %d\n' % size)
+        for b in axis:
+            for g in axis:
+                for r in axis:
+                    handle.write("%.6f %.6f %.6f\n" % tuple(func(np.array([r, g, b]))))
+
+
+class TestLUTFilters(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(4)
+        self.image = rng.integers(0, 256, (37, 53, 3), dtype=np.uint8)
+        self.expected = np.clip(reference_color(self.image / 255.0) * 255 + 0.5, 0, 255).astype(np.uint8)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def assert_close(self, actual, expected, tolerance=1):
+        self.assertLessEqual(np.abs(actual.astype(int) - expected.astype(int)).max(), tolerance)
+
+    def test_identity_lut_is_neutral(self):
+        lut = LUT3D.identity(17)
+        for method in LUT3D.METHODS:
+            self.assert_close(lut.apply(self.image, method), self.image)
+
+    def test_cube_file_matches_reference(self):
+        path = os.path.join(self.tmp.name, "look.cube")
+        write_cube(path, 9, reference_color)
+        lut_filter = LUTFilter(path, method="trilinear")
+        self.assert_close(lut_filter.apply_lut(self.image), self.expected)
+        self.assert_close(LUTFilter(path).apply_lut(self.image), self.expected)
+
+    def test_channel_order_of_cube_file(self):
+        path = os.path.join(self.tmp.name, "swap.cube")
+        write_cube(path, 5, lambda rgb: rgb[::-1])
+        red = np.zeros((1, 1, 3), np.uint8)
+        red[..., 0] = 255
+        self.assertEqual(LUTFilter(path).apply_lut(red)[0, 0].tolist(), [0, 0, 255])
+
+    def test_hald_clut_identity(self):
+        level = 4
+        size = level * level
+        index = np.arange(size ** 3)
+        rgb = np.stack([index % size, index // size % size, index // size // size], axis=-1)
+        pixels = np.round(rgb * 255 / (size - 1)).astype(np.uint8).reshape(level ** 3, level ** 3, 3)
+        path = os.path.join(self.tmp.name, "hald.png")
+        Image.fromarray(pixels).save(path)
+        self.assert_close(LUTFilter(path).apply_lut(self.image), self.image)
+
+    def test_parsed_luts_are_cached_by_mtime(self):
+        path = os.path.join(self.tmp.name, "cached.cube")
+        write_cube(path, 3, lambda rgb: rgb)
+        first = load_lut(path)
+        self.assertIs(load_lut(path), first)
+        write_cube(path, 5, lambda rgb: rgb)
+        os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 10 ** 9))
+        self.assertEqual(load_lut(path).size, 5)
+
+    def test_baked_chain_matches_sequential_stages(self):
+        path = os.path.join(self.tmp.name, "look.cube")
+        write_cube(path, 9, reference_color)
+        look = load_lut(path)
+        sepia = ColorTransform.from_adjustments(brightness=10, sepia=40)
+        sequential = look.apply(sepia.apply(self.image))
+        baked = LUT3D.bake([sepia.apply_float, look.apply_float], size=33)
+        self.assert_close(baked.apply(self.image), sequential, tolerance=3)
+
+    def test_alpha_is_preserved(self):
+        rgba = np.dstack([self.image, np.full(self.image.shape[:2], 9, np.uint8)])
+        self.assertTrue((LUT3D.identity(5).apply(rgba)[..., 3] == 9).all())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+from PIL import Image
+from src.core import batch_processor, matching
+from src.core.batch_processor import BatchProcessor
+from src.core.matching import (Correction, StatsCache, correction_ops, derive_correction, image_stats,
+                               match_sequence)
+from src.core.recipe import apply_recipe, compile_recipe
+
+
+def scene(gain=1.0, tint=(1.0, 1.0, 1.0), seed=0):
+    """Grauverlauf mit Rauschen, mit Belichtungs- und Farbstich."""
+    rng = np.random.default_rng(seed)
+    base = np.linspace(30, 200, 120, dtype=np.float32)[None, :, None] * np.ones((80, 1, 3), np.float32)
+    base += rng.normal(0, 3, base.shape).astype(np.float32)
+    return np.clip(base * gain * np.asarray(tint, np.float32), 0, 255).astype(np.uint8)
+
+
+class TestMatching(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.paths = []
+        for index, (gain, tint) in enumerate([(1.0, (1.0, 1.0, 1.0)), (0.6, (1.0, 1.0, 1.0)),
+                                              (1.0, (1.15, 1.0, 0.85)), (1.2, (0.9, 1.0, 1.1))]):
+            path = os.path.join(self.tmp.name, f"shot_{index}.png")
+            Image.fromarray(scene(gain, tint, index)).save(path)
+            self.paths.append(path)
+        self.cache_path = os.path.join(self.tmp.name, "stats.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_image_stats(self):
+        stats = image_stats(scene())
+        self.assertEqual(len(stats.percentiles), len(matching.PERCENTILES))
+        self.assertEqual(stats.percentiles, sorted(stats.percentiles))
+        self.assertAlmostEqual(stats.median, 115, delta=4)
+        self.assertTrue(np.allclose(stats.means, stats.means[0], atol=1))
+
+    def test_exposure_and_white_balance_move_towards_target(self):
+        target = image_stats(scene())
+        stats = image_stats(scene(0.6, (1.15, 1.0, 0.85)))
+        correction = derive_correction(stats, target)
+        self.assertGreater(correction.exposure, 0.5)
+        red, green, blue = correction.white_balance
+        self.assertLess(red, 1.0)
+        self.assertGreater(blue, 1.0)
+        corrected = apply_recipe(Image.fromarray(scene(0.6, (1.15, 1.0, 0.85))), [correction.to_op()])
+        result = image_stats(np.asarray(corrected))
+        self.assertAlmostEqual(result.median, target.median, delta=4)
+        self.assertTrue(np.allclose(result.means, target.means, atol=4))
+        self.assertAlmostEqual(result.spread, target.spread, delta=6)
+
+    def test_corrections_are_clamped(self):
+        target = image_stats(scene())
+        dark = image_stats(np.full((10, 10, 3), 2, np.uint8))
+        correction = derive_correction(dark, target)
+        self.assertEqual(correction.exposure, matching.settings.MATCH_MAX_EXPOSURE)
+        tinted = image_stats(scene(tint=(0.3, 1.0, 1.0)))
+        correction = derive_correction(tinted, target, contrast=False)
+        self.assertLessEqual(max(correction.white_balance), matching.settings.MATCH_MAX_WHITE_BALANCE)
+        self.assertEqual(correction.contrast, 1.0)
+
+    def test_reference_image_is_unchanged(self):
+        stats = StatsCache(self.cache_path).collect(self.paths, max_workers=2)
+        corrections = match_sequence(stats, reference=self.paths[0])
+        self.assertTrue(corrections[self.paths[0]].is_identity())
+        ops = correction_ops(corrections)
+        self.assertNotIn(self.paths[0], ops)
+        self.assertEqual(set(ops), set(self.paths[1:]))
+        with self.assertRaises(ValueError):
+            match_sequence(stats, reference=os.path.join(self.tmp.name, "missing.png"))
+
+    def test_cache_only_computes_new_frames(self):
+        cache = StatsCache(self.cache_path)
+        first = cache.collect(self.paths[:2], max_workers=1)
+        self.assertEqual(cache.computed, 2)
+        with mock.patch.object(matching, "compute_stats", wraps=matching.compute_stats) as compute:
+            cache = StatsCache(self.cache_path)
+            second = cache.collect(self.paths, max_workers=1)
+        self.assertEqual(cache.computed, 2)
+        self.assertEqual(compute.call_count, 2)
+        self.assertEqual(second[self.paths[0]], first[self.paths[0]])
+
+    def test_edits_inside_the_file_are_noticed(self):
+        # Unkomprimiert und größer als die Stichproben am Anfang und Ende: nur die Mitte ändert sich
+        path = os.path.join(self.tmp.name, "frame.bmp")
+        pixels = np.full((600, 300, 3), 60, np.uint8)
+        Image.fromarray(pixels).save(path)
+        first = StatsCache(self.cache_path).collect([path], max_workers=1)[path]
+        pixels[100:500] = 220
+        Image.fromarray(pixels).save(path)
+        os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 10 ** 9))
+        cache = StatsCache(self.cache_path)
+        second = cache.collect([path], max_workers=1)[path]
+        self.assertEqual(cache.computed, 1)
+        self.assertNotEqual(second.median, first.median)
+
+    def test_failures_are_reported_per_file(self):
+        missing = os.path.join(self.tmp.name, "missing.png")
+        stats = StatsCache(self.cache_path).collect(self.paths[:1] + [missing], max_workers=1)
+        self.assertIsInstance(stats[missing], Exception)
+        self.assertIn(self.paths[0], match_sequence(stats))
+
+    def test_balance_op_bakes_with_neighbours(self):
+        op = Correction(0.3, (1.05, 1.0, 0.95), 1.1, 120).to_op()
+        ops = [op, {"op": "adjust", "sepia": 30}]
+        compiled = compile_recipe(ops)
+        self.assertEqual([step["op"] for step in compiled], ["baked_lut"])
+        image = Image.fromarray(scene())
+        expected = np.asarray(apply_recipe(image, ops)).astype(int)
+        self.assertLessEqual(np.abs(np.asarray(apply_recipe(image, compiled)).astype(int) - expected).max(), 3)
+
+    def test_batch_applies_per_image_corrections(self):
+        stats = StatsCache(self.cache_path).collect(self.paths, max_workers=1)
+        corrections = match_sequence(stats)
+        item_ops = correction_ops(corrections)
+        output_dir = os.path.join(self.tmp.name, "out")
+        processor = BatchProcessor(self.paths, max_workers=1)
+        summary = processor.run(output_dir, [], item_ops=item_ops, pipelined=False)
+        self.assertEqual(summary.processed, len(self.paths))
+        medians = [image_stats(np.asarray(Image.open(result.output_path).convert("RGB"))).median
+                   for result in summary.results]
+        self.assertLess(max(medians) - min(medians), 8)
+        # Unveränderte Korrekturen werden übersprungen, geänderte neu gerechnet
+        item_ops[self.paths[1]] = [Correction(0.1).to_op()]
+        summary = processor.run(output_dir, [], item_ops=item_ops, pipelined=True)
+        self.assertEqual(summary.processed, 1)
+        self.assertEqual(summary.skipped, len(self.paths) - 1)
+
+    def test_corrections_are_baked_in_the_worker(self):
+        item_ops = correction_ops(match_sequence(StatsCache(self.cache_path).collect(self.paths, max_workers=1)))
+        ops = [{"op": "adjust", "sepia": 20}]
+        # Im Elternprozess wird nur das gemeinsame Rezept gebacken, nicht eine LUT pro Bild
+        with mock.patch.object(batch_processor, "compile_recipe", wraps=compile_recipe) as compile_:
+            summary = BatchProcessor(self.paths, max_workers=1).run(os.path.join(self.tmp.name, "out"), ops,
+                                                                    item_ops=item_ops, pipelined=False)
+        self.assertEqual(summary.processed, len(self.paths))
+        self.assertEqual(compile_.call_count, 1)
+        image = Image.open(self.paths[1])
+        expected = np.asarray(apply_recipe(image, item_ops[self.paths[1]] + ops)).astype(int)
+        output_path = next(result.output_path for result in summary.results if result.image_path == self.paths[1])
+        with Image.open(output_path) as output:
+            self.assertLessEqual(np.abs(np.asarray(output).astype(int) - expected).max(), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
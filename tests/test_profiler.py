@@ -0,0 +1,78 @@
+import json
+import os
+import tempfile
+import unittest
+import numpy as np
+from src.core import profiler
+from src.core.color_transform import ColorTransform
+from src.core.profiler import Profiler
+
+class TestProfiler(unittest.TestCase):
+    def setUp(self):
+        self.was_enabled = profiler.is_enabled()
+        profiler.get_profiler().reset()
+
+    def tearDown(self):
+        profiler.get_profiler().enabled = self.was_enabled
+        profiler.get_profiler().reset()
+
+    def test_disabled_records_nothing(self):
+        profiler.disable()
+        with profiler.span("adjust", 100) as span:
+            span.bytes = 400
+        ColorTransform.from_adjustments(brightness=10).apply(np.zeros((8, 8, 4), np.uint8))
+        self.assertEqual(profiler.get_profiler().stats(), {})
+        self.assertIs(profiler.span("a"), profiler.span("b"))
+
+    def test_span_totals(self):
+        recorder = Profiler(enabled=True)
+        for _ in range(3):
+            with recorder.span("lut", 1000) as span:
+                span.bytes = 4000
+        stats = recorder.stats()["lut"]
+        self.assertEqual(stats["count"], 3)
+        self.assertEqual(stats["pixels"], 3000)
+        self.assertEqual(stats["bytes"], 12000)
+        self.assertGreaterEqual(stats["wall_seconds"], 0)
+        self.assertGreaterEqual(stats["cpu_seconds"], 0)
+
+    def test_event_limit_keeps_totals(self):
+        recorder = Profiler(max_events=5, enabled=True)
+        for _ in range(20):
+            with recorder.span("encode"):
+                pass
+        self.assertEqual(len(recorder.events), 5)
+        self.assertEqual(recorder.stats()["encode"]["count"], 20)
+
+    def test_instrumented_ops(self):
+        profiler.enable()
+        array = np.zeros((20, 30, 4), np.uint8)
+        ColorTransform.from_adjustments(contrast=20, sepia=50).apply(array)
+        stats = profiler.get_profiler().stats()
+        self.assertEqual(stats["adjust"]["pixels"], 600)
+        self.assertEqual(stats["adjust"]["bytes"], array.nbytes)
+
+    def test_dumps(self):
+        recorder = Profiler(enabled=True)
+        with recorder.span("render", 10):
+            with recorder.span("adjust", 10):
+                pass
+        with tempfile.TemporaryDirectory() as directory:
+            trace_path = os.path.join(directory, "trace.json")
+            stats_path = os.path.join(directory, "stats.json")
+            recorder.dump_chrome_trace(trace_path)
+            recorder.dump_json(stats_path)
+            with open(trace_path) as handle:
+                trace = json.load(handle)
+            with open(stats_path) as handle:
+                dump = json.load(handle)
+        events = {event["name"]: event for event in trace["traceEvents"]}
+        self.assertEqual(events["adjust"]["ph"], "X")
+        # Der äußere Bereich umschließt den inneren
+        self.assertLessEqual(events["render"]["ts"], events["adjust"]["ts"])
+        self.assertGreaterEqual(events["render"]["dur"], events["adjust"]["dur"])
+        self.assertEqual(set(dump["stats"]), {"render", "adjust"})
+        self.assertEqual(len(dump["events"]), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+import numpy as np
+from PIL import Image
+from src.core.batch_processor import BatchProcessor
+from src.core.edit_history import apply_op, initial_state
+from src.core.image_cache import ImageCache
+from src.core.project import PROJECT_FORMAT, Project, ProjectShot
+
+
+def edited_state():
+    state = initial_state()
+    for op in ({"op": "adjust", "name": "brightness", "value": 20}, {"op": "rotate", "angle": 90},
+               {"op": "frame", "rect": [4.0, 6.0, 30.0, 40.0]},
+               {"op": "text", "name": "Szene 1", "description": "Totale", "font_size": 12}):
+        state = apply_op(state, op)
+    return state
+
+
+class TestProject(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.image_dir = os.path.join(self.tmp.name, "card")
+        os.makedirs(self.image_dir)
+        self.paths = []
+        for index in range(3):
+            path = os.path.join(self.image_dir, f"shot_{index}.png")
+            Image.new("RGB", (64, 48), (40 * index, 90, 120)).save(path)
+            self.paths.append(path)
+        self.project_path = os.path.join(self.tmp.name, "day.cxproj")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip_with_relative_paths(self):
+        project = Project(name="Drehtag")
+        project.add_images(self.paths)
+        project.update(project.shots[0].id, edited_state(), "2.35:1", 90)
+        project.save(self.project_path)
+        with open(self.project_path, encoding="utf-8") as handle:
+            data = json.load(handle)
+        self.assertEqual(data["format"], PROJECT_FORMAT)
+        self.assertEqual(data["shots"][0]["image"], os.path.join("card", "shot_0.png"))
+        self.assertNotIn("state", data["shots"][1])
+
+        loaded = Project.load(self.project_path)
+        self.assertEqual(loaded.name, "Drehtag")
+        self.assertEqual([shot.image_path for shot in loaded.shots], [os.path.abspath(path) for path in self.paths])
+        self.assertEqual(loaded.shots[0].state, edited_state())
+        self.assertEqual((loaded.shots[0].frame_format, loaded.shots[0].frame_width), ("2.35:1", 90))
+        self.assertEqual(loaded.shots[0].name, "Szene 1")
+        self.assertEqual(loaded.shots[1].name, "shot_1.png")
+        self.assertFalse(loaded.modified)
+
+    def test_add_images_skips_known_and_tracks_changes(self):
+        project = Project()
+        self.assertEqual(len(project.add_images(self.paths[:2])), 2)
+        self.assertEqual(len(project.add_images(self.paths)), 1)
+        self.assertTrue(project.modified)
+        project.save(self.project_path)
+        project.update(project.shots[0].id, frame_format="16:9")
+        self.assertFalse(project.modified)
+        project.remove(project.shots[0].id)
+        self.assertTrue(project.modified)
+        self.assertEqual(len(project.shots), 2)
+
+    def test_open_is_lazy(self):
+        shots = [{"id": f"{index:04d}", "image": f"missing/shot_{index:04d}.jpg", "state": edited_state()}
+                 for index in range(1000)]
+        with open(self.project_path, "w", encoding="utf-8") as handle:
+            json.dump({"format": PROJECT_FORMAT, "version": 1, "shots": shots}, handle)
+        start = time.perf_counter()
+        project = Project.load(self.project_path)
+        elapsed = time.perf_counter() - start
+        # No image is opened or checked: the referenced files do not even exist
+        self.assertEqual(len(project.shots), 1000)
+        self.assertLess(elapsed, 1.0)
+
+    def test_rejects_foreign_or_newer_files(self):
+        for data in ({"shots": []}, {"format": PROJECT_FORMAT, "version": 99}):
+            with open(self.project_path, "w", encoding="utf-8") as handle:
+                json.dump(data, handle)
+            with self.assertRaises(ValueError):
+                Project.load(self.project_path)
+
+    def test_recipe_matches_saved_edits(self):
+        shot = ProjectShot(self.paths[0], state=edited_state())
+        ops = [step["op"] for step in shot.to_recipe()]
+        self.assertEqual(ops, ["rotate", "adjust", "burn_in"])
+        self.assertEqual(shot.to_recipe()[-1]["font_size"], 16)
+        state = apply_op(shot.state, {"op": "export_crop", "enabled": True})
+        shot.state = apply_op(state, {"op": "flip", "direction": "horizontal"})
+        recipe = shot.to_recipe()
+        self.assertEqual([step["op"] for step in recipe], ["flip", "rotate", "adjust", "crop"])
+        self.assertEqual(recipe[-1]["box"], [4, 6, 34, 46])
+        self.assertEqual(ProjectShot(self.paths[0]).to_recipe(), [])
+
+    def test_batch_renders_each_shot_with_its_recipe(self):
+        project = Project()
+        project.add_images(self.paths)
+        state = apply_op(edited_state(), {"op": "export_crop", "enabled": True})
+        project.update(project.shots[0].id, state)
+        output_dir = os.path.join(self.tmp.name, "out")
+        summary = BatchProcessor([shot.image_path for shot in project.shots], max_workers=1).run(
+            output_dir, [], item_ops=project.recipes(), pipelined=False)
+        self.assertEqual(summary.processed, 3)
+        with Image.open(os.path.join(output_dir, "shot_0.png")) as image:
+            self.assertEqual(image.size, (30, 40))
+        with Image.open(os.path.join(output_dir, "shot_1.png")) as image:
+            self.assertEqual(image.size, (64, 48))
+
+    def test_proxies_are_reused_from_the_sidecar(self):
+        project = Project()
+        project.add_images(self.paths[:1])
+        shot = project.shots[0]
+        cache = ImageCache()
+        self.assertIsNone(project.store_proxy(shot, cache, level=1))
+        project.save(self.project_path)
+        path = project.store_proxy(shot, cache, level=1)
+        self.assertTrue(path.startswith(project.sidecar_directory))
+
+        fresh = ImageCache()
+        self.assertTrue(project.restore_proxy(shot, fresh, level=1))
+        self.assertTrue(fresh.contains(shot.image_path, 1))
+        self.assertFalse(fresh.contains(shot.image_path, 0))
+        np.testing.assert_array_equal(fresh.get(shot.image_path, 1), cache.get(shot.image_path, 1))
+        # A changed image no longer matches the stored proxy
+        Image.new("RGB", (64, 48), (255, 0, 0)).save(shot.image_path)
+        os.utime(shot.image_path, ns=(1, 1))
+        self.assertFalse(project.restore_proxy(shot, ImageCache(), level=1))
+
+
+if __name__ == '__main__':
+    unittest.main()
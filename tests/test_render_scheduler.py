@@ -0,0 +1,64 @@
+import threading
+import time
+import unittest
+from PySide6.QtCore import QCoreApplication
+from src.core.color_transform import RenderCancelled
+from src.services.render_scheduler import RenderScheduler
+
+class TestRenderScheduler(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def setUp(self):
+        self.started = []
+        self.results = []
+        self.release = threading.Event()
+
+    def render(self, request, cancelled):
+        self.started.append(request)
+        self.release.wait(2)
+        if cancelled():
+            raise RenderCancelled()
+        return request * 10
+
+    def drain(self, scheduler):
+        deadline = time.monotonic() + 5
+        while scheduler.is_busy() and time.monotonic() < deadline:
+            QCoreApplication.processEvents()
+            time.sleep(0.001)
+        QCoreApplication.processEvents()
+
+    def test_only_newest_result_is_delivered(self):
+        scheduler = RenderScheduler(self.render)
+        scheduler.result_ready.connect(self.results.append)
+        for value in range(1, 30):
+            scheduler.request(value)
+        self.release.set()
+        self.drain(scheduler)
+        self.assertEqual(self.results, [290])
+        self.assertEqual(self.started, [1, 29])
+
+    def test_cancel_drops_running_render(self):
+        scheduler = RenderScheduler(self.render)
+        scheduler.result_ready.connect(self.results.append)
+        scheduler.request(1)
+        scheduler.cancel()
+        self.release.set()
+        self.drain(scheduler)
+        self.assertEqual(self.results, [])
+
+    def test_cancel_can_wait_for_running_render(self):
+        scheduler = RenderScheduler(self.render)
+        scheduler.request(1)
+        while not self.started:
+            time.sleep(0.001)
+        threading.Timer(0.05, self.release.set).start()
+        scheduler.cancel(wait=True)
+        # The worker has left render_fn; only the delivery of its signal is still queued
+        self.assertEqual(scheduler.thread_pool.activeThreadCount(), 0)
+        self.drain(scheduler)
+        self.assertEqual(self.results, [])
+
+if __name__ == '__main__':
+    unittest.main()
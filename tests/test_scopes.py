@@ -0,0 +1,78 @@
+import unittest
+import numpy as np
+from src.core.geometry import Geometry
+from src.core.scopes import (compute_scopes, histogram_image, histograms, luma, subsample, vectorscope,
+                             vectorscope_image, waveform, waveform_image)
+
+class TestScopes(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(5)
+        self.image = rng.integers(0, 256, (300, 400, 4), dtype=np.uint8)
+
+    def test_subsample_is_bounded_view(self):
+        sample = subsample(self.image, max_samples=1000)
+        self.assertLessEqual(sample.shape[0] * sample.shape[1], 1000)
+        self.assertTrue(np.shares_memory(sample, self.image))
+        self.assertEqual(sample.shape[2], 3)
+
+    def test_histograms_match_numpy(self):
+        rgb = self.image[..., :3]
+        result = histograms(rgb)
+        for channel, name in enumerate(("red", "green", "blue")):
+            expected, _ = np.histogram(rgb[..., channel], bins=256, range=(0, 256))
+            np.testing.assert_array_equal(result[name], expected)
+        self.assertEqual(result["luma"].sum(), 300 * 400)
+
+    def test_luma_of_gray_is_gray(self):
+        gray = np.repeat(np.arange(256, dtype=np.uint8)[None, :, None], 3, axis=2)
+        np.testing.assert_array_equal(luma(gray)[0], np.arange(256))
+
+    def test_waveform_follows_columns(self):
+        # Linker Rand schwarz, rechter Rand weiß
+        ramp = np.zeros((10, 256, 3), np.uint8)
+        ramp[:, 128:] = 255
+        trace = waveform(luma(ramp), columns=2)
+        self.assertEqual(trace.shape, (256, 2))
+        self.assertEqual(trace[0, 0], 10 * 128)
+        self.assertEqual(trace[255, 1], 10 * 128)
+        self.assertEqual(trace.sum(), ramp.shape[0] * ramp.shape[1])
+
+    def test_vectorscope_positions(self):
+        size = 64
+        gray = np.full((4, 4, 3), 128, np.uint8)
+        scope = vectorscope(gray, size)
+        self.assertEqual(scope[size // 2, size // 2], 16)
+        red = np.zeros((4, 4, 3), np.uint8)
+        red[..., 0] = 255
+        y, x = np.unravel_index(vectorscope(red, size).argmax(), (size, size))
+        # Rot: Cr positiv (oben), Cb leicht negativ (links)
+        self.assertLess(y, size // 2)
+        self.assertLess(x, size // 2)
+
+    def test_compute_scopes_with_geometry(self):
+        image = np.zeros((40, 80, 4), np.uint8)
+        image[:, 40:, :3] = 255
+        plain = compute_scopes(image, size=16)
+        rotated = compute_scopes(image, Geometry().rotated(90), size=16)
+        self.assertEqual(plain.samples, 40 * 80)
+        np.testing.assert_array_equal(plain.histogram["luma"], rotated.histogram["luma"])
+        # Nach der Drehung liegt Weiß oben, jede Spalte enthält beide Werte
+        self.assertTrue((rotated.waveform[0] > 0).all())
+        self.assertTrue((rotated.waveform[255] > 0).all())
+        self.assertFalse((plain.waveform[0] > 0).all())
+
+    def test_images(self):
+        data = compute_scopes(self.image, size=64)
+        for image, shape in ((histogram_image(data.histogram), (128, 256, 4)),
+                             (waveform_image(data.waveform), (256, 64, 4)),
+                             (vectorscope_image(data.vectorscope), (64, 64, 4))):
+            self.assertEqual(image.shape, shape)
+            self.assertEqual(image.dtype, np.uint8)
+            self.assertTrue(image[..., :3].any())
+
+    def test_rejects_float(self):
+        with self.assertRaises(ValueError):
+            compute_scopes(np.zeros((4, 4, 3), np.float32))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import json
+import os
+import re
+import tempfile
+import unittest
+from PIL import Image
+from src.core.storyboard import Shot, StoryboardLayout, StoryboardRenderer, load_shot_list
+
+class TestStoryboard(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.shots = []
+        for index in range(5):
+            path = os.path.join(self.tmp.name, f"shot_{index}.jpg")
+            Image.new("RGB", (640, 360), (0, 40 * index, 120)).save(path)
+            self.shots.append({"image_path": f"shot_{index}.jpg", "format": "2.35:1", "width": 90,
+                               "name": f"Szene {index}", "description": "Totale"})
+        self.layout = StoryboardLayout(columns=2, rows=1, cell_width=200, margin=10, gutter=5, font_size=10)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_shot_list(self):
+        path = os.path.join(self.tmp.name, "shots.json")
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(self.shots, handle)
+        return path
+
+    def test_png_pages(self):
+        shots = load_shot_list(self.write_shot_list())
+        written = StoryboardRenderer(self.layout, max_workers=2).render(shots, os.path.join(self.tmp.name, "board.png"))
+        self.assertEqual([os.path.basename(path) for path in written],
+                         ["board_001.png", "board_002.png", "board_003.png"])
+        with Image.open(written[0]) as page:
+            self.assertEqual(page.size, self.layout.page_size)
+            # Rahmen in der Standardfarbe im ersten Bild
+            colors = {color for _, color in page.getcolors(1 << 16)}
+            self.assertIn((255, 0, 0), colors)
+
+    def test_pdf_is_appended_page_by_page(self):
+        shots = load_shot_list(self.write_shot_list())
+        output = os.path.join(self.tmp.name, "board.pdf")
+        StoryboardRenderer(self.layout).render(shots, output)
+        with open(output, "rb") as handle:
+            # Inkrementelle Updates: der zuletzt geschriebene Seitenbaum zählt
+            counts = re.findall(rb"/Count (\d+)", handle.read())
+        self.assertEqual(int(counts[-1]), 3)
+
+    def test_missing_image_gets_placeholder(self):
+        renderer = StoryboardRenderer(self.layout)
+        cell = renderer.render_cell(Shot(os.path.join(self.tmp.name, "missing.jpg"), name="Fehlt"))
+        self.assertEqual(cell.size, (self.layout.cell_width, self.layout.cell_height))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import io
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+from PIL import Image
+from src.core.thumbnails import ThumbnailStore, decode_thumbnail, sample_hash
+
+def exif_with_thumbnail(thumbnail):
+    """Minimaler EXIF-Block: leeres IFD0, IFD1 mit eingebettetem JPEG."""
+    buffer = io.BytesIO()
+    thumbnail.save(buffer, "JPEG")
+    data = buffer.getvalue()
+    ifd0 = struct.pack("<HI", 0, 14)
+    ifd1_size = 2 + 2 * 12 + 4
+    ifd1 = struct.pack("<H", 2) + struct.pack("<HHII", 0x0201, 4, 1, 14 + ifd1_size) \
+        + struct.pack("<HHII", 0x0202, 4, 1, len(data)) + struct.pack("<I", 0)
+    return b"Exif\x00\x00" + b"II*\x00" + struct.pack("<I", 8) + ifd0 + ifd1 + data
+
+class TestThumbnails(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = ThumbnailStore(os.path.join(self.tmp.name, "store"), max_size=64)
+        self.path = os.path.join(self.tmp.name, "shot.jpg")
+        Image.radial_gradient("L").resize((1200, 800)).convert("RGB").save(self.path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_jpeg_is_decoded_at_reduced_size(self):
+        thumbnail = decode_thumbnail(self.path, 100)
+        self.assertEqual(thumbnail.size, (100, 67))
+        with Image.open(self.path) as image:
+            image.draft("RGB", (100, 100))
+            self.assertEqual(image.size, (150, 100))
+
+    def test_embedded_exif_thumbnail_is_used(self):
+        path = os.path.join(self.tmp.name, "camera.jpg")
+        Image.new("RGB", (1200, 800), "white").save(path, exif=exif_with_thumbnail(Image.new("RGB", (150, 100), "red")))
+        red, green, blue = decode_thumbnail(path, 120).getpixel((60, 40))
+        self.assertGreater(red, 200)
+        self.assertLess(green, 50)
+        # Zu klein für die gewünschte Größe: es wird das Bild selbst dekodiert
+        self.assertEqual(decode_thumbnail(path, 256).getpixel((60, 40)), (255, 255, 255))
+
+    def test_store_is_keyed_by_content(self):
+        first = self.store.get(self.path)
+        self.assertTrue(os.path.exists(first))
+        renamed = os.path.join(self.tmp.name, "renamed.jpg")
+        shutil.copy2(self.path, renamed)
+        self.assertEqual(self.store.get(renamed), first)
+        self.assertEqual(sample_hash(renamed), sample_hash(self.path))
+        self.assertEqual(max(self.store.load(renamed).size), 64)
+
+    def test_edits_inside_the_file_are_noticed(self):
+        # Unkomprimiert und größer als die Stichproben am Anfang und Ende: nur die Mitte ändert sich
+        path = os.path.join(self.tmp.name, "frame.bmp")
+        Image.new("RGB", (600, 300), (60, 60, 60)).save(path)
+        self.assertEqual(self.store.load(path).getpixel((32, 16)), (60, 60, 60))
+        image = Image.new("RGB", (600, 300), (60, 60, 60))
+        image.paste((220, 220, 220), (0, 100, 600, 200))
+        image.save(path)
+        os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 10 ** 9))
+        self.assertNotEqual(self.store.load(path).getpixel((32, 16)), (60, 60, 60))
+
+    def test_generate_reports_failures(self):
+        broken = os.path.join(self.tmp.name, "broken.jpg")
+        with open(broken, "wb") as handle:
+            handle.write(b"not an image")
+        results = self.store.generate([self.path, broken], max_workers=2)
+        self.assertTrue(os.path.exists(results[self.path]))
+        self.assertIsInstance(results[broken], Exception)
+
+if __name__ == '__main__':
+    unittest.main()
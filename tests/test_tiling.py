@@ -0,0 +1,76 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+from PIL import Image
+from src.config import settings
+from src.core.batch_manifest import file_hash
+from src.core.batch_processor import process_item
+from src.core.recipe import apply_recipe, compile_recipe
+from src.core.tiling import TiledImage, apply_recipe_tiled, needs_tiling
+
+class TestTiling(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(5)
+        self.image = Image.fromarray(rng.integers(0, 256, (70, 110, 3), dtype=np.uint8))
+        # Winzige Budgets erzwingen viele Streifen und einen memmap-Puffer
+        self.patches = [mock.patch.object(settings, "IMAGE_MEMORY_BUDGET", 1000),
+                        mock.patch.object(settings, "TEMP_DIR", self.tmp.name)]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+        self.tmp.cleanup()
+
+    def assert_matches_recipe(self, ops, tolerance=0):
+        expected = np.asarray(apply_recipe(self.image, ops), dtype=int)
+        tiled = apply_recipe_tiled(TiledImage.from_image(self.image, memory_budget=4096), ops)
+        actual = np.asarray(tiled.to_pil(), dtype=int)
+        self.assertEqual(actual.shape, expected.shape)
+        self.assertLessEqual(np.abs(actual - expected).max(), tolerance)
+
+    def test_buffer_is_memory_mapped(self):
+        tiled = TiledImage.from_image(self.image)
+        self.assertIsInstance(tiled.array, np.memmap)
+        self.assertEqual(tiled.to_pil().tobytes(), self.image.tobytes())
+
+    def test_geometry_matches_pil(self):
+        ops = [{"op": "rotate", "angle": 90}, {"op": "flip", "direction": "horizontal"},
+               {"op": "crop", "box": [5, 7, 60, 90]}, {"op": "rotate", "angle": 270},
+               {"op": "flip", "direction": "vertical"}]
+        self.assert_matches_recipe(ops)
+        self.assert_matches_recipe(compile_recipe(ops))
+
+    def test_crop_outside_image_is_padded(self):
+        self.assert_matches_recipe([{"op": "crop", "box": [-10, 20, 130, 80]}])
+
+    def test_pointwise_ops_match(self):
+        ops = [{"op": "adjust", "brightness": 15, "contrast": 20, "sepia": 30},
+               {"op": "adjust", "grayscale": 40}]
+        self.assert_matches_recipe(ops, tolerance=1)
+        self.assert_matches_recipe(compile_recipe(ops[1:] + [{"op": "adjust", "sepia": 10}]), tolerance=1)
+
+    def test_drawing_across_strips(self):
+        self.assert_matches_recipe([{"op": "frame", "format": "4:3", "width": 70, "pen_width": 3},
+                                    {"op": "text", "name": "Szene 2", "description": "Nah", "font_size": 12}])
+
+    def test_batch_uses_tiling_above_max_dimension(self):
+        input_path = os.path.join(self.tmp.name, "pano.png")
+        output_path = os.path.join(self.tmp.name, "pano_out.png")
+        self.image.save(input_path)
+        self.assertFalse(needs_tiling(self.image.size))
+        ops = [{"op": "rotate", "angle": 90}, {"op": "adjust", "brightness": 10}]
+        # Im eigenen Prozess: Patches gelten in Worker-Prozessen nicht
+        with mock.patch.object(settings, "MAX_IMAGE_DIMENSION", 64), \
+                mock.patch("src.core.batch_processor.apply_recipe", side_effect=AssertionError), \
+                mock.patch("src.core.batch_processor.content_hash", side_effect=AssertionError):
+            result = process_item(input_path, output_path, ops)
+        self.assertTrue(result.ok, result.error)
+        self.assertEqual(result.content_hash, file_hash(input_path))
+        expected = np.asarray(apply_recipe(self.image, ops), dtype=int)
+        with Image.open(output_path) as output:
+            self.assertLessEqual(np.abs(np.asarray(output, dtype=int) - expected).max(), 1)